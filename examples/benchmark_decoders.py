@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compares the speed of the available bit packed decoders by running the
+default readers over every replay file found in the given paths.
+
+    python examples/benchmark_decoders.py [--repeat N] test_replays
+
+The archive files are extracted up front so that only reader and decoder
+time is measured.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+import argparse
+import time
+
+import sc2reader
+from sc2reader import utils
+from sc2reader.decoders import BitPackedDecoder, CursorBitPackedDecoder
+
+DATA_FILES = [
+    'replay.initData',
+    'replay.details',
+    'replay.message.events',
+    'replay.tracker.events',
+    'replay.game.events',
+]
+
+
+def load_contents(paths):
+    replays = list()
+    for path in paths:
+        for filename in utils.get_files(path, extension='SC2Replay'):
+            try:
+                replay = sc2reader.load_replay(filename, load_level=1, engine=None)
+            except Exception as e:
+                print("Skipping {0}: {1}".format(filename, e))
+                continue
+
+            contents = dict()
+            for data_file in DATA_FILES:
+                data = utils.extract_data_file(data_file, replay.archive)
+                if data:
+                    contents[data_file] = data
+            replays.append((replay, contents))
+    return replays
+
+
+def run_readers(replays, decoder, repeat):
+    totals = dict((data_file, 0.0) for data_file in DATA_FILES)
+    for i in range(repeat):
+        for replay, contents in replays:
+            replay.decoder = decoder
+            for data_file, data in contents.items():
+                reader = replay._get_reader(data_file)
+                start = time.time()
+                reader(data, replay)
+                totals[data_file] += time.time() - start
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the bit packed decoders against a set of replays.")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of passes over the replays for each decoder")
+    parser.add_argument('paths', metavar='path', type=str, nargs='+', help="Paths to replay files or folders")
+    args = parser.parse_args()
+
+    replays = load_contents(args.paths)
+    print("Benchmarking {0} replays, {1} passes each".format(len(replays), args.repeat))
+
+    results = list()
+    for decoder in (BitPackedDecoder, CursorBitPackedDecoder):
+        results.append((decoder, run_readers(replays, decoder, args.repeat)))
+
+    baseline = sum(results[0][1].values())
+    print("{0:<24} {1}".format("", " ".join("{0:>22}".format(data_file) for data_file in DATA_FILES+['total'])))
+    for decoder, totals in results:
+        total = sum(totals.values())
+        columns = [totals[data_file] for data_file in DATA_FILES]+[total]
+        print("{0:<24} {1} ({2:.2f}x)".format(decoder.__name__, " ".join("{0:>21.3f}s".format(c) for c in columns), baseline/total))
+
+
+if __name__ == '__main__':
+    main()
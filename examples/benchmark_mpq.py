@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compares sc2reader.mpq with mpyq by opening every replay file found in the
+given paths and extracting its data files.
+
+    python examples/benchmark_mpq.py [--repeat N] test_replays
+
+The replay files are read into memory up front so that only the archive
+code is measured.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+import argparse
+import io
+import time
+
+import mpyq
+
+from sc2reader import mpq
+from sc2reader import utils
+
+ARCHIVES = [
+    ('mpyq', lambda source: mpyq.MPQArchive(source, listfile=False)),
+    ('sc2reader.mpq', mpq.MPQArchive),
+]
+
+
+def load_contents(paths):
+    contents = list()
+    for path in paths:
+        for filename in utils.get_files(path, extension='SC2Replay'):
+            with open(filename, 'rb') as replay_file:
+                contents.append(replay_file.read())
+    return contents
+
+
+def run_archive(contents, open_archive, repeat):
+    opening, extracting = 0.0, 0.0
+    for i in range(repeat):
+        for data in contents:
+            start = time.time()
+            try:
+                archive = open_archive(io.BytesIO(data))
+            except Exception:
+                continue
+            opened = time.time()
+            for data_file in mpq.REPLAY_FILES:
+                try:
+                    utils.extract_data_file(data_file, archive)
+                except Exception:
+                    pass
+            extracting += time.time() - opened
+            opening += opened - start
+    return opening, extracting
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks sc2reader.mpq against mpyq on a set of replays.")
+    parser.add_argument('--repeat', type=int, default=3, help="Number of passes over the replays for each archive reader")
+    parser.add_argument('paths', metavar='path', type=str, nargs='+', help="Paths to replay files or folders")
+    args = parser.parse_args()
+
+    contents = load_contents(args.paths)
+    print("Benchmarking {0} replays, {1} passes each".format(len(contents), args.repeat))
+
+    results = [(name, run_archive(contents, open_archive, args.repeat)) for name, open_archive in ARCHIVES]
+
+    baseline = sum(results[0][1])
+    print("{0:<16} {1:>10} {2:>10} {3:>10}".format("", "open", "extract", "total"))
+    for name, (opening, extracting) in results:
+        total = opening + extracting
+        print("{0:<16} {1:>9.3f}s {2:>9.3f}s {3:>9.3f}s ({4:.2f}x)".format(name, opening, extracting, total, baseline/total))
+
+
+if __name__ == '__main__':
+    main()
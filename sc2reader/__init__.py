@@ -9,6 +9,7 @@ import sys
 # import submodules
 from sc2reader import engine
 from sc2reader import factories, log_utils
+from sc2reader.resources import peek_header
 
 # setup the library logging
 log_utils.setup()
@@ -38,6 +39,10 @@ def useFileCache(cache_dir, **options):
     setFactory(factories.FileCachedSC2Factory(cache_dir, **options))
 
 
+def useParseCache(parse_cache_dir, **options):
+    setFactory(factories.ParseCachedSC2Factory(parse_cache_dir, **options))
+
+
 def useDictCache(cache_max_size=0, **options):
     setFactory(factories.DictCachedSC2Factory(cache_max_size, **options))
 
@@ -3,12 +3,23 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 
 import json
 import pkgutil
+import threading
 
 try:
     from collections import OrderedDict
 except ImportError as e:
     from ordereddict import OrderedDict
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+try:
+    import copyreg
+except ImportError:
+    import copy_reg as copyreg
+
 from sc2reader.log_utils import loggable
 
 ABIL_LOOKUP = dict()
@@ -195,6 +206,27 @@ class Unit(object):
         return str(self)
 
 
+class DataType(type):
+    """
+    The type of the :class:`Unit` and :class:`Ability` classes generated for
+    each :class:`Build`. They can't be found by name so they are pickled as a
+    reference into the build data they came from.
+    """
+
+
+def _reduce_data_type(data_type):
+    if not _is_shared_build(data_type._build):
+        # Rebuilt by value; the references back into the build are set
+        # afterwards so that pickle can resolve the cycles
+        attrs = dict((k, v) for k, v in vars(data_type).items() if k not in ('__dict__', '__weakref__'))
+        refs = dict((k, attrs.pop(k)) for k in ('_build', 'build_unit') if k in attrs)
+        return DataType, (data_type.__name__, data_type.__bases__, attrs), (None, refs)
+    kind = 'units' if issubclass(data_type, Unit) else 'abilities'
+    return _get_data_type, (data_type._build.expansion, data_type._build.id, kind, data_type.id)
+
+copyreg.pickle(DataType, _reduce_data_type)
+
+
 class Ability(object):
 
     #: The internal integer id representing this ability.
@@ -225,10 +257,13 @@ class Build(object):
     All build data is valid for standard games only. For arcade maps milage
     may vary.
     """
-    def __init__(self, build_id):
+    def __init__(self, build_id, expansion=None):
         #: The integer id of the build
         self.id = build_id
 
+        #: The expansion the build belongs to, one of 'WoL', 'HotS'
+        self.expansion = expansion
+
         #: A dictionary mapping integer ids to available unit types.
         self.units = dict()
 
@@ -259,8 +294,15 @@ class Build(object):
         else:
             self.logger.error("Unable to change type of {0} to {1} [frame {2}]; unit type not found in build {3}".format(unit, new_type, frame, self.id))
 
+    def __reduce_ex__(self, protocol):
+        # Builds are shared by every replay, pickle a reference to the loaded one
+        if _is_shared_build(self):
+            return _get_build, (self.expansion, self.id)
+        return super(Build, self).__reduce_ex__(protocol)
+
     def add_ability(self, ability_id, name, title=None, is_build=False, build_time=None, build_unit=None):
-        ability = type(str(name), (Ability,), dict(
+        ability = DataType(str(name), (Ability,), dict(
+            _build=self,
             id=ability_id,
             name=name,
             title=title or name,
@@ -272,7 +314,8 @@ class Build(object):
         self.abilities[ability_id] = ability
 
     def add_unit_type(self, type_id, str_id, name, title=None, race='Neutral', minerals=0, vespene=0, supply=0, is_building=False, is_worker=False, is_army=False):
-        unit = type(str(name), (Unit,), dict(
+        unit = DataType(str(name), (Unit,), dict(
+            _build=self,
             id=type_id,
             str_id=str_id,
             name=name,
@@ -291,7 +334,7 @@ class Build(object):
 
 
 def load_build(expansion, version):
-    build = Build(version)
+    build = Build(version, expansion)
 
     unit_file = '{0}/{1}_units.csv'.format(expansion, version)
     for entry in pkgutil.get_data('sc2reader.data', unit_file).decode('utf8').split('\n'):
@@ -339,14 +382,52 @@ def load_build(expansion, version):
 
     return build
 
-# Load the WoL Data
-wol_builds = dict()
-for version in ('16117', '17326', '18092', '19458', '22612', '24944'):
-    wol_builds[version] = load_build('WoL', version)
+class BuildSet(Mapping):
+    """
+    :param expansion: The expansion the builds belong to
+    :param versions: The versions with data available
+
+    The builds of an expansion by version. A build is only loaded from its
+    data files the first time it is used, after which it is kept for the
+    life of the process.
+    """
+    def __init__(self, expansion, versions):
+        self.expansion = expansion
+        self.versions = versions
+        self._builds = dict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, version):
+        if version not in self._builds:
+            if version not in self.versions:
+                raise KeyError(version)
+
+            # Make sure every replay gets the same Build instance
+            with self._lock:
+                if version not in self._builds:
+                    self._builds[version] = load_build(self.expansion, version)
+        return self._builds[version]
+
+    def __iter__(self):
+        return iter(self.versions)
+
+    def __len__(self):
+        return len(self.versions)
 
-# Load HotS Data
-hots_builds = dict()
-for version in ('base', '23925', '24247', '24764'):
-    hots_builds[version] = load_build('HotS', version)
 
+wol_builds = BuildSet('WoL', ('16117', '17326', '18092', '19458', '22612', '24944'))
+hots_builds = BuildSet('HotS', ('base', '23925', '24247', '24764'))
 builds = {'WoL': wol_builds, 'HotS': hots_builds}
+
+
+def _is_shared_build(build):
+    build_set = builds.get(build.expansion)
+    return build_set is not None and build_set._builds.get(build.id) is build
+
+
+def _get_build(expansion, version):
+    return builds[expansion][version]
+
+
+def _get_data_type(expansion, version, kind, type_id):
+    return getattr(builds[expansion][version], kind)[type_id]
@@ -3,14 +3,23 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 
 from io import BytesIO
 
+import binascii
 import struct
 import functools
+import sys
 
 try:
     from collections import OrderedDict
 except ImportError as e:
     from ordereddict import OrderedDict
 
+try:
+    int_from_bytes = int.from_bytes
+except AttributeError:
+    # Python 2 doesn't have int.from_bytes, only big endian is needed here
+    def int_from_bytes(data, byteorder):
+        return int(binascii.hexlify(data), 16) if data else 0
+
 
 class ByteDecoder(object):
     """
@@ -174,6 +183,12 @@ class BitPackedDecoder(object):
         self._next_byte = None
         self._bit_shift = 0
 
+    def seek(self, position):
+        """ Moves the cursor to the beginning of the byte at ``position`` """
+        self._buffer.seek(position)
+        self._next_byte = None
+        self._bit_shift = 0
+
     def read_uint8(self):
         """ Returns the next 8 bits as an unsigned integer """
         data = ord(self._buffer.read(1))
@@ -377,3 +392,277 @@ class BitPackedDecoder(object):
             raise TypeError("Unknown Data Structure: '%s'" % datatype)
 
         return data
+
+
+class CursorBitPackedDecoder(object):
+    """
+    :param contents: The string, memoryview, or file-like object to decode
+
+    A drop-in replacement for :class:`BitPackedDecoder` with the same public
+    interface. Instead of reading through a :class:`ByteDecoder` the contents
+    are indexed directly with an integer cursor. Bits that haven't been used
+    yet from the current byte are held in a small accumulator and whole bytes
+    are converted to integers in a single step.
+
+    Select it for a factory with the ``decoder`` option::
+
+        factory = SC2Factory(decoder=CursorBitPackedDecoder)
+
+    """
+    #: Maps bit counts to low bit masks. Exposed for compatibility
+    #: with readers written against :class:`BitPackedDecoder`.
+    _lo_masks = BitPackedDecoder._lo_masks
+
+    # Precompiled big endian unpackers, these work on any buffer
+    _unpack_uint16 = staticmethod(struct.Struct(str('>H')).unpack_from)
+    _unpack_uint32 = staticmethod(struct.Struct(str('>I')).unpack_from)
+    _unpack_uint64 = staticmethod(struct.Struct(str('>Q')).unpack_from)
+
+    def __init__(self, contents):
+        if hasattr(contents, 'read'):
+            contents = contents.read()
+
+        # Python 2 byte strings don't index to integers
+        if sys.version_info[0] < 3:
+            contents = bytearray(contents)
+
+        #: The contents being decoded, never copied.
+        self._contents = contents
+
+        #: The total number of bytes in the contents
+        self.length = len(contents)
+
+        #: The number of bytes used, including a partially used byte
+        self._used = 0
+
+        #: The bits that haven't been used yet from the last byte read.
+        #: Bits are used from lowest to highest so the next bit is always
+        #: the lowest bit in the accumulator.
+        self._next = 0
+
+        #: The number of bits remaining in the accumulator
+        self._next_bits = 0
+
+    @property
+    def _bit_shift(self):
+        """ The number of bits already used from the current byte """
+        return (8 - self._next_bits) & 7
+
+    def tell(self):
+        """ Returns the number of bytes used, including a partially used byte """
+        return self._used
+
+    def seek(self, position):
+        """ Moves the cursor to the beginning of the byte at ``position`` """
+        self._used = position
+        self._next = 0
+        self._next_bits = 0
+
+    def done(self):
+        """ Returns true when all bytes in the buffer have been used"""
+        return self._used == self.length
+
+    def read_range(self, start, end):
+        """ Returns the raw byte string from the indicated address range """
+        return bytes(self._contents[start:end])
+
+    def peek(self, count):
+        """ Returns the raw byte string for the next ``count`` bytes """
+        return bytes(self._contents[self._used:self._used+count])
+
+    def byte_align(self):
+        """ Moves cursor to the beginning of the next byte """
+        self._next = 0
+        self._next_bits = 0
+
+    def read_bool(self):
+        """ Returns the next bit as an integer """
+        if self._next_bits:
+            self._next_bits -= 1
+            value = self._next & 1
+            self._next >>= 1
+            return value
+        return self.read_bits(1)
+
+    def read_uint8(self):
+        """ Returns the next 8 bits as an unsigned integer """
+        if self._next_bits:
+            return self.read_bits(8)
+        self._used += 1
+        return self._contents[self._used-1]
+
+    def read_uint16(self):
+        """ Returns the next 16 bits as an unsigned integer """
+        if self._next_bits:
+            return self.read_bits(16)
+        self._used += 2
+        return self._unpack_uint16(self._contents, self._used-2)[0]
+
+    def read_uint32(self):
+        """ Returns the next 32 bits as an unsigned integer """
+        if self._next_bits:
+            return self.read_bits(32)
+        self._used += 4
+        return self._unpack_uint32(self._contents, self._used-4)[0]
+
+    def read_uint64(self):
+        """ Returns the next 64 bits as an unsigned integer """
+        if self._next_bits:
+            return self.read_bits(64)
+        self._used += 8
+        return self._unpack_uint64(self._contents, self._used-8)[0]
+
+    def read_vint(self):
+        """ Reads a signed integer of variable length """
+        if not self._next_bits:
+            # Structs are always byte aligned so read them straight off
+            contents = self._contents
+            used = self._used
+            byte = first = contents[used]
+            result = (byte & 0x7F) >> 1
+            bits = 6
+            while byte & 0x80:
+                used += 1
+                byte = contents[used]
+                result |= (byte & 0x7F) << bits
+                bits += 7
+            self._used = used + 1
+            return -result if first & 0x01 else result
+
+        byte = self.read_uint8()
+        negative = byte & 0x01
+        result = (byte & 0x7F) >> 1
+        bits = 6
+        while byte & 0x80:
+            byte = self.read_uint8()
+            result |= (byte & 0x7F) << bits
+            bits += 7
+        return -result if negative else result
+
+    def read_aligned_bytes(self, count):
+        """ Skips to the beginning of the next byte and returns the next ``count`` bytes as a byte string """
+        self._next = 0
+        self._next_bits = 0
+        start = self._used
+        self._used += count
+        return bytes(self._contents[start:start+count])
+
+    def read_aligned_string(self, count, encoding='utf8'):
+        """ Skips to the beginning of the next byte and returns the next ``count`` bytes decoded with encoding (default utf8) """
+        return self.read_aligned_bytes(count).decode(encoding)
+
+    def read_bytes(self, count):
+        """ Returns the next ``count*8`` bits as a byte string """
+        if not self._next_bits:
+            return self.read_aligned_bytes(count)
+        return bytes(bytearray([self.read_bits(8) for i in range(count)]))
+
+    def read_bits(self, count):
+        """ Returns the next ``count`` bits as an unsigned integer """
+        next_bits = self._next_bits
+
+        # Everything we need is already in the accumulator
+        if count <= next_bits:
+            self._next_bits = next_bits - count
+            result = self._next & ((1 << count) - 1)
+            self._next >>= count
+            return result
+
+        # Otherwise the rest of the accumulator makes the high bits
+        result = self._next
+        count -= next_bits
+        used = self._used
+        contents = self._contents
+
+        # Followed by any whole bytes, big endian
+        if count >= 8:
+            whole = count >> 3
+            if whole == 1:
+                result = result << 8 | contents[used]
+            elif whole == 2:
+                result = result << 16 | self._unpack_uint16(contents, used)[0]
+            elif whole == 4:
+                result = result << 32 | self._unpack_uint32(contents, used)[0]
+            else:
+                if used+whole > self.length:
+                    raise EOFError("Cannot read {0} bytes at position {1}".format(whole, used))
+                result = result << (whole << 3) | int_from_bytes(bytes(contents[used:used+whole]), 'big')
+            used += whole
+            count &= 7
+
+        # And the low bits of the next byte which refill the accumulator
+        if count:
+            byte = contents[used]
+            self._used = used + 1
+            self._next = byte >> count
+            self._next_bits = 8 - count
+            return result << count | byte & ((1 << count) - 1)
+
+        self._used = used
+        self._next = 0
+        self._next_bits = 0
+        return result
+
+    def read_frames(self):
+        """ Reads a frame count as an unsigned integer """
+        byte = self.read_uint8()
+        time, additional_bytes = byte >> 2, byte & 0x03
+        if additional_bytes == 0:
+            return time
+        elif additional_bytes == 1:
+            return time << 8 | self.read_uint8()
+        elif additional_bytes == 2:
+            return time << 16 | self.read_uint16()
+        elif additional_bytes == 3:
+            return time << 24 | self.read_uint16() << 8 | self.read_uint8()
+
+    def read_struct(self, datatype=None):
+        """ Reads a nested data structure. If the type is not specified the
+        first byte is used as the type identifier.
+        """
+        self._next = 0
+        self._next_bits = 0
+        if datatype is None:
+            datatype = self._contents[self._used]
+            self._used += 1
+
+        if datatype == 0x00:  # array
+            data = [self.read_struct() for i in range(self.read_vint())]
+
+        elif datatype == 0x01:  # bitarray, weird alignment requirements
+            bits = self.read_vint()
+            data = self.read_bits(bits)
+
+        elif datatype == 0x02:  # blob
+            length = self.read_vint()
+            data = self.read_aligned_bytes(length)
+
+        elif datatype == 0x03:  # choice
+            flag = self.read_vint()
+            data = self.read_struct()
+
+        elif datatype == 0x04:  # optional
+            exists = self.read_uint8() != 0
+            data = self.read_struct() if exists else None
+
+        elif datatype == 0x05:  # Struct
+            entries = self.read_vint()
+            data = dict([(self.read_vint(), self.read_struct()) for i in range(entries)])
+
+        elif datatype == 0x06:  # u8
+            data = self.read_uint8()
+
+        elif datatype == 0x07:  # u32
+            data = self.read_aligned_bytes(4)
+
+        elif datatype == 0x08:  # u64
+            data = self.read_uint64()
+
+        elif datatype == 0x09:  # vint
+            data = self.read_vint()
+
+        else:
+            raise TypeError("Unknown Data Structure: '%s'" % datatype)
+
+        return data
+
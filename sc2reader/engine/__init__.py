@@ -12,6 +12,7 @@ from sc2reader.engine import plugins
 def setGameEngine(engine):
     module = sys.modules[__name__]
     module.run = engine.run
+    module.run_many = engine.run_many
     module.register_plugin = engine.register_plugin
     module.register_plugins = engine.register_plugins
 
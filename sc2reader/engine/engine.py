@@ -2,9 +2,27 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 import collections
+import itertools
+import multiprocessing
+import traceback
+from timeit import default_timer
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import sc2reader
+from sc2reader import utils
+from sc2reader.exceptions import LoadError
 from sc2reader.events import *
 from sc2reader.engine.events import InitGameEvent, EndGameEvent, PluginExit
 
+try:
+    basestring
+except NameError:
+    basestring = str
+
 
 class GameEngine(object):
     """ GameEngine Specification
@@ -111,26 +129,100 @@ class GameEngine(object):
                 code, details = replay.plugins['RequiredPlugin']
                 message = "RequiredPlugin failed with code: {0}. Cannot continue.".format(code)
                 yield PluginExit(self, code=1, details=dict(msg=message))
+
+        Plugins can also return a summary of what they found for each replay from
+        an ``export`` method. These are collected by :meth:`run_many`, which runs
+        a batch of replays across several processes::
+
+            def export(self, replay):
+                return dict((human.pid, human.avg_apm) for human in replay.humans)
     """
+    #: The handlers for built in parent classes, from most generic to most specific
+    PARENT_HANDLERS = [
+        (Event, 'handleEvent'),
+        (MessageEvent, 'handleMessageEvent'),
+        (GameEvent, 'handleGameEvent'),
+        (TrackerEvent, 'handleTrackerEvent'),
+        (AbilityEvent, 'handleAbilityEvent'),
+        (ControlGroupEvent, 'handleControlGroupEvent'),
+    ]
+
     def __init__(self, plugins=[]):
         self._plugins = list()
+        self._handlers = dict()
         self.register_plugins(*plugins)
 
     def register_plugin(self, plugin):
         self._plugins.append(plugin)
+        self._handlers.clear()
 
     def register_plugins(self, *plugins):
         for plugin in plugins:
             self.register_plugin(plugin)
 
-    def run(self, replay):
-        # A map of [event.name] => event handlers in plugin registration order
-        # ranked from most generic to most specific
-        handlers = dict()
-
-        # Create a local copy of the plugins list. As plugins exit we can
-        # remove them from this list and regenerate event handlers.
-        plugins = list(self._plugins)
+    def __getstate__(self):
+        # The handlers are rebuilt on the first run
+        state = self.__dict__.copy()
+        state['_handlers'] = dict()
+        return state
+
+    def run_many(self, replays, workers=None, ordered=True, **options):
+        """
+        Runs a batch of replays through the registered plugins and yields a
+        summary of each run: an AttributeDict with the ``filename``,
+        ``plugin_result`` and ``plugin_failures`` of the replay and the
+        ``exports`` of each plugin with an ``export`` method, by plugin name.
+
+        :param replays: Replay paths or loaded :class:`~sc2reader.resources.Replay`
+            objects, or a directory to load all the replays from. Paths are
+            loaded with the engine by the process that runs them; loaded replays
+            have to be pickled over so paths are a lot cheaper.
+
+        :param workers: The number of processes to spread the replays across.
+            Each process runs its own copy of the plugins. If not given the
+            replays are run one after another with this engine's plugins.
+
+        :param ordered: If False, summaries are yielded as they finish.
+
+        Additional options are used to load the replay paths. Replays that fail
+        come back as :class:`~sc2reader.exceptions.LoadError` objects.
+        """
+        if isinstance(replays, basestring):
+            file_options = dict(extension='SC2Replay')
+            file_options.update(options)
+            replays = utils.get_files(replays, **file_options)
+
+        if not workers:
+            for replay in replays:
+                yield pickle.loads(_run_replay(self, replay, options))
+            return
+
+        pool = multiprocessing.Pool(workers, _init_worker, (self, options))
+        try:
+            imap = pool.imap if ordered else pool.imap_unordered
+            for result in imap(_run_in_worker, replays):
+                yield pickle.loads(result)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def run(self, replay, events=None):
+        """
+        Runs the replay through the registered plugins.
+
+        :param events: An iterable of events to process in place of
+            ``replay.events``. Events are pulled from it one at a time so
+            generators can decode them as the plugins go.
+        """
+        # A map of event class => event handlers in plugin registration order
+        # ranked from most generic to most specific. The map is kept by the
+        # engine across runs until a plugin exits, then this run carries on
+        # with a copy that leaves out the plugin's handlers.
+        handlers = self._handlers
+
+        # The plugins still running. Copied before plugins are removed.
+        plugins = self._plugins
 
         # Create a dict for storing plugin exit codes and details.
         replay.plugin_result = replay.plugins = dict()
@@ -138,53 +230,71 @@ class GameEngine(object):
         # Create a list storing replay.plugins keys for failures.
         replay.plugin_failures = list()
 
-        # Fill event event queue with the replay events, bookmarked by Init and End events.
-        event_queue = collections.deque()
-        event_queue.append(InitGameEvent())
-        event_queue.extend(replay.events)
-        event_queue.append(EndGameEvent())
+        # Time spent in each plugin's handlers, if the replay is being profiled
+        timings = getattr(replay, 'timings', None)
+
+        # Pull the replay events one at a time, bookmarked by Init and End events.
+        if events is None:
+            events = replay.events
+        event_source = itertools.chain([InitGameEvent()], events, [EndGameEvent()])
 
         # Work through the events in the queue, pushing newly emitted events to
-        # the front of the line for immediate processing.
-        while len(event_queue) > 0:
-            event = event_queue.popleft()
-
-            if event.name == 'PluginExit':
-                # Remove the plugin and reset the handlers.
-                plugins.remove(event.plugin)
-                handlers.clear()
-                replay.plugin_result[event.plugin.name] = (event.code, event.details)
-                if event.code != 0:
-                    replay.plugin_failures.append(event.plugin.name)
-
-            # If we haven't compiled a list of handlers for this event yet, do so!
-            if event.name not in handlers:
-                event_handlers = self._get_event_handlers(event, plugins)
-                handlers[event.name] = event_handlers
-            else:
-                event_handlers = handlers[event.name]
-
-            # Events have the option of yielding one or more additional events
-            # which get processed after the current event finishes. The new_events
-            # batch is constructed in reverse order because extendleft reverses
-            # the order again with a series of appendlefts.
-            new_events = collections.deque()
-            for event_handler in event_handlers:
-                try:
-                    for new_event in (event_handler(event, replay) or []):
-                        if new_event.name == 'PluginExit':
-                            new_events.append(new_event)
-                            break
+        # the front of the line for immediate processing. The queue only holds
+        # emitted events; the next event is pulled once it runs dry.
+        event_queue = collections.deque()
+        for event in event_source:
+            event_queue.append(event)
+            while len(event_queue) > 0:
+                event = event_queue.popleft()
+
+                if event.name == 'PluginExit':
+                    # Remove the plugin and its handlers.
+                    plugins = list(plugins)
+                    plugins.remove(event.plugin)
+                    handlers = dict((event_class, [handler for handler in event_handlers if handler.__self__ is not event.plugin])
+                                    for event_class, event_handlers in handlers.items())
+                    replay.plugin_result[event.plugin.name] = (event.code, event.details)
+                    if event.code != 0:
+                        replay.plugin_failures.append(event.plugin.name)
+
+                # If we haven't compiled a list of handlers for this event class yet, do so!
+                event_handlers = handlers.get(event.__class__)
+                if event_handlers is None:
+                    event_handlers = handlers[event.__class__] = self._get_event_handlers(event, plugins)
+
+                # Events have the option of yielding one or more additional events
+                # which get processed after the current event finishes. The new_events
+                # batch is constructed in reverse order because extendleft reverses
+                # the order again with a series of appendlefts. It is only created
+                # once a handler emits something.
+                new_events = None
+                for event_handler in event_handlers:
+                    if timings is not None:
+                        start = default_timer()
+                    try:
+                        emitted = event_handler(event, replay)
+                        if emitted is not None:
+                            for new_event in emitted:
+                                if new_events is None:
+                                    new_events = collections.deque()
+                                if new_event.name == 'PluginExit':
+                                    new_events.append(new_event)
+                                    break
+                                else:
+                                    new_events.appendleft(new_event)
+                    except Exception as e:
+                        if event_handler.__self__.name in ['ContextLoader']:
+                            # Certain built in plugins should probably still cause total failure
+                            raise  # Maybe??
                         else:
-                            new_events.appendleft(new_event)
-                except Exception as e:
-                    if event_handler.im_self.name in ['ContextLoader']:
-                        # Certain built in plugins should probably still cause total failure
-                        raise  # Maybe??
-                    else:
-                        new_event = PluginExit(event_handler.im_self, code=1, details=dict(error=e))
-                        new_events.append(new_event)
-            event_queue.extendleft(new_events)
+                            if new_events is None:
+                                new_events = collections.deque()
+                            new_event = PluginExit(event_handler.__self__, code=1, details=dict(error=e))
+                            new_events.append(new_event)
+                    if timings is not None:
+                        timings.record('plugin '+event_handler.__self__.name, default_timer()-start)
+                if new_events is not None:
+                    event_queue.extendleft(new_events)
 
         # For any plugins that didn't yield a PluginExit event or throw unexpected exceptions,
         # record a successful completion.
@@ -192,22 +302,56 @@ class GameEngine(object):
             replay.plugin_result[plugin.name] = (0, dict())
 
     def _get_event_handlers(self, event, plugins):
-        return sum([self._get_plugin_event_handlers(plugin, event) for plugin in plugins], [])
-
-    def _get_plugin_event_handlers(self, plugin, event):
+        # Every event of a class shares the same handlers
+        event_class = event.__class__
+        names = [name for parent, name in self.PARENT_HANDLERS if issubclass(event_class, parent)]
+        names.append('handle'+event.name)
         handlers = list()
-        if isinstance(event, Event) and hasattr(plugin, 'handleEvent'):
-            handlers.append(getattr(plugin, 'handleEvent', None))
-        if isinstance(event, MessageEvent) and hasattr(plugin, 'handleMessageEvent'):
-            handlers.append(getattr(plugin, 'handleMessageEvent', None))
-        if isinstance(event, GameEvent) and hasattr(plugin, 'handleGameEvent'):
-            handlers.append(getattr(plugin, 'handleGameEvent', None))
-        if isinstance(event, TrackerEvent) and hasattr(plugin, 'handleTrackerEvent'):
-            handlers.append(getattr(plugin, 'handleTrackerEvent', None))
-        if isinstance(event, AbilityEvent) and hasattr(plugin, 'handleAbilityEvent'):
-            handlers.append(getattr(plugin, 'handleAbilityEvent', None))
-        if isinstance(event, ControlGroupEvent) and hasattr(plugin, 'handleControlGroupEvent'):
-            handlers.append(getattr(plugin, 'handleControlGroupEvent', None))
-        if hasattr(plugin, 'handle'+event.name):
-            handlers.append(getattr(plugin, 'handle'+event.name, None))
+        for plugin in plugins:
+            for name in names:
+                handler = getattr(plugin, name, None)
+                if handler is not None:
+                    handlers.append(handler)
         return handlers
+
+
+# The engine and load options used by a worker process, see GameEngine.run_many
+_worker_engine = None
+_worker_options = None
+
+
+def _init_worker(engine, options):
+    global _worker_engine, _worker_options
+    _worker_engine, _worker_options = engine, options
+
+
+def _run_in_worker(replay):
+    return _run_replay(_worker_engine, replay, _worker_options)
+
+
+def _run_replay(engine, replay, options):
+    # Returns the pickled summary of the run so that failures to pickle an
+    # export are reported like any other failure.
+    try:
+        if isinstance(replay, basestring):
+            replay = sc2reader.load_replay(replay, engine=engine, **options)
+            replay.load_lazy_attributes()
+        else:
+            engine.run(replay)
+
+        exports = dict()
+        for plugin in engine._plugins:
+            if hasattr(plugin, 'export') and plugin.name not in replay.plugin_failures:
+                exports[plugin.name] = plugin.export(replay)
+
+        result = utils.AttributeDict(
+            filename=replay.filename,
+            plugin_result=replay.plugin_result,
+            plugin_failures=replay.plugin_failures,
+            exports=exports,
+        )
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        filename = replay if isinstance(replay, basestring) else getattr(replay, 'filename', None)
+        error = LoadError(filename, "{0}: {1}".format(e.__class__.__name__, e), traceback.format_exc())
+        return pickle.dumps(error, pickle.HIGHEST_PROTOCOL)
@@ -44,3 +44,6 @@ class APMTracker(object):
                 human.avg_apm = sum(human.aps.values())/float(human.seconds_played)*60
             else:
                 human.avg_apm = 0
+
+    def export(self, replay):
+        return dict((human.pid, human.avg_apm) for human in replay.humans)
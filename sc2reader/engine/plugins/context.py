@@ -68,8 +68,8 @@ class ContextLoader(object):
         for (unit_id, unit_type, subgroup_flags, intra_subgroup_flags) in event.new_unit_info:
             # If we don't have access to tracker events, use selection events to create
             # new units and track unit type changes. It won't be perfect, but it is better
-            # than nothing.
-            if not replay.tracker_events:
+            # than nothing. The same goes for units whose tracker events were filtered out.
+            if not replay.tracker_events or unit_id not in replay.objects:
                 # Starting at 23925 the default viking mode is assault. Most people expect
                 # the default viking mode to be figher so fudge it a bit here.
                 if replay.versions[1] == 2 and replay.build >= 23925 and unit_type == 71:
@@ -93,7 +93,7 @@ class ContextLoader(object):
 
             units.append(unit)
 
-        event.new_units = event.objects = units
+        event.new_units = units
 
     def handleResourceTradeEvent(self, event, replay):
         event.sender = event.player
@@ -61,10 +61,8 @@ class GameHeartNormalizer(object):
         for event in replay.events:
             if event.frame < start_frame:
                 event.frame = 0
-                event.second = 0
             else:
                 event.frame -= start_frame
-                event.second = event.frame >> 4
 
     def fix_entities(self, replay, actual_players):
         # Change the players that aren't playing into observers
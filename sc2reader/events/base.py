@@ -2,5 +2,38 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 
-class Event(object):
-    name = 'Event'
+class EventType(type):
+    """
+    Metaclass for events. Sets the ``name`` of each event class to the class
+    name unless the class sets one itself.
+    """
+    def __init__(cls, name, bases, attrs):
+        super(EventType, cls).__init__(name, bases, attrs)
+        if 'name' not in attrs:
+            cls.name = str(name)
+
+
+class derived(object):
+    """
+    Like ``property``, for event values worked out from other attributes.
+    Assigning one keeps the value in the event's ``__dict__``, where it takes
+    precedence over the computed value, so plugins can still override them.
+    """
+    def __init__(self, fget):
+        self.fget = fget
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, event, owner):
+        if event is None:
+            return self
+        return self.fget(event)
+
+
+# Made with the metaclass directly so that it works with python 2 and 3.
+# Event classes declare their attributes in __slots__; the __dict__ slot is
+# only filled in when something else is set on an event.
+Event = EventType(str('Event'), (object,), dict(
+    __module__=__name__,
+    __doc__=""" Base class for all replay events. """,
+    __slots__=('__dict__',),
+))
@@ -2,7 +2,7 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 from sc2reader.utils import Length
-from sc2reader.events.base import Event
+from sc2reader.events.base import Event, derived
 from sc2reader.log_utils import loggable
 
 from itertools import chain
@@ -13,6 +13,11 @@ class GameEvent(Event):
     """
     This is the base class for all game events. The attributes below are universally available.
     """
+    __slots__ = ('pid', 'player', 'frame')
+
+    #: The attributes kept by :meth:`~sc2reader.resources.Replay.event_table`
+    table_columns = (('frame', int), ('pid', int))
+
     def __init__(self, frame, pid):
         #: The id of the player generating the event. This is 16 for global non-player events.
         #: Prior to Heart of the Swarm this was the player id. Since HotS it is
@@ -27,14 +32,15 @@ class GameEvent(Event):
         #: The frame of the game that this event was recorded at. 16 frames per game second.
         self.frame = frame
 
-        #: The second of the game that this event was recorded at. 16 frames per game second.
-        self.second = frame >> 4
-
-        #: A flag indicating if it is a local or global event.
-        self.is_local = (pid != 16)
+    @derived
+    def second(self):
+        """ The second of the game that this event was recorded at. 16 frames per game second. """
+        return self.frame >> 4
 
-        #: Short cut string for event class name
-        self.name = self.__class__.__name__
+    @derived
+    def is_local(self):
+        """ A flag indicating if it is a local or global event. """
+        return self.pid != 16
 
     def _str_prefix(self):
         player_name = self.player.name if getattr(self, 'pid', 16) != 16 else "Global"
@@ -49,6 +55,8 @@ class GameStartEvent(GameEvent):
     Recorded when the game starts and the frames start to roll. This is a global non-player
     event.
     """
+    __slots__ = ('data',)
+
     def __init__(self, frame, pid, data):
         super(GameStartEvent, self).__init__(frame, pid)
 
@@ -60,6 +68,8 @@ class PlayerLeaveEvent(GameEvent):
     """
     Recorded when a player leaves the game.
     """
+    __slots__ = ('data',)
+
     def __init__(self, frame, pid, data):
         super(PlayerLeaveEvent, self).__init__(frame, pid)
 
@@ -72,6 +82,8 @@ class UserOptionsEvent(GameEvent):
     This event is recorded for each player at the very beginning of the game before the
     :class:`GameStartEvent`.
     """
+    __slots__ = ('game_fully_downloaded', 'development_cheats_enabled', 'multiplayer_cheats_enabled', 'sync_checksumming_enabled', 'is_map_to_map_transition', 'use_ai_beacons', 'starting_rally', 'debug_pause_enabled', 'base_build_num')
+
     def __init__(self, frame, pid, data):
         super(UserOptionsEvent, self).__init__(frame, pid)
         #:
@@ -128,62 +140,15 @@ class AbilityEvent(GameEvent):
     See :class:`LocationAbilityEvent`, :class:`TargetAbilityEvent`, and :class:`SelfAbilityEvent`
     for individual details.
     """
+    __slots__ = ('flags', 'has_ability', 'ability_link', 'command_index', 'ability_data', 'ability', 'ability_name', 'ability_type', 'ability_type_data', 'other_unit_id', 'other_unit')
+    table_columns = GameEvent.table_columns + (('ability_id', int), ('flags', int), ('other_unit_id', int))
+
     def __init__(self, frame, pid, data):
         super(AbilityEvent, self).__init__(frame, pid)
 
         #: Flags on the command???
         self.flags = data['flags']
 
-        #: A dictionary of possible ability flags. Flags are:
-        #:
-        #: * alternate
-        #: * queued
-        #: * preempt
-        #: * smart_click
-        #: * smart_rally
-        #: * subgroup
-        #: * set_autocast,
-        #: * set_autocast_on
-        #: * user
-        #: * data_a
-        #: * data_b
-        #: * data_passenger
-        #: * data_abil_queue_order_id,
-        #: * ai
-        #: * ai_ignore_on_finish
-        #: * is_order
-        #: * script
-        #: * homogenous_interruption,
-        #: * minimap
-        #: * repeat
-        #: * dispatch_to_other_unit
-        #: * target_self
-        #:
-        self.flag = dict(
-            alternate=0x1 & self.flags != 0,
-            queued=0x2 & self.flags != 0,
-            preempt=0x4 & self.flags != 0,
-            smart_click=0x8 & self.flags != 0,
-            smart_rally=0x10 & self.flags != 0,
-            subgroup=0x20 & self.flags != 0,
-            set_autocast=0x40 & self.flags != 0,
-            set_autocast_on=0x80 & self.flags != 0,
-            user=0x100 & self.flags != 0,
-            data_a=0x200 & self.flags != 0,
-            data_passenger=0x200 & self.flags != 0,  # alt-name
-            data_b=0x400 & self.flags != 0,
-            data_abil_queue_order_id=0x400 & self.flags != 0,  # alt-name
-            ai=0x800 & self.flags != 0,
-            ai_ignore_on_finish=0x1000 & self.flags != 0,
-            is_order=0x2000 & self.flags != 0,
-            script=0x4000 & self.flags != 0,
-            homogenous_interruption=0x8000 & self.flags != 0,
-            minimap=0x10000 & self.flags != 0,
-            repeat=0x20000 & self.flags != 0,
-            dispatch_to_other_unit=0x40000 & self.flags != 0,
-            target_self=0x80000 & self.flags != 0,
-        )
-
         #: Flag marking that the command had ability information
         self.has_ability = data['ability'] is not None
 
@@ -196,9 +161,6 @@ class AbilityEvent(GameEvent):
         #: Additional ability data.
         self.ability_data = data['ability']['ability_command_data'] if self.has_ability else 0
 
-        #: Unique identifier for the ability
-        self.ability_id = self.ability_link << 5 | self.command_index
-
         #: A reference to the ability being used
         self.ability = None
 
@@ -217,6 +179,65 @@ class AbilityEvent(GameEvent):
         #: A reference to the other unit
         self.other_unit = None
 
+    @derived
+    def ability_id(self):
+        """ Unique identifier for the ability """
+        return self.ability_link << 5 | self.command_index
+
+    @derived
+    def flag(self):
+        """
+        A dictionary of possible ability flags. Flags are:
+
+        * alternate
+        * queued
+        * preempt
+        * smart_click
+        * smart_rally
+        * subgroup
+        * set_autocast,
+        * set_autocast_on
+        * user
+        * data_a
+        * data_b
+        * data_passenger
+        * data_abil_queue_order_id,
+        * ai
+        * ai_ignore_on_finish
+        * is_order
+        * script
+        * homogenous_interruption,
+        * minimap
+        * repeat
+        * dispatch_to_other_unit
+        * target_self
+        """
+        flags = self.flags
+        return dict(
+            alternate=0x1 & flags != 0,
+            queued=0x2 & flags != 0,
+            preempt=0x4 & flags != 0,
+            smart_click=0x8 & flags != 0,
+            smart_rally=0x10 & flags != 0,
+            subgroup=0x20 & flags != 0,
+            set_autocast=0x40 & flags != 0,
+            set_autocast_on=0x80 & flags != 0,
+            user=0x100 & flags != 0,
+            data_a=0x200 & flags != 0,
+            data_passenger=0x200 & flags != 0,  # alt-name
+            data_b=0x400 & flags != 0,
+            data_abil_queue_order_id=0x400 & flags != 0,  # alt-name
+            ai=0x800 & flags != 0,
+            ai_ignore_on_finish=0x1000 & flags != 0,
+            is_order=0x2000 & flags != 0,
+            script=0x4000 & flags != 0,
+            homogenous_interruption=0x8000 & flags != 0,
+            minimap=0x10000 & flags != 0,
+            repeat=0x20000 & flags != 0,
+            dispatch_to_other_unit=0x40000 & flags != 0,
+            target_self=0x80000 & flags != 0,
+        )
+
     def __str__(self):
         string = self._str_prefix()
         if self.has_ability:
@@ -246,6 +267,9 @@ class LocationAbilityEvent(AbilityEvent):
     Note that like all AbilityEvents, the event will be recorded regardless
     of whether or not the command was successful.
     """
+    __slots__ = ('x', 'y', 'z')
+    table_columns = AbilityEvent.table_columns + (('x', float), ('y', float))
+
     def __init__(self, frame, pid, data):
         super(LocationAbilityEvent, self).__init__(frame, pid, data)
 
@@ -258,8 +282,10 @@ class LocationAbilityEvent(AbilityEvent):
         #: The z coordinate of the target. Available for TargetPoint and TargetUnit type events.
         self.z = self.ability_type_data['point'].get('z', 0)
 
-        #: The location of the target. Available for TargetPoint and TargetUnit type events
-        self.location = (self.x, self.y, self.z)
+    @derived
+    def location(self):
+        """ The location of the target. Available for TargetPoint and TargetUnit type events """
+        return (self.x, self.y, self.z)
 
 
 class TargetAbilityEvent(AbilityEvent):
@@ -272,6 +298,9 @@ class TargetAbilityEvent(AbilityEvent):
 
     Note that all AbilityEvents are recorded regardless of whether or not the command was successful.
     """
+    __slots__ = ('target_flags', 'target_timer', 'target_unit_id', 'target_unit', 'target', 'target_unit_type', 'control_player_id', 'upkeep_player_id', 'x', 'y', 'z')
+    table_columns = AbilityEvent.table_columns + (('target_unit_id', int), ('target_unit_type', int), ('control_player_id', int), ('upkeep_player_id', int), ('x', float), ('y', float))
+
     def __init__(self, frame, pid, data):
         super(TargetAbilityEvent, self).__init__(frame, pid, data)
 
@@ -309,8 +338,10 @@ class TargetAbilityEvent(AbilityEvent):
         #: The z coordinate of the target. Available for TargetPoint and TargetUnit type events.
         self.z = self.ability_type_data['point'].get('z', 0)
 
-        #: The location of the target. Available for TargetPoint and TargetUnit type events
-        self.location = (self.x, self.y, self.z)
+    @derived
+    def location(self):
+        """ The location of the target. Available for TargetPoint and TargetUnit type events """
+        return (self.x, self.y, self.z)
 
 
 class SelfAbilityEvent(AbilityEvent):
@@ -322,6 +353,8 @@ class SelfAbilityEvent(AbilityEvent):
 
     Note that all AbilityEvents are recorded regardless of whether or not the command was successful.
     """
+    __slots__ = ('target_data',)
+
     def __init__(self, frame, pid, data):
         super(SelfAbilityEvent, self).__init__(frame, pid, data)
 
@@ -329,6 +362,10 @@ class SelfAbilityEvent(AbilityEvent):
         self.target_data = self.ability_type_data.get('data', None)
 
 
+# The event classes create_command_event can return
+create_command_event.event_classes = (AbilityEvent, TargetAbilityEvent, LocationAbilityEvent, SelfAbilityEvent)
+
+
 @loggable
 class SelectionEvent(GameEvent):
     """
@@ -341,15 +378,15 @@ class SelectionEvent(GameEvent):
     by non-player actions. When a player action updates a control group
     a :class:`HotkeyEvent` is generated.
     """
+    __slots__ = ('control_group', 'subgroup_index', 'mask_type', 'mask_data', 'new_unit_types', 'new_unit_ids', 'new_units')
+    table_columns = GameEvent.table_columns + (('control_group', int), ('subgroup_index', int))
+
     def __init__(self, frame, pid, data):
         super(SelectionEvent, self).__init__(frame, pid)
 
         #: The control group being modified. 10 for active selection
         self.control_group = data['control_group_index']
 
-        #: Deprecated, use control_group
-        self.bank = self.control_group
-
         #: ???
         self.subgroup_index = data['subgroup_index']
 
@@ -365,19 +402,27 @@ class SelectionEvent(GameEvent):
         #: The unit id data for the new units
         self.new_unit_ids = data['add_unit_tags']
 
+        #: A list of references to units added by this selection
+        self.new_units = None
+
+    @derived
+    def new_unit_info(self):
+        """ The combined type and id information for new units """
         # This stretches out the unit types and priorities to be zipped with ids.
         unit_types = chain(*[[utype]*count for (utype, subgroup_priority, intra_subgroup_priority, count) in self.new_unit_types])
         unit_subgroup_priorities = chain(*[[subgroup_priority]*count for (utype, subgroup_priority, intra_subgroup_priority, count) in self.new_unit_types])
         unit_intra_subgroup_priorities = chain(*[[intra_subgroup_priority]*count for (utype, subgroup_priority, intra_subgroup_priority, count) in self.new_unit_types])
+        return list(zip(self.new_unit_ids, unit_types, unit_subgroup_priorities, unit_intra_subgroup_priorities))
 
-        #: The combined type and id information for new units
-        self.new_unit_info = list(zip(self.new_unit_ids, unit_types, unit_subgroup_priorities, unit_intra_subgroup_priorities))
-
-        #: A list of references to units added by this selection
-        self.new_units = None
+    @derived
+    def bank(self):
+        """ Deprecated, use control_group """
+        return self.control_group
 
-        #: Deprecated, see new_units
-        self.objects = None
+    @derived
+    def objects(self):
+        """ Deprecated, see new_units """
+        return self.new_units
 
     def __str__(self):
         if self.new_units:
@@ -413,18 +458,15 @@ class ControlGroupEvent(GameEvent):
     All three events have the same set of data (shown below) but are interpretted differently.
     See the class entry for details.
     """
+    __slots__ = ('control_group', 'update_type', 'mask_type', 'mask_data')
+    table_columns = GameEvent.table_columns + (('control_group', int), ('update_type', int))
+
     def __init__(self, frame, pid, data):
         super(ControlGroupEvent, self).__init__(frame, pid)
 
         #: Index to the control group being modified
         self.control_group = data['control_group_index']
 
-        #: Deprecated, use control_group
-        self.bank = self.control_group
-
-        #: Deprecated, use control_group
-        self.hotkey = self.control_group
-
         #: The type of update being performed, 0 (set),1 (add),2 (get)
         self.update_type = data['control_group_update']
 
@@ -434,6 +476,16 @@ class ControlGroupEvent(GameEvent):
         #: The data for the mask
         self.mask_data = data['remove_mask'][1]
 
+    @derived
+    def bank(self):
+        """ Deprecated, use control_group """
+        return self.control_group
+
+    @derived
+    def hotkey(self):
+        """ Deprecated, use control_group """
+        return self.control_group
+
 
 class SetControlGroupEvent(ControlGroupEvent):
     """
@@ -442,6 +494,7 @@ class SetControlGroupEvent(ControlGroupEvent):
     This event does a straight forward replace of the current control group contents
     with the player's current selection. This event doesn't have masks set.
     """
+    __slots__ = ()
 
 
 class AddToControlGroupEvent(SetControlGroupEvent):
@@ -450,6 +503,7 @@ class AddToControlGroupEvent(SetControlGroupEvent):
 
     This event adds the current selection to the control group.
     """
+    __slots__ = ()
 
 
 class GetControlGroupEvent(ControlGroupEvent):
@@ -461,6 +515,11 @@ class GetControlGroupEvent(ControlGroupEvent):
     You might have 1 medivac and 8 marines on the control group but if the 8 marines are
     inside the medivac they cannot be part of your selection.
     """
+    __slots__ = ()
+
+
+# The event classes create_control_group_event can return
+create_control_group_event.event_classes = (SetControlGroupEvent, AddToControlGroupEvent, GetControlGroupEvent, ControlGroupEvent)
 
 
 @loggable
@@ -470,6 +529,9 @@ class CameraEvent(GameEvent):
     It does not matter why the camera changed, this event simply records the current
     state of the camera after changing.
     """
+    __slots__ = ('x', 'y', 'distance', 'pitch', 'yaw')
+    table_columns = GameEvent.table_columns + (('x', float), ('y', float), ('distance', int), ('pitch', int), ('yaw', int))
+
     def __init__(self, frame, pid, data):
         super(CameraEvent, self).__init__(frame, pid)
 
@@ -479,9 +541,6 @@ class CameraEvent(GameEvent):
         #: The y coordinate of the center of the camera
         self.y = (data['target']['y'] if data['target'] is not None else 0)/256.0
 
-        #: The location of the center of the camera
-        self.location = (self.x, self.y)
-
         #: The distance to the camera target ??
         self.distance = data['distance']
 
@@ -491,6 +550,11 @@ class CameraEvent(GameEvent):
         #: The current yaw of the camera
         self.yaw = data['yaw']
 
+    @derived
+    def location(self):
+        """ The location of the center of the camera """
+        return (self.x, self.y)
+
     def __str__(self):
         return self._str_prefix() + "{0} at ({1}, {2})".format(self.name, self.x, self.y)
 
@@ -501,6 +565,9 @@ class ResourceTradeEvent(GameEvent):
     Generated when a player trades resources with another player. But not when fullfulling
     resource requests.
     """
+    __slots__ = ('sender_id', 'sender', 'recipient_id', 'recipient', 'resources')
+    table_columns = GameEvent.table_columns + (('recipient_id', int),)
+
     def __init__(self, frame, pid, data):
         super(ResourceTradeEvent, self).__init__(frame, pid)
 
@@ -519,17 +586,25 @@ class ResourceTradeEvent(GameEvent):
         #: An array of resources sent
         self.resources = data['resources']
 
-        #: Amount minerals sent
-        self.minerals = self.resources[0] if len(self.resources) >= 1 else None
+    @derived
+    def minerals(self):
+        """ Amount minerals sent """
+        return self.resources[0] if len(self.resources) >= 1 else None
 
-        #: Amount vespene sent
-        self.vespene = self.resources[1] if len(self.resources) >= 2 else None
+    @derived
+    def vespene(self):
+        """ Amount vespene sent """
+        return self.resources[1] if len(self.resources) >= 2 else None
 
-        #: Amount terrazine sent
-        self.terrazon = self.resources[2] if len(self.resources) >= 3 else None
+    @derived
+    def terrazon(self):
+        """ Amount terrazine sent """
+        return self.resources[2] if len(self.resources) >= 3 else None
 
-        #: Amount custom resource sent
-        self.custom_resource = self.resources[3] if len(self.resources) >= 4 else None
+    @derived
+    def custom_resource(self):
+        """ Amount custom resource sent """
+        return self.resources[3] if len(self.resources) >= 4 else None
 
     def __str__(self):
         return self._str_prefix() + " transfer {0} minerals, {1} gas, {2} terrazine, and {3} custom to {4}" % (self.minerals, self.vespene, self.terrazine, self.custom, self.reciever)
@@ -539,23 +614,33 @@ class ResourceRequestEvent(GameEvent):
     """
     Generated when a player creates a resource request.
     """
+    __slots__ = ('resources',)
+
     def __init__(self, frame, pid, data):
         super(ResourceRequestEvent, self).__init__(frame, pid)
 
         #: An array of resources sent
         self.resources = data['resources']
 
-        #: Amount minerals sent
-        self.minerals = self.resources[0] if len(self.resources) >= 1 else None
+    @derived
+    def minerals(self):
+        """ Amount minerals sent """
+        return self.resources[0] if len(self.resources) >= 1 else None
 
-        #: Amount vespene sent
-        self.vespene = self.resources[1] if len(self.resources) >= 2 else None
+    @derived
+    def vespene(self):
+        """ Amount vespene sent """
+        return self.resources[1] if len(self.resources) >= 2 else None
 
-        #: Amount terrazine sent
-        self.terrazon = self.resources[2] if len(self.resources) >= 3 else None
+    @derived
+    def terrazon(self):
+        """ Amount terrazine sent """
+        return self.resources[2] if len(self.resources) >= 3 else None
 
-        #: Amount custom resource sent
-        self.custom_resource = self.resources[3] if len(self.resources) >= 4 else None
+    @derived
+    def custom_resource(self):
+        """ Amount custom resource sent """
+        return self.resources[3] if len(self.resources) >= 4 else None
 
     def __str__(self):
         return self._str_prefix() + " requests {0} minerals, {1} gas, {2} terrazine, and {3} custom" % (self.minerals, self.vespene, self.terrazine, self.custom)
@@ -565,6 +650,8 @@ class ResourceRequestFulfillEvent(GameEvent):
     """
     Generated when a player accepts a resource request.
     """
+    __slots__ = ('request_id',)
+
     def __init__(self, frame, pid, data):
         super(ResourceRequestFulfillEvent, self).__init__(frame, pid)
 
@@ -576,6 +663,8 @@ class ResourceRequestCancelEvent(GameEvent):
     """
     Generated when a player cancels their resource request.
     """
+    __slots__ = ('request_id',)
+
     def __init__(self, frame, pid, data):
         super(ResourceRequestCancelEvent, self).__init__(frame, pid)
 
@@ -587,6 +676,8 @@ class HijackReplayGameEvent(GameEvent):
     """
     Generated when players take over from a replay.
     """
+    __slots__ = ('method', 'user_infos')
+
     def __init__(self, frame, pid, data):
         super(HijackReplayGameEvent, self).__init__(frame, pid)
 
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, print_function, unicode_literals, division
 
-from sc2reader.events.base import Event
+from sc2reader.events.base import Event, derived
 from sc2reader.utils import Length
 from sc2reader.log_utils import loggable
 
@@ -11,6 +11,11 @@ class MessageEvent(Event):
     """
         Parent class for all message events.
     """
+    __slots__ = ('pid', 'frame', 'player')
+
+    #: The attributes kept by :meth:`~sc2reader.resources.Replay.event_table`
+    table_columns = (('frame', int), ('pid', int))
+
     def __init__(self, frame, pid):
         #: The user id (or player id for older replays) of the person that generated the event.
         self.pid = pid
@@ -18,11 +23,10 @@ class MessageEvent(Event):
         #: The frame of the game this event was applied
         self.frame = frame
 
-        #: The second of the game (game time not real time) this event was applied
-        self.second = frame >> 4
-
-        #: Short cut string for event class name
-        self.name = self.__class__.__name__
+    @derived
+    def second(self):
+        """ The second of the game (game time not real time) this event was applied """
+        return self.frame >> 4
 
     def _str_prefix(self):
         player_name = self.player.name if getattr(self, 'pid', 16) != 16 else "Global"
@@ -37,6 +41,9 @@ class ChatEvent(MessageEvent):
     """
         Records in-game chat events.
     """
+    __slots__ = ('target', 'text')
+    table_columns = MessageEvent.table_columns + (('target', int),)
+
     def __init__(self, frame, pid, target, text):
         super(ChatEvent, self).__init__(frame, pid)
         #: The numerical target type. 0 = to all; 2 = to allies; 4 = to observers.
@@ -45,14 +52,20 @@ class ChatEvent(MessageEvent):
         #: The text of the message.
         self.text = text
 
-        #: Flag marked true of message was to all.
-        self.to_all = (self.target == 0)
+    @derived
+    def to_all(self):
+        """ Flag marked true of message was to all. """
+        return self.target == 0
 
-        #: Flag marked true of message was to allies.
-        self.to_allies = (self.target == 2)
+    @derived
+    def to_allies(self):
+        """ Flag marked true of message was to allies. """
+        return self.target == 2
 
-        #: Flag marked true of message was to observers.
-        self.to_observers = (self.target == 4)
+    @derived
+    def to_observers(self):
+        """ Flag marked true of message was to observers. """
+        return self.target == 4
 
 
 @loggable
@@ -60,6 +73,9 @@ class ProgressEvent(MessageEvent):
     """
         Sent during the load screen to update load process for other clients.
     """
+    __slots__ = ('progress',)
+    table_columns = MessageEvent.table_columns + (('progress', int),)
+
     def __init__(self, frame, pid, progress):
         super(ProgressEvent, self).__init__(frame, pid)
 
@@ -72,26 +88,37 @@ class PingEvent(MessageEvent):
     """
         Records pings made by players in game.
     """
+    __slots__ = ('target', 'x', 'y')
+    table_columns = MessageEvent.table_columns + (('target', int), ('x', int), ('y', int))
+
     def __init__(self, frame, pid, target, x, y):
         super(PingEvent, self).__init__(frame, pid)
 
         #: The numerical target type. 0 = to all; 2 = to allies; 4 = to observers.
         self.target = target
 
-        #: Flag marked true of message was to all.
-        self.to_all = (self.target == 0)
-
-        #: Flag marked true of message was to allies.
-        self.to_allies = (self.target == 2)
-
-        #: Flag marked true of message was to observers.
-        self.to_observers = (self.target == 4)
-
         #: The x coordinate of the target location
         self.x = x
 
         #: The y coordinate of the target location
         self.y = y
 
-        #: The (x,y) coordinate of the target location
-        self.location = (self.x, self.y)
+    @derived
+    def to_all(self):
+        """ Flag marked true of message was to all. """
+        return self.target == 0
+
+    @derived
+    def to_allies(self):
+        """ Flag marked true of message was to allies. """
+        return self.target == 2
+
+    @derived
+    def to_observers(self):
+        """ Flag marked true of message was to observers. """
+        return self.target == 4
+
+    @derived
+    def location(self):
+        """ The (x,y) coordinate of the target location """
+        return (self.x, self.y)
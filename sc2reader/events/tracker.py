@@ -3,7 +3,7 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 
 import functools
 
-from sc2reader.events.base import Event
+from sc2reader.events.base import Event, derived
 from sc2reader.utils import Length
 
 clamp = functools.partial(max, 0)
@@ -13,12 +13,19 @@ class TrackerEvent(Event):
     """
     Parent class for all tracker events.
     """
+    __slots__ = ('frame',)
+
+    #: The attributes kept by :meth:`~sc2reader.resources.Replay.event_table`
+    table_columns = (('frame', int),)
+
     def __init__(self, frames):
         #: The frame of the game this event was applied
         self.frame = frames
-        self.second = frames >> 4
-        #: Short cut string for event class name
-        self.name = self.__class__.__name__
+
+    @derived
+    def second(self):
+        """ The second of the game this event was applied """
+        return self.frame >> 4
 
     def load_context(self, replay):
         pass
@@ -42,6 +49,52 @@ class PlayerStatsEvent(TrackerEvent):
     In 1v1 games, the above behavior can cause the losing player to have 2 events generated at the
     end of the game. One for leaving and one for the  end of the game.
     """
+    #: The stat attributes, in the order of the raw stats they are read from
+    stat_names = (
+        'minerals_current',
+        'vespene_current',
+        'minerals_collection_rate',
+        'vespene_collection_rate',
+        'workers_active_count',
+        'minerals_used_in_progress_army',
+        'minerals_used_in_progress_economy',
+        'minerals_used_in_progress_technology',
+        'vespene_used_in_progress_army',
+        'vespene_used_in_progress_economy',
+        'vespene_used_in_progress_technology',
+        'minerals_used_current_army',
+        'minerals_used_current_economy',
+        'minerals_used_current_technology',
+        'vespene_used_current_army',
+        'vespene_used_current_economy',
+        'vespene_used_current_technology',
+        'minerals_lost_army',
+        'minerals_lost_economy',
+        'minerals_lost_technology',
+        'vespene_lost_army',
+        'vespene_lost_economy',
+        'vespene_lost_technology',
+        'minerals_killed_army',
+        'minerals_killed_economy',
+        'minerals_killed_technology',
+        'vespene_killed_army',
+        'vespene_killed_economy',
+        'vespene_killed_technology',
+        'food_used',
+        'food_made',
+        'minerals_used_active_forces',
+        'vespene_used_active_forces',
+        'ff_minerals_lost_army',
+        'ff_minerals_lost_economy',
+        'ff_minerals_lost_technology',
+        'ff_vespene_lost_army',
+        'ff_vespene_lost_economy',
+        'ff_vespene_lost_technology',
+    )
+    __slots__ = ('pid', 'player', 'stats') + stat_names
+    table_columns = TrackerEvent.table_columns + (('pid', int),) + tuple(
+        (name, float if name in ('food_used', 'food_made') else int) for name in stat_names)
+
     def __init__(self, frames, data, build):
         super(PlayerStatsEvent, self).__init__(frames)
 
@@ -78,9 +131,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total mineral cost of technology research (buildings?) currently being built/queued
         self.minerals_used_in_progress_technology = clamp(self.stats[7])
 
-        #: The total mineral cost of all things in progress
-        self.minerals_used_in_progress = self.minerals_used_in_progress_army + self.minerals_used_in_progress_economy + self.minerals_used_in_progress_technology
-
         #: The total vespene cost of army units (buildings?) currently being built/queued
         self.vespene_used_in_progress_army = clamp(self.stats[8])
 
@@ -90,12 +140,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total vespene cost of technology research (buildings?) currently being built/queued.
         self.vespene_used_in_progress_technology = clamp(self.stats[10])
 
-        #: The total vespene cost of all things in progress
-        self.vespene_used_in_progress = self.vespene_used_in_progress_army + self.vespene_used_in_progress_economy + self.vespene_used_in_progress_technology
-
-        #: The total cost of all things in progress
-        self.resources_used_in_progress = self.minerals_used_in_progress + self.vespene_used_in_progress
-
         #: The total mineral cost of current army units (buildings?)
         self.minerals_used_current_army = clamp(self.stats[11])
 
@@ -105,9 +149,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total mineral cost of current technology research (buildings?)
         self.minerals_used_current_technology = clamp(self.stats[13])
 
-        #: The total mineral cost of all current things
-        self.minerals_used_current = self.minerals_used_current_army + self.minerals_used_current_economy + self.minerals_used_current_technology
-
         #: The total vespene cost of current army units (buildings?)
         self.vespene_used_current_army = clamp(self.stats[14])
 
@@ -117,12 +158,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total vespene cost of current technology research (buildings?)
         self.vespene_used_current_technology = clamp(self.stats[16])
 
-        #: The total vepsene cost of all current things
-        self.vespene_used_current = self.vespene_used_current_army + self.vespene_used_current_economy + self.vespene_used_current_technology
-
-        #: The total cost of all things current
-        self.resources_used_current = self.minerals_used_current + self.vespene_used_current
-
         #: The total mineral cost of all army units (buildings?) lost
         self.minerals_lost_army = clamp(self.stats[17])
 
@@ -132,9 +167,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total mineral cost of all technology research (buildings?) lost
         self.minerals_lost_technology = clamp(self.stats[19])
 
-        #: The total mineral cost of all lost things
-        self.minerals_lost = self.minerals_lost_army + self.minerals_lost_economy + self.minerals_lost_technology
-
         #: The total vespene cost of all army units (buildings?) lost
         self.vespene_lost_army = clamp(self.stats[20])
 
@@ -144,12 +176,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total vespene cost of all technology research (buildings?) lost
         self.vespene_lost_technology = clamp(self.stats[22])
 
-        #: The total vepsene cost of all lost things
-        self.vespene_lost = self.vespene_lost_army + self.vespene_lost_economy + self.vespene_lost_technology
-
-        #: The total resource cost of all lost things
-        self.resources_lost = self.minerals_lost + self.vespene_lost
-
         #: The total mineral value of enemy army units (buildings?) killed
         self.minerals_killed_army = clamp(self.stats[23])
 
@@ -159,9 +185,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total mineral value of enemy technology research (buildings?) killed
         self.minerals_killed_technology = clamp(self.stats[25])
 
-        #: The total mineral value of all killed things
-        self.minerals_killed = self.minerals_killed_army + self.minerals_killed_economy + self.minerals_killed_technology
-
         #: The total vespene value of enemy army units (buildings?) killed
         self.vespene_killed_army = clamp(self.stats[26])
 
@@ -171,12 +194,6 @@ class PlayerStatsEvent(TrackerEvent):
         #: The total vespene value of enemy technology research (buildings?) killed
         self.vespene_killed_technology = clamp(self.stats[28])
 
-        #: The total vespene cost of all killed things
-        self.vespene_killed = self.vespene_killed_army + self.vespene_killed_economy + self.vespene_killed_technology
-
-        #: The total resource cost of all killed things
-        self.resources_killed = self.minerals_killed + self.vespene_killed
-
         #: The food supply currently used
         self.food_used = clamp(self.stats[29])/4096.0
 
@@ -207,6 +224,66 @@ class PlayerStatsEvent(TrackerEvent):
         #: Vespene of technology value lost to friendly fire
         self.ff_vespene_lost_technology = clamp(self.stats[38]) if build >= 26490 else None
 
+    @derived
+    def minerals_used_in_progress(self):
+        """ The total mineral cost of all things in progress """
+        return self.minerals_used_in_progress_army + self.minerals_used_in_progress_economy + self.minerals_used_in_progress_technology
+
+    @derived
+    def vespene_used_in_progress(self):
+        """ The total vespene cost of all things in progress """
+        return self.vespene_used_in_progress_army + self.vespene_used_in_progress_economy + self.vespene_used_in_progress_technology
+
+    @derived
+    def resources_used_in_progress(self):
+        """ The total cost of all things in progress """
+        return self.minerals_used_in_progress + self.vespene_used_in_progress
+
+    @derived
+    def minerals_used_current(self):
+        """ The total mineral cost of all current things """
+        return self.minerals_used_current_army + self.minerals_used_current_economy + self.minerals_used_current_technology
+
+    @derived
+    def vespene_used_current(self):
+        """ The total vepsene cost of all current things """
+        return self.vespene_used_current_army + self.vespene_used_current_economy + self.vespene_used_current_technology
+
+    @derived
+    def resources_used_current(self):
+        """ The total cost of all things current """
+        return self.minerals_used_current + self.vespene_used_current
+
+    @derived
+    def minerals_lost(self):
+        """ The total mineral cost of all lost things """
+        return self.minerals_lost_army + self.minerals_lost_economy + self.minerals_lost_technology
+
+    @derived
+    def vespene_lost(self):
+        """ The total vepsene cost of all lost things """
+        return self.vespene_lost_army + self.vespene_lost_economy + self.vespene_lost_technology
+
+    @derived
+    def resources_lost(self):
+        """ The total resource cost of all lost things """
+        return self.minerals_lost + self.vespene_lost
+
+    @derived
+    def minerals_killed(self):
+        """ The total mineral value of all killed things """
+        return self.minerals_killed_army + self.minerals_killed_economy + self.minerals_killed_technology
+
+    @derived
+    def vespene_killed(self):
+        """ The total vespene cost of all killed things """
+        return self.vespene_killed_army + self.vespene_killed_economy + self.vespene_killed_technology
+
+    @derived
+    def resources_killed(self):
+        """ The total resource cost of all killed things """
+        return self.minerals_killed + self.vespene_killed
+
     def __str__(self):
         return self._str_prefix()+"{0: >15} - Stats Update".format(self.player)
 
@@ -222,6 +299,9 @@ class UnitBornEvent(TrackerEvent):
     :class:`~sc2reader.event.game.AbilityEvent` game events where the ability is a train unit
     command.
     """
+    __slots__ = ('unit_id_index', 'unit_id_recycle', 'unit', 'unit_type_name', 'control_pid', 'upkeep_pid', 'unit_upkeeper', 'unit_controller', 'x', 'y')
+    table_columns = TrackerEvent.table_columns + (('unit_id', int), ('control_pid', int), ('upkeep_pid', int), ('x', int), ('y', int))
+
     def __init__(self, frames, data, build):
         super(UnitBornEvent, self).__init__(frames)
 
@@ -231,9 +311,6 @@ class UnitBornEvent(TrackerEvent):
         #: The recycle portion of the unit id
         self.unit_id_recycle = data[1]
 
-        #: The unique id of the unit being born
-        self.unit_id = self.unit_id_index << 18 | self.unit_id_recycle
-
         #: The unit object that was born
         self.unit = None
 
@@ -260,8 +337,15 @@ class UnitBornEvent(TrackerEvent):
         #: Location prior to rounding marks the center of the unit footprint.
         self.y = data[6] * 4
 
-        #: The map location of the unit birth
-        self.location = (self.x, self.y)
+    @derived
+    def unit_id(self):
+        """ The unique id of the unit being born """
+        return self.unit_id_index << 18 | self.unit_id_recycle
+
+    @derived
+    def location(self):
+        """ The map location of the unit birth """
+        return (self.x, self.y)
 
     def __str__(self):
         return self._str_prefix()+"{0: >15} - Unit born {1}".format(self.unit_upkeeper, self.unit)
@@ -272,6 +356,9 @@ class UnitDiedEvent(TrackerEvent):
     Generated when a unit dies or is removed from the game for any reason. Reasons include
     morphing, merging, and getting killed.
     """
+    __slots__ = ('unit_id_index', 'unit_id_recycle', 'unit', 'killer_pid', 'killer', 'x', 'y')
+    table_columns = TrackerEvent.table_columns + (('unit_id', int), ('killer_pid', int), ('x', int), ('y', int))
+
     def __init__(self, frames, data, build):
         super(UnitDiedEvent, self).__init__(frames)
 
@@ -281,9 +368,6 @@ class UnitDiedEvent(TrackerEvent):
         #: The recycle portion of the unit id
         self.unit_id_recycle = data[1]
 
-        #: The unique id of the unit being killed
-        self.unit_id = self.unit_id_index << 18 | self.unit_id_recycle
-
         #: The unit object that died
         self.unit = None
 
@@ -301,8 +385,15 @@ class UnitDiedEvent(TrackerEvent):
         #: Location prior to rounding marks the center of the unit footprint.
         self.y = data[4] * 4
 
-        #: The map location the unit was killed at.
-        self.location = (self.x, self.y)
+    @derived
+    def unit_id(self):
+        """ The unique id of the unit being killed """
+        return self.unit_id_index << 18 | self.unit_id_recycle
+
+    @derived
+    def location(self):
+        """ The map location the unit was killed at. """
+        return (self.x, self.y)
 
     def __str__(self):
         return self._str_prefix()+"{0: >15} - Unit died {1}.".format(self.unit.owner, self.unit)
@@ -313,6 +404,9 @@ class UnitOwnerChangeEvent(TrackerEvent):
     Generated when either ownership or control of a unit is changed. Neural Parasite is an example
     of an action that would generate this event.
     """
+    __slots__ = ('unit_id_index', 'unit_id_recycle', 'unit', 'control_pid', 'upkeep_pid', 'unit_upkeeper', 'unit_controller')
+    table_columns = TrackerEvent.table_columns + (('unit_id', int), ('control_pid', int), ('upkeep_pid', int))
+
     def __init__(self, frames, data, build):
         super(UnitOwnerChangeEvent, self).__init__(frames)
 
@@ -322,9 +416,6 @@ class UnitOwnerChangeEvent(TrackerEvent):
         #: The recycle portion of the unit id
         self.unit_id_recycle = data[1]
 
-        #: The unique id of the unit changing ownership
-        self.unit_id = self.unit_id_index << 18 | self.unit_id_recycle
-
         #: The unit object that is affected by this event
         self.unit = None
 
@@ -340,6 +431,11 @@ class UnitOwnerChangeEvent(TrackerEvent):
         #: The player object that controls this unit. 0 means neutral unit
         self.unit_controller = None
 
+    @derived
+    def unit_id(self):
+        """ The unique id of the unit changing ownership """
+        return self.unit_id_index << 18 | self.unit_id_recycle
+
     def __str__(self):
         return self._str_prefix()+"{0: >15} took {1}".format(self.unit_upkeeper, self.unit)
 
@@ -350,6 +446,9 @@ class UnitTypeChangeEvent(TrackerEvent):
     Lair, Hive) and mode switches (Sieging Tanks, Phasing prisms, Burrowing roaches). There may
     be some other situations where a unit transformation is a type change and not a new unit.
     """
+    __slots__ = ('unit_id_index', 'unit_id_recycle', 'unit', 'unit_type_name')
+    table_columns = TrackerEvent.table_columns + (('unit_id', int),)
+
     def __init__(self, frames, data, build):
         super(UnitTypeChangeEvent, self).__init__(frames)
 
@@ -359,15 +458,17 @@ class UnitTypeChangeEvent(TrackerEvent):
         #: The recycle portion of the unit id
         self.unit_id_recycle = data[1]
 
-        #: The unique id of the unit changing type
-        self.unit_id = self.unit_id_index << 18 | self.unit_id_recycle
-
         #: The unit object that was changed
         self.unit = None
 
         #: The the new unit type name
         self.unit_type_name = data[2].decode('utf8')
 
+    @derived
+    def unit_id(self):
+        """ The unique id of the unit changing type """
+        return self.unit_id_index << 18 | self.unit_id_recycle
+
     def __str__(self):
         return self._str_prefix()+"{0: >15} - Unit {0} type changed to {1}".format(self.unit.owner, self.unit, self.unit_type_name)
 
@@ -376,6 +477,9 @@ class UpgradeCompleteEvent(TrackerEvent):
     """
     Generated when a player completes an upgrade.
     """
+    __slots__ = ('pid', 'player', 'upgrade_type_name', 'count')
+    table_columns = TrackerEvent.table_columns + (('pid', int), ('count', int))
+
     def __init__(self, frames, data, build):
         super(UpgradeCompleteEvent, self).__init__(frames)
 
@@ -401,6 +505,9 @@ class UnitInitEvent(TrackerEvent):
     initiated. This applies only to units which are started in game before they are finished.
     Primary examples being buildings and warp-in units.
     """
+    __slots__ = ('unit_id_index', 'unit_id_recycle', 'unit', 'unit_type_name', 'control_pid', 'upkeep_pid', 'unit_upkeeper', 'unit_controller', 'x', 'y')
+    table_columns = TrackerEvent.table_columns + (('unit_id', int), ('control_pid', int), ('upkeep_pid', int), ('x', int), ('y', int))
+
     def __init__(self, frames, data, build):
         super(UnitInitEvent, self).__init__(frames)
 
@@ -410,9 +517,6 @@ class UnitInitEvent(TrackerEvent):
         #: The recycle portion of the unit id
         self.unit_id_recycle = data[1]
 
-        #: The unique id of the stated unit
-        self.unit_id = self.unit_id_index << 18 | self.unit_id_recycle
-
         #: The unit object that was started (e.g. started to warp in)
         self.unit = None
 
@@ -439,8 +543,15 @@ class UnitInitEvent(TrackerEvent):
         #: Location prior to rounding marks the center of the unit footprint.
         self.y = data[6] * 4
 
-        #: The map location the unit was started at
-        self.location = (self.x, self.y)
+    @derived
+    def unit_id(self):
+        """ The unique id of the stated unit """
+        return self.unit_id_index << 18 | self.unit_id_recycle
+
+    @derived
+    def location(self):
+        """ The map location the unit was started at """
+        return (self.x, self.y)
 
     def __str__(self):
         return self._str_prefix()+"{0: >15} - Unit initiated {1}".format(self.unit_upkeeper, self.unit)
@@ -451,6 +562,9 @@ class UnitDoneEvent(TrackerEvent):
     The counter part to the :class:`UnitInitEvent`, generated by the game engine when an initiated
     unit is completed. E.g. warp-in finished, building finished, morph complete.
     """
+    __slots__ = ('unit_id_index', 'unit_id_recycle', 'unit')
+    table_columns = TrackerEvent.table_columns + (('unit_id', int),)
+
     def __init__(self, frames, data, build):
         super(UnitDoneEvent, self).__init__(frames)
 
@@ -460,12 +574,14 @@ class UnitDoneEvent(TrackerEvent):
         #: The recycle portion of the unit id
         self.unit_id_recycle = data[1]
 
-        #: The unique id of the finished unit
-        self.unit_id = self.unit_id_index << 18 | self.unit_id_recycle
-
         #: The unit object that was finished
         self.unit = None
 
+    @derived
+    def unit_id(self):
+        """ The unique id of the finished unit """
+        return self.unit_id_index << 18 | self.unit_id_recycle
+
     def __str__(self):
         return self._str_prefix()+"{0: >15} - Unit {1} done".format(self.unit.owner, self.unit)
 
@@ -476,6 +592,9 @@ class UnitPositionsEvent(TrackerEvent):
     the last interval. If more than 255 units were damaged, then the first 255 are reported and
     the remaining units are carried into the next interval.
     """
+    __slots__ = ('first_unit_index', 'items', 'units', 'positions')
+    table_columns = TrackerEvent.table_columns + (('first_unit_index', int),)
+
     def __init__(self, frames, data, build):
         super(UnitPositionsEvent, self).__init__(frames)
 
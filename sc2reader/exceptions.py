@@ -41,3 +41,19 @@ class ProcessError(SC2ReaderError):
 
 class FileError(SC2ReaderError):
     pass
+
+
+class LoadError(SC2ReaderError):
+    """
+    Returned in place of a resource that failed to load in a parallel batch.
+    The original exception stays in the worker process, only its message and
+    traceback are kept.
+    """
+    def __init__(self, filename, error, traceback=None):
+        self.filename = filename
+        self.error = error
+        self.traceback = traceback
+        super(LoadError, self).__init__(filename, error, traceback)
+
+    def __str__(self):
+        return "{0}: {1}".format(self.filename, self.error)
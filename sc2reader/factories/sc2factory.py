@@ -2,9 +2,18 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 from collections import defaultdict
+import hashlib
 from io import BytesIO
+import mmap
+import multiprocessing
 import os
 import sys
+import traceback
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 try:
     unicode
@@ -19,10 +28,13 @@ else:
     from urllib.parse import urlparse
 
 import re
+import tempfile
 import time
 
+import sc2reader
 from sc2reader import utils
 from sc2reader import log_utils
+from sc2reader.exceptions import LoadError
 from sc2reader.resources import Resource, Replay, Map, GameSummary, Localization
 
 
@@ -59,6 +71,20 @@ class SC2Factory(object):
     * An iterable of the above inputs
     * Directory path - Uses :meth:`~sc2reader.utils.get_files` with the appropriate extension to fine files.
 
+    In the plural context resources can also be loaded in parallel by passing
+    ``workers=N`` to spread them across a pool of N processes::
+
+        for replay in factory.load_replays('replays/', workers=4, ordered=False):
+            if isinstance(replay, LoadError):
+                print(replay.filename, replay.error)
+
+    Resources come back in the order they were given unless ``ordered=False``
+    is passed, in which case they come back as they finish. A resource that
+    fails to load is returned as a :class:`~sc2reader.exceptions.LoadError`
+    instead of stopping the batch. Results are pickled back from the workers;
+    register a plugin such as ``toDict`` to send back a summary instead of the
+    whole resource. Where the platform spawns rather than forks new processes
+    the factory, its plugins and the options must be picklable too.
     """
 
     _resource_name_map = dict(replay=Replay, map=Map)
@@ -71,6 +97,9 @@ class SC2Factory(object):
     def __init__(self, **options):
         self.plugins = list()
 
+        #: Stage timings added up over every resource loaded with ``profile=True``
+        self.timings = utils.Timings()
+
         # Bootstrap with the default options
         self.options = defaultdict(dict)
         for cls, options in self.default_options.items():
@@ -138,12 +167,50 @@ class SC2Factory(object):
 
     def load_all(self, cls, sources, options=None, **new_options):
         options = options or self._get_options(cls, **new_options)
+        if options.get('workers'):
+            return self._load_parallel(cls, sources, options)
+        return self._load_serial(cls, sources, options)
+
+    # Internal Functions
+    def _load_serial(self, cls, sources, options):
         for resource, filename in self._load_resources(sources, options=options):
             yield self._load(cls, resource, filename=filename, options=options)
 
-    # Internal Functions
+    def _load_parallel(self, cls, sources, options):
+        # Paths are loaded by the workers, anything else is read here first
+        if isinstance(sources, basestring):
+            sources = utils.get_files(sources, **options)
+
+        def tasks():
+            for source in sources:
+                if isinstance(source, (basestring, utils.DepotFile)):
+                    yield cls, source, None
+                else:
+                    try:
+                        resource, filename = self._load_resource(source, options=options)
+                        resource.seek(0)
+                        yield cls, resource.read(), filename
+                    except Exception as e:
+                        filename = getattr(source, 'name', 'Unknown')
+                        yield cls, _load_error(filename, e), filename
+
+        pool = multiprocessing.Pool(options['workers'], _init_worker, (self, options))
+        try:
+            imap = pool.imap if options.get('ordered', True) else pool.imap_unordered
+            for result in imap(_load_in_worker, tasks()):
+                result = pickle.loads(result)
+                if getattr(result, 'timings', None):
+                    self.timings.add(result.timings)
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
     def _load(self, cls, resource, filename, options):
         obj = cls(resource, filename=filename, factory=self, **options)
+        if getattr(obj, 'timings', None):
+            self.timings.add(obj.timings)
         for plugin in options.get('plugins', self._get_plugins(cls)):
             obj = plugin(obj)
         return obj
@@ -181,6 +248,10 @@ class SC2Factory(object):
     def load_local_resource_contents(self, location, **options):
         # Extract the contents so we can close the file
         with open(location, 'rb') as resource_file:
+            if options.get('mmap', False) and os.fstat(resource_file.fileno()).st_size:
+                # The map outlives the file and only the parts of the
+                # archive that get read are paged in
+                return mmap.mmap(resource_file.fileno(), 0, access=mmap.ACCESS_READ)
             return resource_file.read()
 
     def _load_resource(self, resource, options=None, **new_options):
@@ -199,9 +270,10 @@ class SC2Factory(object):
                 location = os.path.join(directory, resource)
                 contents = self.load_local_resource_contents(location, **options)
 
-            # BytesIO implements a fuller file-like object
+            # BytesIO implements a fuller file-like object, memory maps are
+            # file-like already
             resource_name = resource
-            resource = BytesIO(contents)
+            resource = contents if isinstance(contents, mmap.mmap) else BytesIO(contents)
 
         else:
             # Totally not designed for large files!!
@@ -217,6 +289,36 @@ class SC2Factory(object):
         return (resource, resource_name)
 
 
+# The factory and options used by a worker process, see SC2Factory._load_parallel
+_worker_factory = None
+_worker_options = None
+
+
+def _init_worker(factory, options):
+    global _worker_factory, _worker_options
+    _worker_factory, _worker_options = factory, options
+
+
+def _load_error(filename, e):
+    return LoadError(filename, "{0}: {1}".format(e.__class__.__name__, e), traceback.format_exc())
+
+
+def _load_in_worker(task):
+    cls, source, filename = task
+    if isinstance(source, LoadError):
+        # The source could not be read by the parent process
+        return pickle.dumps(source, pickle.HIGHEST_PROTOCOL)
+    try:
+        if filename is None:
+            resource, filename = _worker_factory._load_resource(source, options=_worker_options)
+        else:
+            resource = BytesIO(source)
+        result = _worker_factory._load(cls, resource, filename=filename, options=_worker_options)
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        return pickle.dumps(_load_error(filename or str(source), e), pickle.HIGHEST_PROTOCOL)
+
+
 class CachedSC2Factory(SC2Factory):
 
     def get_remote_cache_key(self, remote_resource):
@@ -339,3 +441,77 @@ class DoubleCachedSC2Factory(DictCachedSC2Factory, FileCachedSC2Factory):
 
         DictCachedSC2Factory.cache_set(self, cache_key, resource)
         return resource
+
+
+class ParseCachedSC2Factory(SC2Factory):
+    """
+    :param parse_cache_dir: Local directory to cache parse results in.
+
+    Extends :class:`SC2Factory`.
+
+    Caches the decoded contents of each replay data file on the file system.
+    Entries are keyed by the sha256 of the replay file, the sc2reader version
+    and the reader class, so replays that have been loaded before skip the
+    decompression and decoding of their data files. Only the reader output is
+    cached; the replay is still put together and run through the engine.
+    """
+
+    #: Changed whenever the layout of the cached objects changes
+    parse_cache_format = 2
+
+    def __init__(self, parse_cache_dir, **options):
+        super(ParseCachedSC2Factory, self).__init__(**options)
+        self.parse_cache_dir = os.path.abspath(parse_cache_dir)
+        if not os.path.isdir(self.parse_cache_dir):
+            raise ValueError("parse_cache_dir ({0}) must be an existing directory.".format(self.parse_cache_dir))
+        elif not os.access(self.parse_cache_dir, os.F_OK | os.W_OK | os.R_OK):
+            raise ValueError("Must have read/write access to {0} for parse caching.".format(self.parse_cache_dir))
+
+    def parse_cache_key(self, replay, data_file, reader):
+        # Event tables are filled in by the readers as they go
+        filehash = getattr(replay, 'filehash', None)
+        if filehash is None or replay.event_tables is not None:
+            return None
+
+        # Filtered events are cached separately from the complete set
+        reader_id = [sc2reader.__version__, str(self.parse_cache_format), reader.__class__.__module__, reader.__class__.__name__]
+        if replay.event_filter is not None:
+            event_types = replay.event_filter.event_types
+            reader_id.append(','.join(sorted(event_types)) if event_types is not None else '*')
+            reader_id.append(','.join(sorted(replay.event_filter.exclude_event_types)))
+        if replay.frame_range is not None and data_file == 'replay.game.events':
+            reader_id.append('frames {0}'.format(tuple(replay.frame_range)))
+        reader_hash = hashlib.sha256(':'.join(reader_id).encode('utf8')).hexdigest()
+        return (filehash, data_file, reader_hash[:16])
+
+    def parse_cache_has(self, cache_key):
+        return os.path.exists(self.parse_cache_path(cache_key))
+
+    def parse_cache_get(self, cache_key):
+        with open(self.parse_cache_path(cache_key), 'rb') as cache_file:
+            return pickle.load(cache_file)
+
+    def parse_cache_set(self, cache_key, value):
+        cache_path = self.parse_cache_path(cache_key)
+        cache_dir = os.path.dirname(cache_path)
+        if not os.path.exists(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:
+                # Created by another process in the mean time
+                if not os.path.isdir(cache_dir):
+                    raise
+
+        # Write to a temporary file first so that readers never see partial entries
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                pickle.dump(value, out, pickle.HIGHEST_PROTOCOL)
+            os.rename(temp_path, cache_path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+    def parse_cache_path(self, cache_key):
+        filehash, data_file, reader_hash = cache_key
+        return os.path.join(self.parse_cache_dir, filehash[:2], filehash, "{0}.{1}.pickle".format(data_file, reader_hash))
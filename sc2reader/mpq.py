@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+A small MPQ archive reader tuned for replays and maps.
+
+:class:`MPQArchive` has the parts of the ``mpyq.MPQArchive`` interface that
+sc2reader uses, ``header``, ``file`` and ``read_file``, and decodes files
+the same way. It differs in how much work it does up front and per file:
+
+* The hash table is turned into a dict when the archive is opened and the
+  hashes of the replay data file names are computed once on import, so
+  files are found without hashing their names or scanning the table.
+* Only the blocks of the files asked for are read, with a seek and read or
+  straight from a memory map or ``BytesIO`` without copying.
+* Sectors are decompressed straight from the block into a buffer the size
+  of the file instead of being copied out of the block first.
+
+Load with ``mpyq=True`` to open archives with mpyq instead.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+import bz2
+import io
+import mmap
+import struct
+import sys
+import zlib
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+MPQ_FILE_IMPLODE = 0x00000100
+MPQ_FILE_COMPRESS = 0x00000200
+MPQ_FILE_ENCRYPTED = 0x00010000
+MPQ_FILE_FIX_KEY = 0x00020000
+MPQ_FILE_SINGLE_UNIT = 0x01000000
+MPQ_FILE_DELETE_MARKER = 0x02000000
+MPQ_FILE_SECTOR_CRC = 0x04000000
+MPQ_FILE_EXISTS = 0x80000000
+
+# magic, header size, archive size, format version, sector size shift, hash
+# table offset, block table offset, hash table entries, block table entries
+HEADER = struct.Struct(str('<4s2I2H4I'))
+
+# extended block table offset, hash table offset high, block table offset high
+HEADER_EXT = struct.Struct(str('<q2H'))
+
+# magic, user data size, mpq header offset, user data header size
+USER_DATA_HEADER = struct.Struct(str('<4s3I'))
+
+#: The hash table entries that are empty or deleted
+BLOCK_INDEX_EMPTY = 0xFFFFFFFF
+BLOCK_INDEX_DELETED = 0xFFFFFFFE
+
+# The hash types used to seed hash_string
+HASH_TABLE_OFFSET, HASH_A, HASH_B, HASH_TABLE = 0, 1, 2, 3
+
+
+def _crypt_table():
+    seed = 0x00100001
+    table = [0]*0x500
+    for i in range(256):
+        index = i
+        for j in range(5):
+            seed = (seed * 125 + 3) % 0x2AAAAB
+            high = (seed & 0xFFFF) << 0x10
+            seed = (seed * 125 + 3) % 0x2AAAAB
+            table[index] = high | (seed & 0xFFFF)
+            index += 0x100
+    return table
+
+CRYPT_TABLE = _crypt_table()
+
+
+def hash_string(string, hash_type):
+    """ Returns the MPQ hash of the string for the given hash type """
+    seed1 = 0x7FED7FED
+    seed2 = 0xEEEEEEEE
+    for ch in bytearray(string.upper().encode('utf8')):
+        value = CRYPT_TABLE[(hash_type << 8) + ch]
+        seed1 = (value ^ (seed1 + seed2)) & 0xFFFFFFFF
+        seed2 = ch + seed1 + seed2 + (seed2 << 5) + 3 & 0xFFFFFFFF
+    return seed1
+
+
+def decrypt(data, key):
+    """ Returns the little endian words of the data decrypted with key """
+    count = len(data) // 4
+    words = struct.unpack(str('<{0}I').format(count), data[:count*4])
+    seed1 = key
+    seed2 = 0xEEEEEEEE
+    result = list()
+    for word in words:
+        seed2 = seed2 + CRYPT_TABLE[0x400 + (seed1 & 0xFF)] & 0xFFFFFFFF
+        word = (word ^ (seed1 + seed2)) & 0xFFFFFFFF
+        seed1 = (((~seed1 << 0x15) + 0x11111111) | (seed1 >> 0x0B)) & 0xFFFFFFFF
+        seed2 = word + seed2 + (seed2 << 5) + 3 & 0xFFFFFFFF
+        result.append(word)
+    return result
+
+
+_name_hashes = dict()
+
+
+def name_hash(filename):
+    """ Returns the (hash_a, hash_b) pair the hash table keys a file name by """
+    if filename not in _name_hashes:
+        _name_hashes[filename] = (hash_string(filename, HASH_A), hash_string(filename, HASH_B))
+    return _name_hashes[filename]
+
+#: The files read from replays, their hashes are computed on import
+REPLAY_FILES = [
+    'replay.initData',
+    'replay.details',
+    'replay.attributes.events',
+    'replay.message.events',
+    'replay.tracker.events',
+    'replay.game.events',
+]
+
+for filename in REPLAY_FILES:
+    name_hash(filename)
+
+_TABLE_KEYS = dict(hash=hash_string('(hash table)', HASH_TABLE), block=hash_string('(block table)', HASH_TABLE))
+
+
+# Python 2 zlib and bz2 don't take memoryviews
+_view = memoryview if sys.version_info[0] >= 3 else bytes
+
+
+def _decompress(data):
+    # The first byte of compressed data is the compression type
+    compression_type = bytearray(data[0:1])[0]
+    if compression_type == 0:
+        return bytes(data)
+    elif compression_type == 2:
+        return zlib.decompress(data[1:], 15)
+    elif compression_type == 16:
+        return bz2.decompress(data[1:])
+    else:
+        raise RuntimeError("Unsupported compression type.")
+
+
+class MPQArchive(object):
+    """
+    :param archive: A path or a seekable binary file object
+    :param listfile: Set to True to read the archive's list of files into ``files``
+
+    Reads the header and the hash and block tables of an MPQ archive. Files
+    are read with :meth:`read_file` as they are needed.
+    """
+    def __init__(self, archive, listfile=False):
+        #: The archive file object
+        self.file = archive if hasattr(archive, 'read') else open(archive, 'rb')
+
+        #: The MPQ header, with the same keys as ``mpyq.MPQArchive.header``
+        self.header = self._read_header()
+
+        #: The (offset, archived size, size, flags) of each block
+        self.block_table = self._read_block_table()
+
+        #: The block index of each file, keyed by its (hash_a, hash_b)
+        self.hash_table = self._read_hash_table()
+
+        #: The names of the files in the archive, if the list file was read
+        self.files = self.read_file('(listfile)').splitlines() if listfile else None
+
+    def read_file(self, filename, force_decompress=False):
+        """ Returns the contents of the named file or None if it isn't in the
+        archive. Compressed data is only decompressed when the file is smaller
+        than its block unless ``force_decompress`` is set.
+        """
+        block_index = self.hash_table.get(name_hash(filename))
+        if block_index is None:
+            return None
+
+        offset, archived_size, size, flags = self.block_table[block_index]
+        if not flags & MPQ_FILE_EXISTS or archived_size == 0:
+            return None
+        elif flags & MPQ_FILE_ENCRYPTED:
+            raise NotImplementedError("Encryption is not supported yet.")
+
+        data = self._read(offset+self.header['offset'], archived_size)
+        if flags & MPQ_FILE_SINGLE_UNIT:
+            # Compression is only used when it saves at least a byte
+            if flags & MPQ_FILE_COMPRESS and (force_decompress or size > archived_size):
+                return _decompress(data)
+            return bytes(data)
+
+        # Otherwise the block is a table of sector offsets and the sectors
+        sector_size = 512 << self.header['sector_size_shift']
+        sectors = size // sector_size + 1
+        crc = flags & MPQ_FILE_SECTOR_CRC
+        if crc:
+            sectors += 1
+        positions = struct.unpack_from(str('<{0}I').format(sectors+1), data)
+
+        result = bytearray(size)
+        used = 0
+        for i in range(len(positions) - (2 if crc else 1)):
+            sector = data[positions[i]:positions[i+1]]
+            if flags & MPQ_FILE_COMPRESS and (force_decompress or size-used > len(sector)):
+                sector = _decompress(sector)
+            result[used:used+len(sector)] = sector
+            used += len(sector)
+        del result[used:]
+        return bytes(result)
+
+    def _read(self, offset, size):
+        # Memory maps and BytesIO are sliced without a copy
+        if isinstance(self.file, mmap.mmap) and _view is memoryview:
+            return memoryview(self.file)[offset:offset+size]
+        elif isinstance(self.file, io.BytesIO) and _view is memoryview:
+            return self.file.getbuffer()[offset:offset+size]
+        self.file.seek(offset)
+        return _view(self.file.read(size))
+
+    def _read_header(self):
+        self.file.seek(0)
+        magic = self.file.read(4)
+        self.file.seek(0)
+
+        if magic == b'MPQ\x1a':
+            header = self._read_mpq_header(0)
+        elif magic == b'MPQ\x1b':
+            data = self.file.read(USER_DATA_HEADER.size)
+            user_data_header = dict(zip(['magic', 'user_data_size', 'mpq_header_offset', 'user_data_header_size'], USER_DATA_HEADER.unpack(data)))
+            user_data_header['content'] = self.file.read(user_data_header['user_data_header_size'])
+            header = self._read_mpq_header(user_data_header['mpq_header_offset'])
+            header['user_data_header'] = user_data_header
+        else:
+            raise ValueError("Invalid file header.")
+        return header
+
+    def _read_mpq_header(self, offset):
+        self.file.seek(offset)
+        names = ['magic', 'header_size', 'archive_size', 'format_version', 'sector_size_shift', 'hash_table_offset', 'block_table_offset', 'hash_table_entries', 'block_table_entries']
+        header = dict(zip(names, HEADER.unpack(self.file.read(HEADER.size))))
+        if header['format_version'] >= 1:
+            names = ['extended_block_table_offset', 'hash_table_offset_high', 'block_table_offset_high']
+            header.update(zip(names, HEADER_EXT.unpack(self.file.read(HEADER_EXT.size))))
+        header['offset'] = offset
+        return header
+
+    def _read_table(self, table_type):
+        header = self.header
+        offset = header['{0}_table_offset'.format(table_type)] | header.get('{0}_table_offset_high'.format(table_type), 0) << 32
+        entries = header['{0}_table_entries'.format(table_type)]
+        self.file.seek(offset+header['offset'])
+        return decrypt(self.file.read(entries*16), _TABLE_KEYS[table_type])
+
+    def _read_block_table(self):
+        words = self._read_table('block')
+        return [tuple(words[i:i+4]) for i in range(0, len(words), 4)]
+
+    def _read_hash_table(self):
+        # The first entry for each name wins, like mpyq
+        hash_table = dict()
+        words = self._read_table('hash')
+        for i in range(0, len(words), 4):
+            block_index = words[i+3]
+            if block_index < BLOCK_INDEX_DELETED and (words[i], words[i+1]) not in hash_table:
+                hash_table[words[i], words[i+1]] = block_index
+        return hash_table
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+Declarative descriptions of bit packed data structures.
+
+A schema is built out of the field types below and is compiled into a plain
+python function that takes a :class:`~sc2reader.decoders.BitPackedDecoder`
+and returns the decoded value::
+
+    parsers = compile_parsers(dict(
+        camera_save_event=Struct(
+            ('which', Bits(3)),
+            ('target', Struct(
+                ('x', UInt16),
+                ('y', UInt16),
+            )),
+        ),
+    ))
+    parsers['camera_save_event'](decoder)
+
+The generated functions read straight through the schema with the decoder
+methods bound to locals. There are no intermediate closures or lookup tables
+so they can be called once per event without allocating anything other than
+the values returned.
+
+Schemas can also be compiled with ``skip=True`` into functions that only move
+the decoder past the data. Runs of fixed width fields are consumed with a
+single read and strings are never decoded.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+from sc2reader.exceptions import ParseError
+
+
+class Type(object):
+    """ Base class for all field types. """
+
+    #: The number of bits the type always takes up, None if it varies.
+    width = None
+
+    def compile(self, block):
+        """ Returns a python expression for the decoded value. Any statements
+        needed before the expression can be evaluated are emitted into block.
+        If statements are emitted the expression must not read any data.
+        """
+        raise NotImplementedError()
+
+    def skip(self, block):
+        """ Emits statements into block that consume the type without
+        building its value.
+        """
+        if self.width is not None:
+            block.skip_bits(self.width)
+        else:
+            expr = self.compile(block)
+            if not block.is_var(expr):
+                block.emit(expr)
+
+
+class Const(Type):
+    """ A field that isn't in the data, always has the given value. """
+
+    width = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def compile(self, block):
+        return repr(self.value)
+
+
+class Read(Type):
+    """ A single call to a decoder method with an optional constant offset. """
+
+    WIDTHS = dict(read_bool=1, read_uint8=8, read_uint16=16, read_uint32=32, read_uint64=64)
+
+    def __init__(self, method, count=None, offset=0):
+        self.method = method
+        self.count = count
+        self.offset = offset
+        if method == 'read_bits':
+            self.width = count
+        elif method == 'read_bytes':
+            self.width = count*8
+        else:
+            self.width = self.WIDTHS.get(method)
+
+    def compile(self, block):
+        expr = "{0}({1})".format(block.method(self.method), '' if self.count is None else self.count)
+        if self.offset:
+            expr = "{0}{1:+d}".format(expr, self.offset)
+        return expr
+
+
+class Sized(Type):
+    """ A decoder method called with a length read from the data. """
+
+    def __init__(self, method, length):
+        self.method = method
+        self.length = length
+
+    def compile(self, block):
+        return "{0}({1})".format(block.method(self.method), self.length.compile(block))
+
+    def skip(self, block):
+        # Strings don't need to be decoded
+        method = 'read_aligned_bytes' if self.method == 'read_aligned_string' else self.method
+        block.emit("{0}({1})".format(block.method(method), self.length.compile(block)))
+
+
+class Optional(Type):
+    """ A value preceded by a bit flagging its presence. When absent the
+    value of the absent type is used, None by default.
+    """
+
+    def __init__(self, type, absent=None):
+        self.type = type
+        self.absent = absent if absent is not None else Null
+
+    def compile(self, block):
+        absent = self.absent.compile(block.scratch())
+        scratch = block.scratch()
+        expr = self.type.compile(scratch)
+        if not scratch.lines:
+            return "({0} if {1}() else {2})".format(expr, block.method('read_bool'), absent)
+
+        var = block.var()
+        block.emit("if {0}():".format(block.method('read_bool')))
+        inner = block.child()
+        inner.emit("{0} = {1}".format(var, self.type.compile(inner)))
+        block.extend(inner)
+        block.emit("else:")
+        block.emit("    {0} = {1}".format(var, absent))
+        return var
+
+    def skip(self, block):
+        if self.type.width == 0:
+            block.emit("{0}()".format(block.method('read_bool')))
+        else:
+            block.emit("if {0}():".format(block.method('read_bool')))
+            inner = block.child()
+            self.type.skip(inner)
+            block.extend(inner)
+
+
+class Array(Type):
+    """ A list of values preceded by its length. """
+
+    def __init__(self, length, type):
+        self.length = length
+        self.type = type
+
+    def compile(self, block):
+        length = self.length.compile(block)
+        scratch = block.scratch()
+        expr = self.type.compile(scratch)
+        if not scratch.lines:
+            return "[{0} for _ in range({1})]".format(expr, length)
+
+        var = block.var()
+        block.emit("{0} = []".format(var))
+        block.emit("for _ in range({0}):".format(length))
+        inner = block.child()
+        inner.emit("{0}.append({1})".format(var, self.type.compile(inner)))
+        block.extend(inner)
+        return var
+
+    def skip(self, block):
+        length = self.length.compile(block)
+        if self.type.width == 0:
+            block.emit(length)
+        elif self.type.width is not None:
+            # Fixed width elements can be consumed all at once
+            block.emit("{0}({1}*{2})".format(block.method('read_bits'), self.type.width, length))
+        else:
+            block.emit("for _ in range({0}):".format(length))
+            inner = block.child()
+            self.type.skip(inner)
+            block.extend(inner)
+
+
+class Choice(Type):
+    """ One of several tagged values, selected by an index read from the data.
+    Decodes to a ``(tag, value)`` tuple.
+    """
+
+    def __init__(self, bits, options):
+        self.bits = bits
+        self.options = options
+
+    def compile(self, block):
+        return self._compile(block, skip=False)
+
+    def skip(self, block):
+        self._compile(block, skip=True)
+
+    def _compile(self, block, skip):
+        index, var = block.var(), block.var()
+        block.emit("{0} = {1}({2})".format(index, block.method('read_bits'), self.bits))
+        for i, (key, (tag, type)) in enumerate(sorted(self.options.items())):
+            block.emit("{0} {1} == {2}:".format('if' if i == 0 else 'elif', index, key))
+            inner = block.child()
+            if skip:
+                type.skip(inner)
+                if not inner.lines:
+                    inner.emit("pass")
+            else:
+                inner.emit("{0} = ('{1}', {2})".format(var, tag, type.compile(inner)))
+            block.extend(inner)
+        block.emit("else:")
+        block.emit("    raise ParseError('Unknown choice {{0}}'.format({0}))".format(index))
+        return var
+
+
+class Tagged(Type):
+    """ A value paired with a constant tag as a ``(tag, value)`` tuple. """
+
+    def __init__(self, tag, type):
+        self.tag = tag
+        self.type = type
+        self.width = type.width
+
+    def compile(self, block):
+        return "('{0}', {1})".format(self.tag, self.type.compile(block))
+
+    def skip(self, block):
+        self.type.skip(block)
+
+
+class Struct(Type):
+    """ A dict of named fields decoded in the order given. """
+
+    def __init__(self, *fields):
+        self.fields = fields
+        widths = [type.width for name, type in fields]
+        self.width = None if None in widths else sum(widths)
+
+    def compile(self, block):
+        # Fields up to the last one that needs statements are decoded into
+        # variables first to keep them in order, the rest are read inline.
+        hoist = 0
+        for i, (name, type) in enumerate(self.fields):
+            scratch = block.scratch()
+            type.compile(scratch)
+            if scratch.lines:
+                hoist = i+1
+
+        exprs = list()
+        for i, (name, type) in enumerate(self.fields):
+            expr = type.compile(block)
+            if i < hoist and not isinstance(type, Const) and not block.is_var(expr):
+                var = block.var()
+                block.emit("{0} = {1}".format(var, expr))
+                expr = var
+            exprs.append((name, expr))
+        return "{{{0}}}".format(", ".join("'{0}': {1}".format(name, expr) for name, expr in exprs))
+
+    def skip(self, block):
+        # Consume runs of fixed width fields with a single read
+        bits = 0
+        for name, type in self.fields:
+            if type.width is not None:
+                bits += type.width
+            else:
+                block.skip_bits(bits)
+                bits = 0
+                type.skip(block)
+        block.skip_bits(bits)
+
+
+class Call(Type):
+    """ Defers to a function taking the decoder and any decoded arguments. """
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def compile(self, block):
+        args = ['data']+[arg.compile(block) for arg in self.args]
+        return "{0}({1})".format(block.function(self.function), ", ".join(args))
+
+
+#: Common types
+Null = Const(None)
+Bool = Read('read_bool')
+UInt8 = Read('read_uint8')
+UInt16 = Read('read_uint16')
+UInt32 = Read('read_uint32')
+Int8 = Read('read_uint8', offset=-128)
+Int32 = Read('read_uint32', offset=-2147483648)
+
+
+def Bits(count):
+    """ An unsigned integer ``count`` bits long. """
+    return Read('read_bits', count)
+
+
+def Bytes(count):
+    """ ``count`` bytes, not aligned. """
+    return Read('read_bytes', count)
+
+
+def String(length):
+    """ A byte aligned utf8 string preceded by its length. """
+    return Sized('read_aligned_string', length)
+
+
+def Blob(length):
+    """ Byte aligned raw bytes preceded by their length. """
+    return Sized('read_aligned_bytes', length)
+
+
+class Block(object):
+    """ Collects indented lines of generated source. """
+
+    def __init__(self, compiler, indent):
+        self.compiler = compiler
+        self.indent = indent
+        self.lines = list()
+
+    def emit(self, line):
+        self.lines.append("    "*self.indent+line)
+
+    def extend(self, block):
+        self.lines.extend(block.lines)
+
+    def child(self):
+        return Block(self.compiler, self.indent+1)
+
+    def scratch(self):
+        return Block(self.compiler, self.indent)
+
+    def var(self):
+        self.compiler.count += 1
+        return "v{0}".format(self.compiler.count)
+
+    def is_var(self, expr):
+        return expr.startswith('v') and expr[1:].isdigit()
+
+    def method(self, name):
+        self.compiler.methods.add(name)
+        return name
+
+    def function(self, function):
+        functions = self.compiler.functions
+        if function not in functions:
+            functions[function] = "f{0}".format(len(functions))
+            self.compiler.namespace[functions[function]] = function
+        return functions[function]
+
+    def skip_bits(self, count):
+        if count:
+            self.emit("{0}({1})".format(self.method('read_bits'), count))
+
+
+class Compiler(object):
+    """ Generates the source for a parser function from a schema. """
+
+    def __init__(self):
+        self.namespace = dict(ParseError=ParseError)
+        self.functions = dict()
+
+    def compile(self, name, schema, skip=False):
+        self.count = 0
+        self.methods = set()
+        body = Block(self, 1)
+        if schema is None:
+            expr = 'None'
+        elif skip:
+            schema.skip(body)
+            expr = 'None'
+        else:
+            expr = schema.compile(body)
+        lines = ["def {0}(data):".format(name)]
+        lines.extend("    {0} = data.{0}".format(method) for method in sorted(self.methods))
+        lines.extend(body.lines)
+        lines.append("    return {0}".format(expr))
+        return "\n".join(lines)
+
+
+def compile_parsers(schemas, skip=False):
+    """ Compiles a dict of named schemas into a dict of parser functions. A
+    schema of None compiles to a parser that reads nothing and returns None.
+
+    With ``skip=True`` the functions consume the data and always return None.
+    """
+    compiler = Compiler()
+    source = "\n\n".join(compiler.compile(name, schema, skip) for name, schema in sorted(schemas.items()))
+    namespace = compiler.namespace
+    exec(compile(source, "<sc2reader.protocol>", "exec"), namespace)
+    return dict((name, namespace[name]) for name in schemas)
@@ -1,20 +1,349 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, print_function, unicode_literals, division
 
+import array
+import bisect
+import sys
 import struct
+from operator import attrgetter
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import sc2reader.events
 from sc2reader.exceptions import ParseError, ReadError
 from sc2reader.objects import *
 from sc2reader.events.game import *
 from sc2reader.events.message import *
 from sc2reader.events.tracker import *
-from sc2reader.utils import AttributeDict, DepotFile
-from sc2reader.decoders import BitPackedDecoder, ByteDecoder
+from sc2reader.utils import AttributeDict, BuildIndex, DepotFile
+from sc2reader.decoders import BitPackedDecoder, ByteDecoder, CursorBitPackedDecoder
+from sc2reader.protocol import compile_parsers, Call, Struct, Optional, Array, Choice, Tagged, \
+    Null, Bool, UInt8, UInt16, UInt32, Int8, Int32, Bits, Bytes, String, Blob
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+class EventFilter(object):
+    """
+    :param event_types: Event classes or class names to keep
+    :param exclude_event_types: Event classes or class names to drop
+
+    Decides which events the readers build for the ``event_types`` and
+    ``exclude_event_types`` replay options. Names match subclasses so
+    ``'AbilityEvent'`` keeps every kind of ability event. Events that are
+    filtered out are skipped over without being created.
+    """
+    def __init__(self, event_types=None, exclude_event_types=None):
+        self.event_types = self._names(event_types) if event_types is not None else None
+        self.exclude_event_types = self._names(exclude_event_types or [])
+        self._accepts = dict()
+
+    def accepts(self, event_class):
+        """ Returns true if events of the given class should be kept """
+        if event_class not in self._accepts:
+            names = set(cls.__name__ for cls in event_class.__mro__)
+            self._accepts[event_class] = (self.event_types is None or bool(names & self.event_types)) and not (names & self.exclude_event_types)
+        return self._accepts[event_class]
+
+    def check(self, event_class):
+        """ Returns True if all events created by event_class are kept, False
+        if none are and None if it depends on the event. Factory functions
+        list the classes they create in an ``event_classes`` attribute.
+        """
+        accepted = set(self.accepts(cls) for cls in getattr(event_class, 'event_classes', [event_class]))
+        return accepted.pop() if len(accepted) == 1 else None
+
+    def _names(self, event_types):
+        return set(t if isinstance(t, basestring) else t.__name__ for t in event_types)
+
+
+class AnyFilter(object):
+    """ Keeps the events that any of the given filters keep. """
+    def __init__(self, *filters):
+        self.filters = filters
+
+    def accepts(self, event_class):
+        return any(f.accepts(event_class) for f in self.filters)
+
+    def check(self, event_class):
+        checks = set(f.check(event_class) for f in self.filters)
+        if True in checks:
+            return True
+        return False if checks == set([False]) else None
+
+
+# Prefer 64 bit integers where the platform's array module has them
+INT_TYPECODE = str('q') if 'q' in getattr(array, 'typecodes', '') else str('l')
+
+
+class EventTable(object):
+    """
+    :param columns: ``(attribute, int or float)`` pairs to keep for each event
+
+    Keeps the given attributes of the events appended to it in one array per
+    attribute. Missing integer values are stored as -1 and missing floats as
+    NaN.
+    """
+    def __init__(self, columns):
+        #: The attribute names, in column order
+        self.names = [name for name, kind in columns]
+        self.arrays = [array.array(str('d') if kind is float else INT_TYPECODE) for name, kind in columns]
+        self._missing = [float('nan') if kind is float else -1 for name, kind in columns]
+        self._values = self._getter(self.names)
+
+    @staticmethod
+    def _getter(names):
+        # attrgetter only returns a tuple for more than one name
+        if len(names) == 1:
+            return lambda event: (getattr(event, names[0]),)
+        return attrgetter(*names)
+
+    def append(self, event):
+        for column, value, missing in zip(self.arrays, self._values(event), self._missing):
+            column.append(missing if value is None else value)
+
+    def export(self):
+        """ Returns a dict of numpy arrays by attribute name, or of the
+        array.array columns when numpy isn't installed.
+        """
+        if numpy is None:
+            return dict(zip(self.names, self.arrays))
+        return dict((name, numpy.array(column, dtype=column.typecode)) for name, column in zip(self.names, self.arrays))
+
+    def __len__(self):
+        return len(self.arrays[0])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_values']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._values = self._getter(self.names)
+
+
+def _stat_totals():
+    # The same totals PlayerStatsEvent adds up, such as minerals_lost
+    totals = dict()
+    for kind in ['used_in_progress', 'used_current', 'lost', 'killed']:
+        for resource in ['minerals', 'vespene']:
+            totals[resource+'_'+kind] = tuple('{0}_{1}_{2}'.format(resource, kind, part) for part in ['army', 'economy', 'technology'])
+        totals['resources_'+kind] = totals['minerals_'+kind] + totals['vespene_'+kind]
+    return totals
+
+
+class PlayerStatsSeries(object):
+    """
+    The :class:`~sc2reader.events.tracker.PlayerStatsEvent` samples of one
+    player. :attr:`values` has a row for each sample and a column for each
+    stat in :attr:`columns`, with the clamped integers the events are made
+    from. Stats and the totals in :attr:`totals` can be read by name, as
+    items or attributes, which gives a vector with a value per sample.
+    """
+
+    #: The stat names in column order, as named on PlayerStatsEvent
+    columns = PlayerStatsEvent.stat_names
+
+    #: The derived totals, each the sum of the stat columns it is made of
+    totals = _stat_totals()
+
+    # Food is recorded in 4096ths of a supply
+    food_columns = ('food_used', 'food_made')
+
+    def __init__(self):
+        self._frames = array.array(INT_TYPECODE)
+        self._values = array.array(INT_TYPECODE)
+        self._matrix = None
+
+    def append(self, frame, stats, count):
+        """ Adds a sample of the first count raw stats, the rest are -1 """
+        self._frames.append(frame)
+        self._values.extend([max(0, stats[i]) for i in range(count)])
+        self._values.extend([-1]*(len(self.columns)-count))
+        self._matrix = None
+
+    @property
+    def frames(self):
+        """ The frame of each sample """
+        if numpy is None:
+            return self._frames
+        return numpy.array(self._frames, dtype=self._frames.typecode)
+
+    @property
+    def values(self):
+        """ An (n_samples, n_stats) numpy array, or a list of rows without numpy """
+        if numpy is None:
+            n_stats = len(self.columns)
+            return [self._values[i:i+n_stats] for i in range(0, len(self._values), n_stats)]
+        if self._matrix is None:
+            self._matrix = numpy.array(self._values, dtype=self._values.typecode).reshape(len(self), len(self.columns))
+        return self._matrix
+
+    def __getitem__(self, name):
+        if name in self.totals:
+            columns = [self.columns.index(column) for column in self.totals[name]]
+            if numpy is None:
+                return array.array(INT_TYPECODE, map(sum, zip(*[self._column(i) for i in columns])))
+            return self.values[:, columns].sum(axis=1)
+
+        column = self._column(self.columns.index(name))
+        if name in self.food_columns:
+            return column/4096.0 if numpy is not None else array.array(str('d'), (value/4096.0 for value in column))
+        return column
+
+    def __getattr__(self, name):
+        if name in self.columns or name in self.totals:
+            return self[name]
+        raise AttributeError("'PlayerStatsSeries' object has no attribute '{0}'".format(name))
+
+    def __len__(self):
+        return len(self._frames)
+
+    def _column(self, index):
+        if numpy is None:
+            return self._values[index::len(self.columns)]
+        return self.values[:, index]
+
+
+class PlayerStatsMatrix(dict):
+    """
+    A :class:`PlayerStatsSeries` for each player with stats, keyed by pid,
+    filled in by the tracker reader from the raw stats without creating
+    events. Friendly fire stats are -1 before build 26490.
+    """
+    def add(self, frame, pid, stats, build):
+        if pid not in self:
+            self[pid] = PlayerStatsSeries()
+        self[pid].append(frame, stats, 39 if build >= 26490 else 33)
+
+
+class EventTables(dict):
+    """
+    :param event_types: Event class names to keep tables for
+    :param player_stats: A PlayerStatsMatrix for the readers to fill, if any
+
+    The :class:`EventTable` for each event type given, filled in by the
+    readers for the ``event_tables`` replay option. Like :class:`EventFilter`
+    names match subclasses, so the ``'AbilityEvent'`` table has a row for
+    every kind of ability event. Its columns are the ``table_columns``
+    declared by the named class.
+    """
+    def __init__(self, event_types, player_stats=None):
+        super(EventTables, self).__init__()
+        self.player_stats = player_stats
+        for name in event_types:
+            event_class = getattr(sc2reader.events, name, None)
+            if not hasattr(event_class, 'table_columns'):
+                raise ValueError("No event table for {0}".format(name))
+            self[name] = EventTable(event_class.table_columns)
+
+        #: Accepts the events that have a table
+        self.event_filter = EventFilter(event_types=list(self.keys()))
+        self._tables = dict()
+
+    def add(self, event):
+        """ Appends the event to the tables for its type """
+        tables = self._tables.get(event.__class__)
+        if tables is None:
+            names = set(cls.__name__ for cls in event.__class__.__mro__)
+            tables = self._tables[event.__class__] = [table for name, table in self.items() if name in names]
+        for table in tables:
+            table.append(event)
+
+
+class SeekIndex(object):
+    """
+    :param interval: The number of game events between checkpoints
+    :param path: Where the index is saved, if anywhere
+
+    Checkpoints into a replay's game events file for the ``frame_range``
+    replay option. Every game event starts on a byte boundary so a checkpoint
+    is just the byte offset of an event and the frame count before it. The
+    game events reader adds a checkpoint every ``interval`` events as it goes
+    and reads that start later in the game jump to the last checkpoint before
+    their first frame instead of decoding from the start of the file.
+    """
+
+    #: Changed whenever the layout of saved indexes changes
+    FORMAT_VERSION = 1
+
+    MAGIC = b'SC2S'
+
+    # magic, format version, interval, checkpoint count
+    HEADER = struct.Struct(str('<4sHII'))
+
+    def __init__(self, interval=1000, path=None):
+        self.interval = interval
+        self.path = path
+
+        #: The byte offset of every interval-th event
+        self.offsets = array.array(INT_TYPECODE)
+
+        #: The frame count before each of those events
+        self.frames = array.array(INT_TYPECODE)
+
+        #: True when there are checkpoints that haven't been saved
+        self.changed = False
+
+    @classmethod
+    def load(cls, path, interval=1000):
+        """ Returns the index saved at path. Indexes that are missing or in an
+        older format come back empty and are written to path when saved.
+        """
+        index = cls(interval, path)
+        try:
+            with open(path, 'rb') as index_file:
+                data = index_file.read()
+            magic, version, interval, count = cls.HEADER.unpack_from(data)
+            if magic == cls.MAGIC and version == cls.FORMAT_VERSION:
+                values = struct.unpack_from(str('<{0}Q').format(count*2), data, cls.HEADER.size)
+                # Values too large for the platform's arrays leave the index empty
+                offsets = array.array(INT_TYPECODE, values[0::2])
+                frames = array.array(INT_TYPECODE, values[1::2])
+                index.interval, index.offsets, index.frames = interval, offsets, frames
+        except (IOError, OSError, OverflowError, struct.error):
+            pass
+        return index
+
+    def save(self):
+        """ Writes the index to its path if it has new checkpoints """
+        if self.path is None or not self.changed:
+            return
+        values = [value for checkpoint in zip(self.offsets, self.frames) for value in checkpoint]
+        with open(self.path, 'wb') as index_file:
+            index_file.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, self.interval, len(self.offsets)))
+            index_file.write(struct.pack(str('<{0}Q').format(len(values)), *values))
+        self.changed = False
+
+    def add(self, offset, frame):
+        """ Appends the checkpoint for the next interval-th event """
+        self.offsets.append(offset)
+        self.frames.append(frame)
+        self.changed = True
+
+    def find(self, frame):
+        """ Returns the event number, byte offset and frame count of the last
+        checkpoint that comes before any events on the given frame.
+        """
+        checkpoint = bisect.bisect_left(self.frames, frame) - 1
+        if checkpoint < 0:
+            return 0, 0, 0
+        return checkpoint*self.interval, self.offsets[checkpoint], self.frames[checkpoint]
+
+    def __len__(self):
+        return len(self.offsets)
 
 
 class InitDataReader(object):
     def __call__(self, data, replay):
-        data = BitPackedDecoder(data)
+        data = replay.decoder(data)
         result = dict(
             user_initial_data=[dict(
                 name=data.read_aligned_string(data.read_uint8()),
@@ -128,7 +457,7 @@ class AttributesEventsReader(object):
 
 class DetailsReader(object):
     def __call__(self, data, replay):
-        details = BitPackedDecoder(data).read_struct()
+        details = replay.decoder(data).read_struct()
         return dict(
             players=[dict(
                 name=p[0].decode('utf8'),
@@ -174,11 +503,21 @@ class DetailsReader(object):
 
 class MessageEventsReader(object):
     def __call__(self, data, replay):
-        data = BitPackedDecoder(data)
+        data = replay.decoder(data)
         pings = list()
         messages = list()
         packets = list()
 
+        event_filter = replay.event_filter
+        event_tables = replay.event_tables
+        keep_chat = event_filter is None or event_filter.accepts(ChatEvent)
+        keep_ping = event_filter is None or event_filter.accepts(PingEvent)
+        keep_progress = event_filter is None or event_filter.accepts(ProgressEvent)
+        if event_tables is not None:
+            table_chat = event_tables.event_filter.accepts(ChatEvent)
+            table_ping = event_tables.event_filter.accepts(PingEvent)
+            table_progress = event_tables.event_filter.accepts(ProgressEvent)
+
         frame = 0
         while not data.done():
             frame += data.read_frames()
@@ -187,17 +526,32 @@ class MessageEventsReader(object):
             if flag == 0:  # Client chat message
                 recipient = data.read_bits(3 if replay.base_build >= 21955 else 2)
                 text = data.read_aligned_string(data.read_bits(11))
-                messages.append(ChatEvent(frame, pid, recipient, text))
+                if keep_chat or (event_tables is not None and table_chat):
+                    event = ChatEvent(frame, pid, recipient, text)
+                    if event_tables is not None:
+                        event_tables.add(event)
+                    if keep_chat:
+                        messages.append(event)
 
             elif flag == 1:  # Client ping message
                 recipient = data.read_bits(3 if replay.base_build >= 21955 else 2)
                 x = data.read_uint32()-2147483648
                 y = data.read_uint32()-2147483648
-                pings.append(PingEvent(frame, pid, recipient, x, y))
+                if keep_ping or (event_tables is not None and table_ping):
+                    event = PingEvent(frame, pid, recipient, x, y)
+                    if event_tables is not None:
+                        event_tables.add(event)
+                    if keep_ping:
+                        pings.append(event)
 
             elif flag == 2:  # Loading progress message
                 progress = data.read_uint32()-2147483648
-                packets.append(ProgressEvent(frame, pid, progress))
+                if keep_progress or (event_tables is not None and table_progress):
+                    event = ProgressEvent(frame, pid, progress)
+                    if event_tables is not None:
+                        event_tables.add(event)
+                    if keep_progress:
+                        packets.append(event)
 
             elif flag == 3:  # Server ping message
                 pass
@@ -208,135 +562,261 @@ class MessageEventsReader(object):
 
 
 class GameEventsReader_Base(object):
+    """
+    Reads the game events file using the protocol described by the class.
+
+    The protocol is declared as table diffs on each class in the hierarchy.
+    ``EVENT_TYPES`` maps event ids to ``(event_class, parser_name)`` tuples,
+    mapping an id to None removes it. ``SCHEMAS`` maps parser names to the
+    :mod:`sc2reader.protocol` schemas they decode. Where the data can't be
+    described by a schema a method with the parser name can be defined
+    instead; the most derived definition wins.
+
+    Schemas are compiled into parser functions once per class. Events without
+    an event class are never kept so they get parsers compiled with ``skip``
+    which only move the decoder past the event data.
+    """
+
+    EVENT_TYPES = {
+        0: (None, 'unknown_event'),
+        5: (None, 'finished_loading_sync_event'),
+        7: (None, 'bank_file_event'),
+        8: (None, 'bank_section_event'),
+        9: (None, 'bank_key_event'),
+        10: (None, 'bank_value_event'),
+        11: (None, 'bank_signature_event'),
+        12: (UserOptionsEvent, 'user_options_event'),
+        22: (None, 'save_game_event'),
+        23: (None, 'save_game_done_event'),
+        25: (PlayerLeaveEvent, 'player_leave_event'),
+        26: (None, 'game_cheat_event'),
+        27: (create_command_event, 'command_event'),
+        28: (SelectionEvent, 'selection_delta_event'),
+        29: (create_control_group_event, 'control_group_update_event'),
+        30: (None, 'selection_sync_check_event'),
+        31: (None, 'resource_trade_event'),
+        32: (None, 'trigger_chat_message_event'),
+        33: (None, 'ai_communicate_event'),
+        34: (None, 'set_absolute_game_speed_event'),
+        35: (None, 'add_absolute_game_speed_event'),
+        37: (None, 'broadcast_cheat_event'),
+        38: (None, 'alliance_event'),
+        39: (None, 'unit_click_event'),
+        40: (None, 'unit_highlight_event'),
+        41: (None, 'trigger_reply_selected_event'),
+        44: (None, 'trigger_skipped_event'),
+        45: (None, 'trigger_sound_length_query_event'),
+        46: (None, 'trigger_sound_offset_event'),
+        47: (None, 'trigger_transmission_offset_event'),
+        48: (None, 'trigger_transmission_complete_event'),
+        49: (CameraEvent, 'camera_update_event'),
+        50: (None, 'trigger_abort_mission_event'),
+        51: (None, 'trigger_purchase_made_event'),
+        52: (None, 'trigger_purchase_exit_event'),
+        53: (None, 'trigger_planet_mission_launched_event'),
+        54: (None, 'trigger_planet_panel_canceled_event'),
+        55: (None, 'trigger_dialog_control_event'),
+        56: (None, 'trigger_sound_length_sync_event'),
+        57: (None, 'trigger_conversation_skipped_event'),
+        58: (None, 'trigger_mouse_clicked_event'),
+        63: (None, 'trigger_planet_panel_replay_event'),
+        64: (None, 'trigger_soundtrack_done_event'),
+        65: (None, 'trigger_planet_mission_selected_event'),
+        66: (None, 'trigger_key_pressed_event'),
+        67: (None, 'trigger_movie_function_event'),
+        68: (None, 'trigger_planet_panel_birth_complete_event'),
+        69: (None, 'trigger_planet_panel_death_complete_event'),
+        70: (None, 'resource_request_event'),
+        71: (None, 'resource_request_fulfill_event'),
+        72: (None, 'resource_request_cancel_event'),
+        73: (None, 'trigger_research_panel_exit_event'),
+        74: (None, 'trigger_research_panel_purchase_event'),
+        75: (None, 'trigger_research_panel_selection_changed_event'),
+        76: (None, 'lag_message_event'),
+        77: (None, 'trigger_mercenary_panel_exit_event'),
+        78: (None, 'trigger_mercenary_panel_purchase_event'),
+        79: (None, 'trigger_mercenary_panel_selection_changed_event'),
+        80: (None, 'trigger_victory_panel_exit_event'),
+        81: (None, 'trigger_battle_report_panel_exit_event'),
+        82: (None, 'trigger_battle_report_panel_play_mission_event'),
+        83: (None, 'trigger_battle_report_panel_play_scene_event'),
+        84: (None, 'trigger_battle_report_panel_selection_changed_event'),
+        85: (None, 'trigger_victory_panel_play_mission_again_event'),
+        86: (None, 'trigger_movie_started_event'),
+        87: (None, 'trigger_movie_finished_event'),
+        88: (None, 'decrement_game_time_remaining_event'),
+        89: (None, 'trigger_portrait_loaded_event'),
+        90: (None, 'trigger_custom_dialog_dismissed_event'),
+        91: (None, 'trigger_game_menu_item_selected_event'),
+        92: (None, 'trigger_camera_move_event'),
+        93: (None, 'trigger_purchase_panel_selected_purchase_item_changed_event'),
+        94: (None, 'trigger_purchase_panel_selected_purchase_category_changed_event'),
+        95: (None, 'trigger_button_pressed_event'),
+        96: (None, 'trigger_game_credits_finished_event'),
+    }
+
+    SCHEMAS = dict()
 
     def __init__(self):
-        self.EVENT_DISPATCH = {
-            0: (None, self.unknown_event),
-            5: (None, self.finished_loading_sync_event),
-            7: (None, self.bank_file_event),
-            8: (None, self.bank_section_event),
-            9: (None, self.bank_key_event),
-            10: (None, self.bank_value_event),
-            11: (None, self.bank_signature_event),
-            12: (UserOptionsEvent, self.user_options_event),
-            22: (None, self.save_game_event),
-            23: (None, self.save_game_done_event),
-            25: (PlayerLeaveEvent, self.player_leave_event),
-            26: (None, self.game_cheat_event),
-            27: (create_command_event, self.command_event),
-            28: (SelectionEvent, self.selection_delta_event),
-            29: (create_control_group_event, self.control_group_update_event),
-            30: (None, self.selection_sync_check_event),
-            31: (None, self.resource_trade_event),
-            32: (None, self.trigger_chat_message_event),
-            33: (None, self.ai_communicate_event),
-            34: (None, self.set_absolute_game_speed_event),
-            35: (None, self.add_absolute_game_speed_event),
-            37: (None, self.broadcast_cheat_event),
-            38: (None, self.alliance_event),
-            39: (None, self.unit_click_event),
-            40: (None, self.unit_highlight_event),
-            41: (None, self.trigger_reply_selected_event),
-            44: (None, self.trigger_skipped_event),
-            45: (None, self.trigger_sound_length_query_event),
-            46: (None, self.trigger_sound_offset_event),
-            47: (None, self.trigger_transmission_offset_event),
-            48: (None, self.trigger_transmission_complete_event),
-            49: (CameraEvent, self.camera_update_event),
-            50: (None, self.trigger_abort_mission_event),
-            51: (None, self.trigger_purchase_made_event),
-            52: (None, self.trigger_purchase_exit_event),
-            53: (None, self.trigger_planet_mission_launched_event),
-            54: (None, self.trigger_planet_panel_canceled_event),
-            55: (None, self.trigger_dialog_control_event),
-            56: (None, self.trigger_sound_length_sync_event),
-            57: (None, self.trigger_conversation_skipped_event),
-            58: (None, self.trigger_mouse_clicked_event),
-            63: (None, self.trigger_planet_panel_replay_event),
-            64: (None, self.trigger_soundtrack_done_event),
-            65: (None, self.trigger_planet_mission_selected_event),
-            66: (None, self.trigger_key_pressed_event),
-            67: (None, self.trigger_movie_function_event),
-            68: (None, self.trigger_planet_panel_birth_complete_event),
-            69: (None, self.trigger_planet_panel_death_complete_event),
-            70: (None, self.resource_request_event),
-            71: (None, self.resource_request_fulfill_event),
-            72: (None, self.resource_request_cancel_event),
-            73: (None, self.trigger_research_panel_exit_event),
-            74: (None, self.trigger_research_panel_purchase_event),
-            75: (None, self.trigger_research_panel_selection_changed_event),
-            76: (None, self.lag_message_event),
-            77: (None, self.trigger_mercenary_panel_exit_event),
-            78: (None, self.trigger_mercenary_panel_purchase_event),
-            79: (None, self.trigger_mercenary_panel_selection_changed_event),
-            80: (None, self.trigger_victory_panel_exit_event),
-            81: (None, self.trigger_battle_report_panel_exit_event),
-            82: (None, self.trigger_battle_report_panel_play_mission_event),
-            83: (None, self.trigger_battle_report_panel_play_scene_event),
-            84: (None, self.trigger_battle_report_panel_selection_changed_event),
-            85: (None, self.trigger_victory_panel_play_mission_again_event),
-            86: (None, self.trigger_movie_started_event),
-            87: (None, self.trigger_movie_finished_event),
-            88: (None, self.decrement_game_time_remaining_event),
-            89: (None, self.trigger_portrait_loaded_event),
-            90: (None, self.trigger_custom_dialog_dismissed_event),
-            91: (None, self.trigger_game_menu_item_selected_event),
-            92: (None, self.trigger_camera_move_event),
-            93: (None, self.trigger_purchase_panel_selected_purchase_item_changed_event),
-            94: (None, self.trigger_purchase_panel_selected_purchase_category_changed_event),
-            95: (None, self.trigger_button_pressed_event),
-            96: (None, self.trigger_game_credits_finished_event),
-        }
+        parsers = self.compiled_parsers()
+        skippers = self.compiled_parsers(skip=True)
+        self.EVENT_DISPATCH = dict()
+        self.EVENT_SKIP = dict()
+        for event_type, (event_class, name) in self.event_types().items():
+            parser = parsers.get(name, getattr(self, name, None))
+            skipper = skippers.get(name, parser)
+            self.EVENT_DISPATCH[event_type] = (event_class, parser if event_class is not None else skipper)
+            self.EVENT_SKIP[event_type] = skipper
+
+    @classmethod
+    def event_types(cls):
+        """ Returns the event type table with all the diffs applied. """
+        event_types = dict()
+        for klass in reversed(cls.__mro__):
+            for event_type, entry in vars(klass).get('EVENT_TYPES', {}).items():
+                if entry is None:
+                    del event_types[event_type]
+                else:
+                    event_types[event_type] = entry
+        return event_types
+
+    @classmethod
+    def schemas(cls):
+        """ Returns the schema for every event name that isn't overridden by a method. """
+        schemas = dict()
+        for event_class, name in cls.event_types().values():
+            for klass in cls.__mro__:
+                if name in vars(klass).get('SCHEMAS', {}):
+                    schemas[name] = klass.SCHEMAS[name]
+                    break
+                elif name in vars(klass):
+                    break
+        return schemas
+
+    @classmethod
+    def compiled_parsers(cls, skip=False):
+        """ Returns the parsers compiled from the class schemas. They are only compiled once. """
+        if (cls, skip) not in _compiled_parsers:
+            _compiled_parsers[cls, skip] = compile_parsers(cls.schemas(), skip=skip)
+        return _compiled_parsers[cls, skip]
+
+    def filter_dispatch(self, event_filter):
+        """ Returns a copy of the dispatch table with the events that are
+        filtered out skipped, and whether any kept events still need to be
+        checked against the filter once created.
+        """
+        dispatch = dict(self.EVENT_DISPATCH)
+        recheck = False
+        for event_type, (event_class, parser) in self.EVENT_DISPATCH.items():
+            if event_class is not None:
+                accepted = event_filter.check(event_class)
+                if accepted is False:
+                    dispatch[event_type] = (None, self.EVENT_SKIP[event_type])
+                elif accepted is None:
+                    recheck = True
+        return dispatch, recheck
 
     def __call__(self, data, replay):
-        data = BitPackedDecoder(data)
         game_events = list()
+        try:
+            game_events.extend(self.iter_events(data, replay, replay.event_tables))
+        except ReadError as e:
+            e.game_events = game_events
+            raise
+        return game_events
+
+    def iter_events(self, data, replay, event_tables=None):
+        """ Yields the game events one at a time as they are decoded. Events
+        with a table in event_tables are added to it as they are created.
+        """
+        data = replay.decoder(data)
 
         # method short cuts, avoid dict lookups
         EVENT_DISPATCH = self.EVENT_DISPATCH
+        event_filter = replay.event_filter
+        recheck = False
+        if event_filter is not None:
+            if event_tables is None:
+                EVENT_DISPATCH, recheck = self.filter_dispatch(event_filter)
+            else:
+                # Events with a table are created even when they aren't kept
+                EVENT_DISPATCH = self.filter_dispatch(AnyFilter(event_filter, event_tables.event_filter))[0]
+                recheck = True
         debug = replay.opt.debug
         tell = data.tell
         read_frames = data.read_frames
         read_bits = data.read_bits
         byte_align = data.byte_align
-        append = game_events.append
+
+        # Events before the first frame are skipped over and reading stops
+        # after the last frame, see the frame_range option
+        EVENT_SKIP = self.EVENT_SKIP
+        first_frame, last_frame = replay.frame_range or (0, None)
 
         try:
             fstamp = 0
             event_start = 0
+            event_number = 0
             data_length = data.length
+
+            # Start from the last checkpoint before the first frame and add
+            # checkpoints past the end of the index along the way
+            seek_index = replay.seek_index
+            next_checkpoint = -1
+            if seek_index is not None:
+                if first_frame > 0:
+                    event_number, event_start, fstamp = seek_index.find(first_frame)
+                    data.seek(event_start)
+                next_checkpoint = len(seek_index)*seek_index.interval
+
             while event_start != data_length:
+                if event_number == next_checkpoint:
+                    seek_index.add(event_start, fstamp)
+                    next_checkpoint += seek_index.interval
+                event_number += 1
+
                 fstamp += read_frames()
+                if last_frame is not None and fstamp > last_frame:
+                    break
                 pid = read_bits(5)
                 event_type = read_bits(7)
-                event_class, event_parser = EVENT_DISPATCH.get(event_type, (None, None))
+                if fstamp < first_frame:
+                    event_class, event_parser = None, EVENT_SKIP.get(event_type)
+                else:
+                    event_class, event_parser = EVENT_DISPATCH.get(event_type, (None, None))
                 if event_parser is not None:
                     event_data = event_parser(data)
                     if event_class is not None:
                         event = event_class(fstamp, pid, event_data)
-                        append(event)
                         if debug:
                             event.bytes = data.read_range(event_start, tell())
+                        if event_tables is not None:
+                            event_tables.add(event)
+                        if not recheck or event_filter.accepts(type(event)):
+                            yield event
                     else:
                         pass  # Skipping unused events
 
                 # Otherwise throw a read error
                 else:
-                    raise ReadError("Event type {0} unknown at position {1}.".format(hex(event_type), hex(event_start)), event_type, event_start, replay, game_events, data)
+                    raise ReadError("Event type {0} unknown at position {1}.".format(hex(event_type), hex(event_start)), event_type, event_start, replay, [], data)
 
                 byte_align()
                 event_start = tell()
 
-            return game_events
+            if seek_index is not None:
+                seek_index.save()
+
         except ParseError as e:
-            raise ReadError("Parse error '{0}' unknown at position {1}.".format(e.msg, hex(event_start)), event_type, event_start, replay, game_events, data)
+            raise ReadError("Parse error '{0}' unknown at position {1}.".format(e, hex(event_start)), event_type, event_start, replay, [], data)
         except EOFError as e:
-            raise ReadError("EOFError error '{0}' unknown at position {1}.".format(e.msg, hex(event_start)), event_type, event_start, replay, game_events, data)
+            raise ReadError("EOFError error '{0}' unknown at position {1}.".format(e, hex(event_start)), event_type, event_start, replay, [], data)
 
     # Don't want to do this more than once
     SINGLE_BIT_MASKS = [0x1 << i for i in range(2**9)]
 
-    def read_selection_bitmask(self, data, mask_length):
+    @staticmethod
+    def read_selection_bitmask(data, mask_length):
         bits_left = mask_length
         bits = data.read_bits(mask_length)
         mask = list()
@@ -362,90 +842,330 @@ class GameEventsReader_Base(object):
 
         # Change mask representation from an int to a bit array with
         # True => Deselect, False => Keep
-        return [(bit_mask & bit != 0) for bit in self.SINGLE_BIT_MASKS[:mask_length]]
+        return [(bit_mask & bit != 0) for bit in GameEventsReader_Base.SINGLE_BIT_MASKS[:mask_length]]
+
+
+# Parsers compiled from the schemas, by reader class and skip flag
+_compiled_parsers = dict()
+
+
+def Mask(length):
+    """ A selection bitmask preceded by its length """
+    return Call(GameEventsReader_Base.read_selection_bitmask, length)
+
+
+def Point(x, y, z=None):
+    """ A map point with the given coordinate types """
+    fields = [('x', x), ('y', y)]
+    if z is not None:
+        fields.append(('z', z))
+    return Struct(*fields)
+
+
+def SelectionMask(count):
+    """ The selection remove mask choice from 16561 on """
+    return Choice(2, {
+        0: ('None', Null),
+        1: ('Mask', Mask(count)),
+        2: ('OneIndices', Array(count, count)),
+        3: ('ZeroIndices', Array(count, count)),
+    })
+
+
+def CommandEvent(flags, control_player_id):
+    """ The command event from 16561 on """
+    return Struct(
+        ('flags', Bits(flags)),
+        ('ability', Optional(Struct(
+            ('ability_link', UInt16),
+            ('ability_command_index', Bits(5)),
+            ('ability_command_data', Optional(UInt8)),
+        ))),
+        ('data', Choice(2, {
+            0: ('None', Null),
+            1: ('TargetPoint', Struct(
+                ('point', Point(Bits(20), Bits(20), Int32)),
+            )),
+            2: ('TargetUnit', Struct(
+                ('flags', UInt8),
+                ('timer', UInt8),
+                ('unit_tag', UInt32),
+                ('unit_link', UInt16),
+                ('control_player_id', control_player_id),
+                ('upkeep_player_id', Optional(Bits(4))),
+                ('point', Point(Bits(20), Bits(20), Int32)),
+            )),
+            3: ('Data', Struct(('data', UInt32))),
+        })),
+        ('other_unit_tag', Optional(UInt32)),
+    )
 
 
 class GameEventsReader_15405(GameEventsReader_Base):
 
-    def unknown_event(self, data):
-        return dict(
-            unknown=data.read_bytes(2)
-        )
-
-    def finished_loading_sync_event(self, data):
-        return None
-
-    def bank_file_event(self, data):
-        return dict(
-            name=data.read_aligned_string(data.read_bits(7)),
-        )
-
-    def bank_section_event(self, data):
-        return dict(
-            name=data.read_aligned_string(data.read_bits(6)),
-        )
-
-    def bank_key_event(self, data):
-        return dict(
-            name=data.read_aligned_string(data.read_bits(6)),
-            type=data.read_uint32(),
-            data=data.read_aligned_bytes(data.read_bits(7)),
-        )
-
-    def bank_value_event(self, data):
-        return dict(
-            type=data.read_uint32(),
-            name=data.read_aligned_string(data.read_bits(6)),
-            data=data.read_aligned_bytes(data.read_bits(12)),
-        )
-
-    def bank_signature_event(self, data):
-        return dict(
-            signature=[data.read_uint8() for i in range(data.read_bits(4))],
-            toon_handle=None,
-        )
-
-    def user_options_event(self, data):
-        return dict(
+    SCHEMAS = dict(
+        unknown_event=Struct(
+            ('unknown', Bytes(2)),
+        ),
+        finished_loading_sync_event=None,
+        bank_file_event=Struct(
+            ('name', String(Bits(7))),
+        ),
+        bank_section_event=Struct(
+            ('name', String(Bits(6))),
+        ),
+        bank_key_event=Struct(
+            ('name', String(Bits(6))),
+            ('type', UInt32),
+            ('data', Blob(Bits(7))),
+        ),
+        bank_value_event=Struct(
+            ('type', UInt32),
+            ('name', String(Bits(6))),
+            ('data', Blob(Bits(12))),
+        ),
+        bank_signature_event=Struct(
+            ('signature', Array(Bits(4), UInt8)),
+            ('toon_handle', Null),
+        ),
+        user_options_event=Struct(
             # I'm just guessing which flags are available here
-            game_fully_downloaded=None,
-            development_cheats_enabled=data.read_bool(),
-            multiplayer_cheats_enabled=data.read_bool(),
-            sync_checksumming_enabled=data.read_bool(),
-            is_map_to_map_transition=data.read_bool(),
-            use_ai_beacons=None,
-            debug_pause_enabled=None,
-            base_build_num=None,
-            starting_rally=None,
-        )
-
-    def save_game_event(self, data):
-        return dict(
-            file_name=data.read_aligned_string(data.read_bits(11)),
-            automatic=data.read_bool(),
-            overwrite=data.read_bool(),
-            name=data.read_aligned_string(data.read_uint8()),
-            description=data.read_aligned_string(data.read_bits(10)),
-        )
-
-    def save_game_done_event(self, data):
-        return None
-
-    def player_leave_event(self, data):
-        return None
-
-    def game_cheat_event(self, data):
-        return dict(
-            point=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-            ),
-            time=data.read_uint32()-2147483648,
-            verb=data.read_aligned_string(data.read_bits(10)),
-            arguments=data.read_aligned_string(data.read_bits(10)),
-        )
+            ('game_fully_downloaded', Null),
+            ('development_cheats_enabled', Bool),
+            ('multiplayer_cheats_enabled', Bool),
+            ('sync_checksumming_enabled', Bool),
+            ('is_map_to_map_transition', Bool),
+            ('use_ai_beacons', Null),
+            ('debug_pause_enabled', Null),
+            ('base_build_num', Null),
+            ('starting_rally', Null),
+        ),
+        save_game_event=Struct(
+            ('file_name', String(Bits(11))),
+            ('automatic', Bool),
+            ('overwrite', Bool),
+            ('name', String(UInt8)),
+            ('description', String(Bits(10))),
+        ),
+        save_game_done_event=None,
+        player_leave_event=None,
+        game_cheat_event=Struct(
+            ('point', Point(Int32, Int32)),
+            ('time', Int32),
+            ('verb', String(Bits(10))),
+            ('arguments', String(Bits(10))),
+        ),
+        selection_delta_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('subgroup_index', UInt8),
+            ('remove_mask', Tagged('Mask', Mask(UInt8))),
+            ('add_subgroups', Array(UInt8, Struct(
+                ('unit_link', UInt16),
+                ('subgroup_priority', Null),
+                ('intra_subgroup_priority', UInt8),
+                ('count', UInt8),
+            ))),
+            ('add_unit_tags', Array(UInt8, UInt32)),
+        ),
+        control_group_update_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('control_group_update', Bits(2)),
+            ('remove_mask', Optional(Tagged('Mask', Mask(UInt8)), absent=Tagged('None', Null))),
+        ),
+        selection_sync_check_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('selection_sync_data', Struct(
+                ('count', UInt8),
+                ('subgroup_count', UInt8),
+                ('active_subgroup_index', UInt8),
+                ('unit_tags_checksum', UInt32),
+                ('subgroup_indices_checksum', UInt32),
+                ('subgroups_checksum', UInt32),
+            )),
+        ),
+        resource_trade_event=Struct(
+            ('recipient_id', Bits(4)),
+            ('resources', Array(Bits(3), Int32)),
+        ),
+        trigger_chat_message_event=Struct(
+            ('message', String(Bits(10))),
+        ),
+        ai_communicate_event=Struct(
+            ('beacon', Int8),
+            ('ally', Int8),
+            ('flags', Int8),
+            ('build', Null),
+            ('target_unit_tag', UInt32),
+            ('target_unit_link', UInt16),
+            ('target_upkeep_player_id', Optional(Bits(4))),
+            ('target_control_player_id', Null),
+            ('target_point', Point(Int32, Int32, Int32)),
+        ),
+        set_absolute_game_speed_event=Struct(
+            ('speed', Bits(3)),
+        ),
+        add_absolute_game_speed_event=Struct(
+            ('delta', Int8),
+        ),
+        broadcast_cheat_event=Struct(
+            ('verb', String(Bits(10))),
+            ('arguments', String(Bits(10))),
+        ),
+        alliance_event=Struct(
+            ('alliance', UInt32),
+            ('control', UInt32),
+        ),
+        unit_click_event=Struct(
+            ('unit_tag', UInt32),
+        ),
+        unit_highlight_event=Struct(
+            ('unit_tag', UInt32),
+            ('flags', UInt8),
+        ),
+        trigger_reply_selected_event=Struct(
+            ('conversation_id', Int32),
+            ('reply_id', Int32),
+        ),
+        trigger_skipped_event=None,
+        trigger_sound_length_query_event=Struct(
+            ('sound_hash', UInt32),
+            ('length', UInt32),
+        ),
+        trigger_sound_offset_event=Struct(
+            ('sound', UInt32),
+        ),
+        trigger_transmission_offset_event=Struct(
+            ('transmission_id', Int32),
+        ),
+        trigger_transmission_complete_event=Struct(
+            ('transmission_id', Int32),
+        ),
+        camera_update_event=Struct(
+            ('target', Point(UInt16, UInt16)),
+            ('distance', Optional(UInt16)),
+            ('pitch', Optional(UInt16)),
+            ('yaw', Optional(UInt16)),
+        ),
+        trigger_abort_mission_event=None,
+        trigger_purchase_made_event=Struct(
+            ('purchase_item_id', Int32),
+        ),
+        trigger_purchase_exit_event=None,
+        trigger_planet_mission_launched_event=Struct(
+            ('difficulty_level', Int32),
+        ),
+        trigger_planet_panel_canceled_event=None,
+        trigger_dialog_control_event=Struct(
+            ('control_id', Int32),
+            ('event_type', Int32),
+            ('event_data', Choice(3, {
+                0: ('None', Null),
+                1: ('Checked', Bool),
+                2: ('ValueChanged', UInt32),
+                3: ('SelectionChanged', Int32),
+                4: ('TextChanged', String(Bits(11))),
+            })),
+        ),
+        trigger_sound_length_sync_event=Struct(
+            ('sync_info', Struct(
+                ('sound_hash', Array(UInt8, UInt32)),
+                ('length', Array(UInt8, UInt32)),
+            )),
+        ),
+        trigger_conversation_skipped_event=Struct(
+            ('skip_type', Bits(1)),
+        ),
+        trigger_mouse_clicked_event=Struct(
+            ('button', UInt32),
+            ('down', Bool),
+            ('position_ui', Point(UInt32, UInt32)),
+            ('position_world', Point(Int32, Int32, Int32)),
+        ),
+        trigger_planet_panel_replay_event=None,
+        trigger_soundtrack_done_event=Struct(
+            ('soundtrack', UInt32),
+        ),
+        trigger_planet_mission_selected_event=Struct(
+            ('planet_id', Int32),
+        ),
+        trigger_key_pressed_event=Struct(
+            ('key', Int8),
+            ('flags', Int8),
+        ),
+        trigger_movie_function_event=Struct(
+            ('function_name', String(Bits(7))),
+        ),
+        trigger_planet_panel_birth_complete_event=None,
+        trigger_planet_panel_death_complete_event=None,
+        resource_request_event=Struct(
+            ('resources', Array(Bits(3), Int32)),
+        ),
+        resource_request_fulfill_event=Struct(
+            ('request_id', Int32),
+        ),
+        resource_request_cancel_event=Struct(
+            ('request_id', Int32),
+        ),
+        trigger_research_panel_exit_event=None,
+        trigger_research_panel_purchase_event=None,
+        trigger_research_panel_selection_changed_event=Struct(
+            ('item_id', Int32),
+        ),
+        lag_message_event=Struct(
+            ('player_id', Bits(4)),
+        ),
+        trigger_mercenary_panel_exit_event=None,
+        trigger_mercenary_panel_purchase_event=None,
+        trigger_mercenary_panel_selection_changed_event=Struct(
+            ('item_id', Int32),
+        ),
+        trigger_victory_panel_exit_event=None,
+        trigger_battle_report_panel_exit_event=None,
+        trigger_battle_report_panel_play_mission_event=Struct(
+            ('battle_report_id', Int32),
+            ('difficulty_level', Int32),
+        ),
+        trigger_battle_report_panel_play_scene_event=Struct(
+            ('battle_report_id', Int32),
+        ),
+        trigger_battle_report_panel_selection_changed_event=Struct(
+            ('battle_report_id', Int32),
+        ),
+        trigger_victory_panel_play_mission_again_event=Struct(
+            ('difficulty_level', Int32),
+        ),
+        trigger_movie_started_event=None,
+        trigger_movie_finished_event=None,
+        decrement_game_time_remaining_event=Struct(
+            ('decrement_ms', UInt32),
+        ),
+        trigger_portrait_loaded_event=Struct(
+            ('portrait_id', Int32),
+        ),
+        trigger_custom_dialog_dismissed_event=Struct(
+            ('result', Int32),
+        ),
+        trigger_game_menu_item_selected_event=Struct(
+            ('game_menu_item_index', Int32),
+        ),
+        trigger_camera_move_event=Struct(
+            ('reason', Int8),
+        ),
+        trigger_purchase_panel_selected_purchase_item_changed_event=Struct(
+            ('item_id', Int32),
+        ),
+        trigger_purchase_panel_selected_purchase_category_changed_event=Struct(
+            ('category_id', Int32),
+        ),
+        trigger_button_pressed_event=Struct(
+            ('button', UInt16),
+        ),
+        trigger_game_credits_finished_event=None,
+    )
 
     def command_event(self, data):
+        # The target unit is split around the other unit tag so this
+        # one can't be described with a schema.
         flags = data.read_uint32()
         ability = dict(
             ability_link=data.read_uint16(),
@@ -476,423 +1196,32 @@ class GameEventsReader_15405(GameEventsReader_Base):
             other_unit_tag=other_unit_tag,
         )
 
-    def selection_delta_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            subgroup_index=data.read_uint8(),
-            remove_mask=('Mask', self.read_selection_bitmask(data, data.read_uint8())),
-            add_subgroups=[dict(
-                unit_link=data.read_uint16(),
-                subgroup_priority=None,
-                intra_subgroup_priority=data.read_uint8(),
-                count=data.read_uint8(),
-            ) for i in range(data.read_uint8())],
-            add_unit_tags=[data.read_uint32() for i in range(data.read_uint8())],
-        )
-
-    def control_group_update_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            control_group_update=data.read_bits(2),
-            remove_mask=('Mask', self.read_selection_bitmask(data, data.read_uint8())) if data.read_bool() else ('None', None),
-        )
-
-    def selection_sync_check_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            selection_sync_data=dict(
-                count=data.read_uint8(),
-                subgroup_count=data.read_uint8(),
-                active_subgroup_index=data.read_uint8(),
-                unit_tags_checksum=data.read_uint32(),
-                subgroup_indices_checksum=data.read_uint32(),
-                subgroups_checksum=data.read_uint32(),
-            )
-        )
-
-    def resource_trade_event(self, data):
-        return dict(
-            recipient_id=data.read_bits(4),
-            resources=[data.read_uint32()-2147483648 for i in range(data.read_bits(3))],
-        )
-
-    def trigger_chat_message_event(self, data):
-        return dict(
-            message=data.read_aligned_string(data.read_bits(10)),
-        )
-
-    def ai_communicate_event(self, data):
-        return dict(
-            beacon=data.read_uint8()-128,
-            ally=data.read_uint8()-128,
-            flags=data.read_uint8()-128,
-            build=None,
-            target_unit_tag=data.read_uint32(),
-            target_unit_link=data.read_uint16(),
-            target_upkeep_player_id=data.read_bits(4) if data.read_bool() else None,
-            target_control_player_id=None,
-            target_point=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-                z=data.read_uint32()-2147483648,
-            ),
-        )
-
-    def set_absolute_game_speed_event(self, data):
-        return dict(
-            speed=data.read_bits(3),
-        )
-
-    def add_absolute_game_speed_event(self, data):
-        return dict(
-            delta=data.read_uint8()-128,
-        )
-
-    def broadcast_cheat_event(self, data):
-        return dict(
-            verb=data.read_aligned_string(data.read_bits(10)),
-            arguments=data.read_aligned_string(data.read_bits(10)),
-        )
-
-    def alliance_event(self, data):
-        return dict(
-            alliance=data.read_uint32(),
-            control=data.read_uint32(),
-        )
-
-    def unit_click_event(self, data):
-        return dict(
-            unit_tag=data.read_uint32(),
-        )
-
-    def unit_highlight_event(self, data):
-        return dict(
-            unit_tag=data.read_uint32(),
-            flags=data.read_uint8(),
-        )
-
-    def trigger_reply_selected_event(self, data):
-        return dict(
-            conversation_id=data.read_uint32()-2147483648,
-            reply_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_skipped_event(self, data):
-        return None
-
-    def trigger_sound_length_query_event(self, data):
-        return dict(
-            sound_hash=data.read_uint32(),
-            length=data.read_uint32(),
-        )
-
-    def trigger_sound_offset_event(self, data):
-        return dict(
-            sound=data.read_uint32(),
-        )
-
-    def trigger_transmission_offset_event(self, data):
-        return dict(
-            transmission_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_transmission_complete_event(self, data):
-        return dict(
-            transmission_id=data.read_uint32()-2147483648,
-        )
-
-    def camera_update_event(self, data):
-        return dict(
-            target=dict(
-                x=data.read_uint16(),
-                y=data.read_uint16(),
-            ),
-            distance=data.read_uint16() if data.read_bool() else None,
-            pitch=data.read_uint16() if data.read_bool() else None,
-            yaw=data.read_uint16() if data.read_bool() else None,
-        )
-
-    def trigger_abort_mission_event(self, data):
-        return None
-
-    def trigger_purchase_made_event(self, data):
-        return dict(
-            purchase_item_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_purchase_exit_event(self, data):
-        return None
-
-    def trigger_planet_mission_launched_event(self, data):
-        return dict(
-            difficulty_level=data.read_uint32()-2147483648,
-        )
-
-    def trigger_planet_panel_canceled_event(self, data):
-        return None
-
-    def trigger_dialog_control_event(self, data):
-        return dict(
-            control_id=data.read_uint32()-2147483648,
-            event_type=data.read_uint32()-2147483648,
-            event_data={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Checked', data.read_bool()),
-                2: lambda: ('ValueChanged', data.read_uint32()),
-                3: lambda: ('SelectionChanged', data.read_uint32()-2147483648),
-                4: lambda: ('TextChanged', data.read_aligned_string(data.read_bits(11))),
-            }[data.read_bits(3)](),
-        )
-
-    def trigger_sound_length_sync_event(self, data):
-        return dict(
-            sync_info=dict(
-                sound_hash=[data.read_uint32() for i in range(data.read_uint8())],
-                length=[data.read_uint32() for i in range(data.read_uint8())],
-            )
-        )
-
-    def trigger_conversation_skipped_event(self, data):
-        return dict(
-            skip_type=data.read_int(1),
-        )
-
-    def trigger_mouse_clicked_event(self, data):
-        return dict(
-            button=data.read_uint32(),
-            down=data.read_bool(),
-            position_ui=dict(
-                x=data.read_uint32(),
-                y=data.read_uint32(),
-            ),
-            position_world=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-                z=data.read_uint32()-2147483648,
-            ),
-        )
-
-    def trigger_planet_panel_replay_event(self, data):
-        return None
-
-    def trigger_soundtrack_done_event(self, data):
-        return dict(
-            soundtrack=data.read_uint32(),
-        )
-
-    def trigger_planet_mission_selected_event(self, data):
-        return dict(
-            planet_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_key_pressed_event(self, data):
-        return dict(
-            key=data.read_uint8()-128,
-            flags=data.read_uint8()-128,
-        )
-
-    def trigger_movie_function_event(self, data):
-        return dict(
-            function_name=data.read_aligned_string(data.read_bits(7)),
-        )
-
-    def trigger_planet_panel_birth_complete_event(self, data):
-        return None
-
-    def trigger_planet_panel_death_complete_event(self, data):
-        return None
-
-    def resource_request_event(self, data):
-        return dict(
-            resources=[data.read_uint32()-2147483648 for i in range(data.read_bits(3))],
-        )
-
-    def resource_request_fulfill_event(self, data):
-        return dict(
-            request_id=data.read_uint32()-2147483648,
-        )
-
-    def resource_request_cancel_event(self, data):
-        return dict(
-            request_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_research_panel_exit_event(self, data):
-        return None
-
-    def trigger_research_panel_purchase_event(self, data):
-        return None
-
-    def trigger_research_panel_selection_changed_event(self, data):
-        return dict(
-            item_id=data.read_uint32()-2147483648,
-        )
-
-    def lag_message_event(self, data):
-        return dict(
-            player_id=data.read_bits(4),
-        )
-
-    def trigger_mercenary_panel_exit_event(self, data):
-        return None
-
-    def trigger_mercenary_panel_purchase_event(self, data):
-        return None
-
-    def trigger_mercenary_panel_selection_changed_event(self, data):
-        return dict(
-            item_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_victory_panel_exit_event(self, data):
-        return None
-
-    def trigger_battle_report_panel_exit_event(self, data):
-        return None
-
-    def trigger_battle_report_panel_play_mission_event(self, data):
-        return dict(
-            battle_report_id=data.read_uint32()-2147483648,
-            difficulty_level=data.read_uint32()-2147483648,
-        )
-
-    def trigger_battle_report_panel_play_scene_event(self, data):
-        return dict(
-            battle_report_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_battle_report_panel_selection_changed_event(self, data):
-        return dict(
-            battle_report_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_victory_panel_play_mission_again_event(self, data):
-        return dict(
-            difficulty_level=data.read_uint32()-2147483648,
-        )
-
-    def trigger_movie_started_event(self, data):
-        return None
-
-    def trigger_movie_finished_event(self, data):
-        return None
-
-    def decrement_game_time_remaining_event(self, data):
-        return dict(
-            decrement_ms=data.read_uint32(),
-        )
-
-    def trigger_portrait_loaded_event(self, data):
-        return dict(
-            portrait_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_custom_dialog_dismissed_event(self, data):
-        return dict(
-            result=data.read_uint32()-2147483648,
-        )
-
-    def trigger_game_menu_item_selected_event(self, data):
-        return dict(
-            game_menu_item_index=data.read_uint32()-2147483648,
-        )
-
-    def trigger_camera_move_event(self, data):
-        return dict(
-            reason=data.read_uint8()-128,
-        )
-
-    def trigger_purchase_panel_selected_purchase_item_changed_event(self, data):
-        return dict(
-            item_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_purchase_panel_selected_purchase_category_changed_event(self, data):
-        return dict(
-            category_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_button_pressed_event(self, data):
-        return dict(
-            button=data.read_uint16(),
-        )
-
-    def trigger_game_credits_finished_event(self, data):
-        return None
-
 
 class GameEventsReader_16561(GameEventsReader_15405):
 
-    def command_event(self, data):
-        return dict(
-            flags=data.read_bits(17),
-            ability=dict(
-                ability_link=data.read_uint16(),
-                ability_command_index=data.read_bits(5),
-                ability_command_data=data.read_uint8() if data.read_bool() else None,
-            ) if data.read_bool() else None,
-            data={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('TargetPoint', dict(
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    )
-                )),
-                2: lambda: ('TargetUnit', dict(
-                    flags=data.read_uint8(),
-                    timer=data.read_uint8(),
-                    unit_tag=data.read_uint32(),
-                    unit_link=data.read_uint16(),
-                    control_player_id=None,
-                    upkeep_player_id=data.read_bits(4) if data.read_bool() else None,
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    ),
-                )),
-                3: lambda: ('Data', dict(data=data.read_uint32())),
-            }[data.read_bits(2)](),
-            other_unit_tag=data.read_uint32() if data.read_bool() else None
-        )
-
-    def selection_delta_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            subgroup_index=data.read_uint8(),
-            remove_mask={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Mask', self.read_selection_bitmask(data, data.read_uint8())),
-                2: lambda: ('OneIndices', [data.read_uint8() for i in range(data.read_uint8())]),
-                3: lambda: ('ZeroIndices', [data.read_uint8() for i in range(data.read_uint8())]),
-            }[data.read_bits(2)](),
-            add_subgroups=[dict(
-                unit_link=data.read_uint16(),
-                subgroup_priority=None,
-                intra_subgroup_priority=data.read_uint8(),
-                count=data.read_uint8(),
-            ) for i in range(data.read_uint8())],
-            add_unit_tags=[data.read_uint32() for i in range(data.read_uint8())],
-        )
-
-    def control_group_update_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            control_group_update=data.read_bits(2),
-            remove_mask={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Mask', self.read_selection_bitmask(data, data.read_uint8())),
-                2: lambda: ('OneIndices', [data.read_uint8() for i in range(data.read_uint8())]),
-                3: lambda: ('ZeroIndices', [data.read_uint8() for i in range(data.read_uint8())]),
-            }[data.read_bits(2)](),
-        )
-
-    def decrement_game_time_remaining_event(self, data):
-        return dict(
-            decrement_ms=data.read_bits(19)
-        )
+    SCHEMAS = dict(
+        command_event=CommandEvent(17, control_player_id=Null),
+        selection_delta_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('subgroup_index', UInt8),
+            ('remove_mask', SelectionMask(UInt8)),
+            ('add_subgroups', Array(UInt8, Struct(
+                ('unit_link', UInt16),
+                ('subgroup_priority', Null),
+                ('intra_subgroup_priority', UInt8),
+                ('count', UInt8),
+            ))),
+            ('add_unit_tags', Array(UInt8, UInt32)),
+        ),
+        control_group_update_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('control_group_update', Bits(2)),
+            ('remove_mask', SelectionMask(UInt8)),
+        ),
+        decrement_game_time_remaining_event=Struct(
+            ('decrement_ms', Bits(19)),
+        ),
+    )
 
 
 class GameEventsReader_16605(GameEventsReader_16561):
@@ -909,46 +1238,26 @@ class GameEventsReader_16939(GameEventsReader_16755):
 
 class GameEventsReader_17326(GameEventsReader_16939):
 
-    def __init__(self):
-        super(GameEventsReader_17326, self).__init__()
-
-        self.EVENT_DISPATCH.update({
-            59: (None, self.trigger_mouse_moved_event),
-        })
-
-    def bank_signature_event(self, data):
-        return dict(
-            signature=[data.read_uint8() for i in range(data.read_bits(5))],
-            toon_handle=None,
-        )
-
-    def trigger_mouse_clicked_event(self, data):
-        return dict(
-            button=data.read_uint32(),
-            down=data.read_bool(),
-            position_ui=dict(
-                x=data.read_bits(11),
-                y=data.read_bits(11),
-            ),
-            position_world=dict(
-                x=data.read_bits(20),
-                y=data.read_bits(20),
-                z=data.read_uint32()-2147483648,
-            ),
-        )
-
-    def trigger_mouse_moved_event(self, data):
-        return dict(
-            position_ui=dict(
-                x=data.read_bits(11),
-                y=data.read_bits(11),
-            ),
-            position_world=dict(
-                x=data.read_bits(20),
-                y=data.read_bits(20),
-                z=data.read_uint32()-2147483648,
-            ),
-        )
+    EVENT_TYPES = {
+        59: (None, 'trigger_mouse_moved_event'),
+    }
+
+    SCHEMAS = dict(
+        bank_signature_event=Struct(
+            ('signature', Array(Bits(5), UInt8)),
+            ('toon_handle', Null),
+        ),
+        trigger_mouse_clicked_event=Struct(
+            ('button', UInt32),
+            ('down', Bool),
+            ('position_ui', Point(Bits(11), Bits(11))),
+            ('position_world', Point(Bits(20), Bits(20), Int32)),
+        ),
+        trigger_mouse_moved_event=Struct(
+            ('position_ui', Point(Bits(11), Bits(11))),
+            ('position_world', Point(Bits(20), Bits(20), Int32)),
+        ),
+    )
 
 
 class GameEventsReader_18092(GameEventsReader_17326):
@@ -957,40 +1266,9 @@ class GameEventsReader_18092(GameEventsReader_17326):
 
 class GameEventsReader_18574(GameEventsReader_18092):
 
-    def command_event(self, data):
-        return dict(
-            flags=data.read_bits(18),
-            ability=dict(
-                ability_link=data.read_uint16(),
-                ability_command_index=data.read_bits(5),
-                ability_command_data=data.read_uint8() if data.read_bool() else None,
-            ) if data.read_bool() else None,
-            data={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('TargetPoint', dict(
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    )
-                )),
-                2: lambda: ('TargetUnit', dict(
-                    flags=data.read_uint8(),
-                    timer=data.read_uint8(),
-                    unit_tag=data.read_uint32(),
-                    unit_link=data.read_uint16(),
-                    control_player_id=None,
-                    upkeep_player_id=data.read_bits(4) if data.read_bool() else None,
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    ),
-                )),
-                3: lambda: ('Data', dict(data=data.read_uint32())),
-            }[data.read_bits(2)](),
-            other_unit_tag=data.read_uint32() if data.read_bool() else None
-        )
+    SCHEMAS = dict(
+        command_event=CommandEvent(18, control_player_id=Null),
+    )
 
 
 class GameEventsReader_19132(GameEventsReader_18574):
@@ -999,57 +1277,20 @@ class GameEventsReader_19132(GameEventsReader_18574):
 
 class GameEventsReader_19595(GameEventsReader_19132):
 
-    def command_event(self, data):
-        return dict(
-            flags=data.read_bits(18),
-            ability=dict(
-                ability_link=data.read_uint16(),
-                ability_command_index=data.read_bits(5),
-                ability_command_data=data.read_uint8() if data.read_bool() else None,
-            ) if data.read_bool() else None,
-            data={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('TargetPoint', dict(
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    )
-                )),
-                2: lambda: ('TargetUnit', dict(
-                    flags=data.read_uint8(),
-                    timer=data.read_uint8(),
-                    unit_tag=data.read_uint32(),
-                    unit_link=data.read_uint16(),
-                    control_player_id=data.read_bits(4) if data.read_bool() else None,
-                    upkeep_player_id=data.read_bits(4) if data.read_bool() else None,
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    ),
-                )),
-                3: lambda: ('Data', dict(data=data.read_uint32())),
-            }[data.read_bits(2)](),
-            other_unit_tag=data.read_uint32() if data.read_bool() else None
-        )
-
-    def ai_communicate_event(self, data):
-        return dict(
-            beacon=data.read_uint8()-128,
-            ally=data.read_uint8()-128,
-            flags=data.read_uint8()-128,  # autocast??
-            build=None,
-            target_unit_tag=data.read_uint32(),
-            target_unit_link=data.read_uint16(),
-            target_upkeep_player_id=data.read_bits(4) if data.read_bool() else None,
-            target_control_player_id=data.read_bits(4) if data.read_bool() else None,
-            target_point=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-                z=data.read_uint32()-2147483648,
-            ),
-        )
+    SCHEMAS = dict(
+        command_event=CommandEvent(18, control_player_id=Optional(Bits(4))),
+        ai_communicate_event=Struct(
+            ('beacon', Int8),
+            ('ally', Int8),
+            ('flags', Int8),  # autocast??
+            ('build', Null),
+            ('target_unit_tag', UInt32),
+            ('target_unit_link', UInt16),
+            ('target_upkeep_player_id', Optional(Bits(4))),
+            ('target_control_player_id', Optional(Bits(4))),
+            ('target_point', Point(Int32, Int32, Int32)),
+        ),
+    )
 
 
 class GameEventsReader_21029(GameEventsReader_19595):
@@ -1058,380 +1299,356 @@ class GameEventsReader_21029(GameEventsReader_19595):
 
 class GameEventsReader_22612(GameEventsReader_21029):
 
-    def __init__(self):
-        super(GameEventsReader_22612, self).__init__()
-
-        self.EVENT_DISPATCH.update({
-            36: (None, self.trigger_ping_event),
-            60: (None, self.achievement_awarded_event),
-            97: (None, self.trigger_cutscene_bookmark_fired_event),
-            98: (None, self.trigger_cutscene_end_scene_fired_event),
-            99: (None, self.trigger_cutscene_conversation_line_event),
-            100: (None, self.trigger_cutscene_conversation_line_missing_event),
-        })
-
-    def user_options_event(self, data):
-        return dict(
-            game_fully_downloaded=data.read_bool(),
-            development_cheats_enabled=data.read_bool(),
-            multiplayer_cheats_enabled=data.read_bool(),
-            sync_checksumming_enabled=data.read_bool(),
-            is_map_to_map_transition=data.read_bool(),
-            use_ai_beacons=data.read_bool(),
-            debug_pause_enabled=None,
-            base_build_num=None,
-            starting_rally=None,
-        )
-
-    def command_event(self, data):
-        return dict(
-            flags=data.read_bits(20),
-            ability=dict(
-                ability_link=data.read_uint16(),
-                ability_command_index=data.read_bits(5),
-                ability_command_data=data.read_uint8() if data.read_bool() else None,
-            ) if data.read_bool() else None,
-            data={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('TargetPoint', dict(
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    )
-                )),
-                2: lambda: ('TargetUnit', dict(
-                    flags=data.read_uint8(),
-                    timer=data.read_uint8(),
-                    unit_tag=data.read_uint32(),
-                    unit_link=data.read_uint16(),
-                    control_player_id=data.read_bits(4) if data.read_bool() else None,
-                    upkeep_player_id=data.read_bits(4) if data.read_bool() else None,
-                    point=dict(
-                        x=data.read_bits(20),
-                        y=data.read_bits(20),
-                        z=data.read_uint32()-2147483648,
-                    ),
-                )),
-                3: lambda: ('Data', dict(data=data.read_uint32())),
-            }[data.read_bits(2)](),
-            other_unit_tag=data.read_uint32() if data.read_bool() else None
-        )
-
-    def selection_delta_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            subgroup_index=data.read_bits(9),
-            remove_mask={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Mask', self.read_selection_bitmask(data, data.read_bits(9))),
-                2: lambda: ('OneIndices', [data.read_bits(9) for i in range(data.read_bits(9))]),
-                3: lambda: ('ZeroIndices', [data.read_bits(9) for i in range(data.read_bits(9))]),
-            }[data.read_bits(2)](),
-            add_subgroups=[dict(
-                unit_link=data.read_uint16(),
-                subgroup_priority=None,
-                intra_subgroup_priority=data.read_uint8(),
-                count=data.read_bits(9),
-            ) for i in range(data.read_bits(9))],
-            add_unit_tags=[data.read_uint32() for i in range(data.read_bits(9))],
-        )
-
-    def control_group_update_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            control_group_update=data.read_bits(2),
-            remove_mask={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Mask', self.read_selection_bitmask(data, data.read_bits(9))),
-                2: lambda: ('OneIndices', [data.read_bits(9) for i in range(data.read_bits(9))]),
-                3: lambda: ('ZeroIndices', [data.read_bits(9) for i in range(data.read_bits(9))]),
-            }[data.read_bits(2)](),
-        )
-
-    def selection_sync_check_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            selection_sync_data=dict(
-                count=data.read_bits(9),
-                subgroup_count=data.read_bits(9),
-                active_subgroup_index=data.read_bits(9),
-                unit_tags_checksum=data.read_uint32(),
-                subgroup_indices_checksum=data.read_uint32(),
-                subgroups_checksum=data.read_uint32(),
-            )
-        )
-
-    def ai_communicate_event(self, data):
-        return dict(
-            beacon=data.read_uint8()-128,
-            ally=data.read_uint8()-128,
-            flags=data.read_uint8()-128,
-            build=data.read_uint8()-128,
-            target_unit_tag=data.read_uint32(),
-            target_unit_link=data.read_uint16(),
-            target_upkeep_player_id=data.read_uint8(),
-            target_control_player_id=data.read_uint8(),
-            target_point=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-                z=data.read_uint32()-2147483648,
-            ),
-        )
-
-    def trigger_ping_event(self, data):
-        return dict(
-            point=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-            ),
-            unit_tag=data.read_uint32(),
-            pinged_minimap=data.read_bool(),
-        )
-
-    def trigger_transmission_offset_event(self, data):
+    EVENT_TYPES = {
+        36: (None, 'trigger_ping_event'),
+        60: (None, 'achievement_awarded_event'),
+        97: (None, 'trigger_cutscene_bookmark_fired_event'),
+        98: (None, 'trigger_cutscene_end_scene_fired_event'),
+        99: (None, 'trigger_cutscene_conversation_line_event'),
+        100: (None, 'trigger_cutscene_conversation_line_missing_event'),
+    }
+
+    SCHEMAS = dict(
+        user_options_event=Struct(
+            ('game_fully_downloaded', Bool),
+            ('development_cheats_enabled', Bool),
+            ('multiplayer_cheats_enabled', Bool),
+            ('sync_checksumming_enabled', Bool),
+            ('is_map_to_map_transition', Bool),
+            ('use_ai_beacons', Bool),
+            ('debug_pause_enabled', Null),
+            ('base_build_num', Null),
+            ('starting_rally', Null),
+        ),
+        command_event=CommandEvent(20, control_player_id=Optional(Bits(4))),
+        selection_delta_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('subgroup_index', Bits(9)),
+            ('remove_mask', SelectionMask(Bits(9))),
+            ('add_subgroups', Array(Bits(9), Struct(
+                ('unit_link', UInt16),
+                ('subgroup_priority', Null),
+                ('intra_subgroup_priority', UInt8),
+                ('count', Bits(9)),
+            ))),
+            ('add_unit_tags', Array(Bits(9), UInt32)),
+        ),
+        control_group_update_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('control_group_update', Bits(2)),
+            ('remove_mask', SelectionMask(Bits(9))),
+        ),
+        selection_sync_check_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('selection_sync_data', Struct(
+                ('count', Bits(9)),
+                ('subgroup_count', Bits(9)),
+                ('active_subgroup_index', Bits(9)),
+                ('unit_tags_checksum', UInt32),
+                ('subgroup_indices_checksum', UInt32),
+                ('subgroups_checksum', UInt32),
+            )),
+        ),
+        ai_communicate_event=Struct(
+            ('beacon', Int8),
+            ('ally', Int8),
+            ('flags', Int8),
+            ('build', Int8),
+            ('target_unit_tag', UInt32),
+            ('target_unit_link', UInt16),
+            ('target_upkeep_player_id', UInt8),
+            ('target_control_player_id', UInt8),
+            ('target_point', Point(Int32, Int32, Int32)),
+        ),
+        trigger_ping_event=Struct(
+            ('point', Point(Int32, Int32)),
+            ('unit_tag', UInt32),
+            ('pinged_minimap', Bool),
+        ),
         # I'm not actually sure when this second int is introduced..
-        return dict(
-            transmission_id=data.read_uint32()-2147483648,
-            thread=data.read_uint32(),
-        )
-
-    def achievement_awarded_event(self, data):
-        return dict(
-            achievement_link=data.read_uint16(),
-        )
-
-    def trigger_cutscene_bookmark_fired_event(self, data):
-        return dict(
-            cutscene_id=data.read_uint32()-2147483648,
-            bookmark_name=data.read_aligned_string(data.read_bits(7)),
-        )
-
-    def trigger_cutscene_end_scene_fired_event(self, data):
-        return dict(
-            cutscene_id=data.read_uint32()-2147483648,
-        )
-
-    def trigger_cutscene_conversation_line_event(self, data):
-        return dict(
-            cutscene_id=data.read_uint32()-2147483648,
-            conversation_line=data.read_aligned_string(data.read_bits(7)),
-            alt_conversation_line=data.read_aligned_string(data.read_bits(7)),
-        )
-
-    def trigger_cutscene_conversation_line_missing_event(self, data):
-        return dict(
-            cutscene_id=data.read_uint32()-2147483648,
-            conversation_line=data.read_aligned_string(data.read_bits(7)),
-        )
+        trigger_transmission_offset_event=Struct(
+            ('transmission_id', Int32),
+            ('thread', UInt32),
+        ),
+        achievement_awarded_event=Struct(
+            ('achievement_link', UInt16),
+        ),
+        trigger_cutscene_bookmark_fired_event=Struct(
+            ('cutscene_id', Int32),
+            ('bookmark_name', String(Bits(7))),
+        ),
+        trigger_cutscene_end_scene_fired_event=Struct(
+            ('cutscene_id', Int32),
+        ),
+        trigger_cutscene_conversation_line_event=Struct(
+            ('cutscene_id', Int32),
+            ('conversation_line', String(Bits(7))),
+            ('alt_conversation_line', String(Bits(7))),
+        ),
+        trigger_cutscene_conversation_line_missing_event=Struct(
+            ('cutscene_id', Int32),
+            ('conversation_line', String(Bits(7))),
+        ),
+    )
 
 
 class GameEventsReader_23260(GameEventsReader_22612):
 
-    def trigger_sound_length_sync_event(self, data):
-        return dict(
-            sync_info=dict(
-                sound_hash=[data.read_uint32() for i in range(data.read_bits(7))],
-                length=[data.read_uint32() for i in range(data.read_bits(7))],
-            )
-        )
-
-    def user_options_event(self, data):
-        return dict(
-            game_fully_downloaded=data.read_bool(),
-            development_cheats_enabled=data.read_bool(),
-            multiplayer_cheats_enabled=data.read_bool(),
-            sync_checksumming_enabled=data.read_bool(),
-            is_map_to_map_transition=data.read_bool(),
-            starting_rally=data.read_bool(),
-            use_ai_beacons=data.read_bool(),
-            debug_pause_enabled=None,
-            base_build_num=None,
-        )
+    SCHEMAS = dict(
+        trigger_sound_length_sync_event=Struct(
+            ('sync_info', Struct(
+                ('sound_hash', Array(Bits(7), UInt32)),
+                ('length', Array(Bits(7), UInt32)),
+            )),
+        ),
+        user_options_event=Struct(
+            ('game_fully_downloaded', Bool),
+            ('development_cheats_enabled', Bool),
+            ('multiplayer_cheats_enabled', Bool),
+            ('sync_checksumming_enabled', Bool),
+            ('is_map_to_map_transition', Bool),
+            ('starting_rally', Bool),
+            ('use_ai_beacons', Bool),
+            ('debug_pause_enabled', Null),
+            ('base_build_num', Null),
+        ),
+    )
 
 
 class GameEventsReader_HotSBeta(GameEventsReader_23260):
 
-    def user_options_event(self, data):
-        return dict(
-            game_fully_downloaded=data.read_bool(),
-            development_cheats_enabled=data.read_bool(),
-            multiplayer_cheats_enabled=data.read_bool(),
-            sync_checksumming_enabled=data.read_bool(),
-            is_map_to_map_transition=data.read_bool(),
-            starting_rally=data.read_bool(),
-            debug_pause_enabled=None,
-            base_build_num=data.read_uint32(),
-            use_ai_beacons=None,
-        )
-
-    def selection_delta_event(self, data):
-        return dict(
-            control_group_index=data.read_bits(4),
-            subgroup_index=data.read_bits(9),
-            remove_mask={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Mask', self.read_selection_bitmask(data, data.read_bits(9))),
-                2: lambda: ('OneIndices', [data.read_bits(9) for i in range(data.read_bits(9))]),
-                3: lambda: ('ZeroIndices', [data.read_bits(9) for i in range(data.read_bits(9))]),
-            }[data.read_bits(2)](),
-            add_subgroups=[dict(
-                unit_link=data.read_uint16(),
-                subgroup_priority=data.read_uint8(),
-                intra_subgroup_priority=data.read_uint8(),
-                count=data.read_bits(9),
-            ) for i in range(data.read_bits(9))],
-            add_unit_tags=[data.read_uint32() for i in range(data.read_bits(9))],
-        )
-
-    def camera_update_event(self, data):
-        return dict(
-            target=dict(
-                x=data.read_uint16(),
-                y=data.read_uint16(),
-            ) if data.read_bool() else None,
-            distance=data.read_uint16() if data.read_bool() else None,
-            pitch=data.read_uint16() if data.read_bool() else None,
-            yaw=data.read_uint16() if data.read_bool() else None,
-        )
-
-    def trigger_dialog_control_event(self, data):
-        return dict(
-            control_id=data.read_uint32()-2147483648,
-            event_type=data.read_uint32()-2147483648,
-            event_data={  # Choice
-                0: lambda: ('None', None),
-                1: lambda: ('Checked', data.read_bool()),
-                2: lambda: ('ValueChanged', data.read_uint32()),
-                3: lambda: ('SelectionChanged', data.read_uint32()-2147483648),
-                4: lambda: ('TextChanged', data.read_aligned_string(data.read_bits(11))),
-                5: lambda: ('MouseButton', data.read_uint32())
-            }[data.read_bits(3)](),
-        )
+    SCHEMAS = dict(
+        user_options_event=Struct(
+            ('game_fully_downloaded', Bool),
+            ('development_cheats_enabled', Bool),
+            ('multiplayer_cheats_enabled', Bool),
+            ('sync_checksumming_enabled', Bool),
+            ('is_map_to_map_transition', Bool),
+            ('starting_rally', Bool),
+            ('debug_pause_enabled', Null),
+            ('base_build_num', UInt32),
+            ('use_ai_beacons', Null),
+        ),
+        selection_delta_event=Struct(
+            ('control_group_index', Bits(4)),
+            ('subgroup_index', Bits(9)),
+            ('remove_mask', SelectionMask(Bits(9))),
+            ('add_subgroups', Array(Bits(9), Struct(
+                ('unit_link', UInt16),
+                ('subgroup_priority', UInt8),
+                ('intra_subgroup_priority', UInt8),
+                ('count', Bits(9)),
+            ))),
+            ('add_unit_tags', Array(Bits(9), UInt32)),
+        ),
+        camera_update_event=Struct(
+            ('target', Optional(Point(UInt16, UInt16))),
+            ('distance', Optional(UInt16)),
+            ('pitch', Optional(UInt16)),
+            ('yaw', Optional(UInt16)),
+        ),
+        trigger_dialog_control_event=Struct(
+            ('control_id', Int32),
+            ('event_type', Int32),
+            ('event_data', Choice(3, {
+                0: ('None', Null),
+                1: ('Checked', Bool),
+                2: ('ValueChanged', UInt32),
+                3: ('SelectionChanged', Int32),
+                4: ('TextChanged', String(Bits(11))),
+                5: ('MouseButton', UInt32),
+            })),
+        ),
+    )
 
 
 class GameEventsReader_24247(GameEventsReader_HotSBeta):
 
-    def __init__(self):
-        super(GameEventsReader_24247, self).__init__()
-
-        self.EVENT_DISPATCH.update({
-            7: (UserOptionsEvent, self.user_options_event),       # Override
-            9: (None, self.bank_file_event),                      # Override
-            10: (None, self.bank_section_event),                  # Override
-            11: (None, self.bank_key_event),                      # Override
-            12: (None, self.bank_value_event),                    # Override
-            13: (None, self.bank_signature_event),                # New
-            14: (None, self.camera_save_event),                   # New
-            21: (None, self.save_game_event),                     # New
-            22: (None, self.save_game_done_event),                # Override
-            23: (None, self.load_game_done_event),                # Override
-            43: (HijackReplayGameEvent, self.hijack_replay_game_event),  # New
-            62: (None, self.trigger_target_mode_update_event),    # New
-            101: (PlayerLeaveEvent, self.game_user_leave_event),  # New
-            102: (None, self.game_user_join_event),               # New
-        })
-        del self.EVENT_DISPATCH[8]
-        del self.EVENT_DISPATCH[25]
-        del self.EVENT_DISPATCH[76]
-
-    def bank_signature_event(self, data):
-        return dict(
-            signature=[data.read_uint8() for i in range(data.read_bits(5))],
-            toon_handle=data.read_aligned_string(data.read_bits(7))
-        )
-
-    def camera_save_event(self, data):
-        return dict(
-            which=data.read_bits(3),
-            target=dict(
-                x=data.read_uint16(),
-                y=data.read_uint16(),
-            )
-        )
-
-    def load_game_done_event(self, data):
-        return None
-
-    def hijack_replay_game_event(self, data):
-        return dict(
-            user_infos=[dict(
-                game_user_id=data.read_bits(4),
-                observe=data.read_bits(2),
-                name=data.read_aligned_string(data.read_uint8()),
-                toon_handle=data.read_aligned_string(data.read_bits(7)) if data.read_bool() else None,
-                clan_tag=data.read_aligned_string(data.read_uint8()) if data.read_bool() else None,
-            ) for i in range(data.read_bits(5))],
-            method=data.read_bits(1),
-        )
-
-    def trigger_target_mode_update_event(self, data):
-        return dict(
-            ability_link=data.read_uint16(),
-            ability_command_index=data.read_bits(5),
-            state=data.read_uint8()-128,
-        )
-
-    def game_user_leave_event(self, data):
-        return None
-
-    def game_user_join_event(self, data):
-        return dict(
-            observe=data.read_bits(2),
-            name=data.read_aligned_string(data.read_bits(8)),
-            toon_handle=data.read_aligned_string(data.read_bits(7)) if data.read_bool() else None,
-            clan_tag=data.read_aligned_string(data.read_uint8()) if data.read_bool() else None,
-        )
+    EVENT_TYPES = {
+        7: (UserOptionsEvent, 'user_options_event'),       # Override
+        8: None,
+        9: (None, 'bank_file_event'),                      # Override
+        10: (None, 'bank_section_event'),                  # Override
+        11: (None, 'bank_key_event'),                      # Override
+        12: (None, 'bank_value_event'),                    # Override
+        13: (None, 'bank_signature_event'),                # New
+        14: (None, 'camera_save_event'),                   # New
+        21: (None, 'save_game_event'),                     # New
+        22: (None, 'save_game_done_event'),                # Override
+        23: (None, 'load_game_done_event'),                # Override
+        25: None,
+        43: (HijackReplayGameEvent, 'hijack_replay_game_event'),  # New
+        62: (None, 'trigger_target_mode_update_event'),    # New
+        76: None,
+        101: (PlayerLeaveEvent, 'game_user_leave_event'),  # New
+        102: (None, 'game_user_join_event'),               # New
+    }
+
+    SCHEMAS = dict(
+        bank_signature_event=Struct(
+            ('signature', Array(Bits(5), UInt8)),
+            ('toon_handle', String(Bits(7))),
+        ),
+        camera_save_event=Struct(
+            ('which', Bits(3)),
+            ('target', Point(UInt16, UInt16)),
+        ),
+        load_game_done_event=None,
+        hijack_replay_game_event=Struct(
+            ('user_infos', Array(Bits(5), Struct(
+                ('game_user_id', Bits(4)),
+                ('observe', Bits(2)),
+                ('name', String(UInt8)),
+                ('toon_handle', Optional(String(Bits(7)))),
+                ('clan_tag', Optional(String(UInt8))),
+            ))),
+            ('method', Bits(1)),
+        ),
+        trigger_target_mode_update_event=Struct(
+            ('ability_link', UInt16),
+            ('ability_command_index', Bits(5)),
+            ('state', Int8),
+        ),
+        game_user_leave_event=None,
+        game_user_join_event=Struct(
+            ('observe', Bits(2)),
+            ('name', String(Bits(8))),
+            ('toon_handle', Optional(String(Bits(7)))),
+            ('clan_tag', Optional(String(UInt8))),
+        ),
+    )
 
 
 class GameEventsReader_26490(GameEventsReader_24247):
 
-    def user_options_event(self, data):
-        return dict(
-            game_fully_downloaded=data.read_bool(),
-            development_cheats_enabled=data.read_bool(),
-            multiplayer_cheats_enabled=data.read_bool(),
-            sync_checksumming_enabled=data.read_bool(),
-            is_map_to_map_transition=data.read_bool(),
-            starting_rally=data.read_bool(),
-            debug_pause_enabled=None,
-            base_build_num=data.read_uint32(),
-            use_ai_beacons=None,
-        )
-
-    def trigger_mouse_clicked_event(self, data):
-        return dict(
-            button=data.read_uint32(),
-            down=data.read_bool(),
-            position_ui=dict(
-                x=data.read_uint32(),
-                y=data.read_uint32(),
-            ),
-            position_world=dict(
-                x=data.read_uint32()-2147483648,
-                y=data.read_uint32()-2147483648,
-                z=data.read_uint32()-2147483648,
-            ),
-            flags=data.read_uint8()-128,
-        )
-
-    def trigger_mouse_moved_event(self, data):
-        return dict(
-            position_ui=dict(
-                x=data.read_bits(11),
-                y=data.read_bits(11),
-            ),
-            position_world=dict(
-                x=data.read_bits(20),
-                y=data.read_bits(20),
-                z=data.read_uint32()-2147483648,
-            ),
-            flags=data.read_uint8()-128,
-        )
+    SCHEMAS = dict(
+        user_options_event=Struct(
+            ('game_fully_downloaded', Bool),
+            ('development_cheats_enabled', Bool),
+            ('multiplayer_cheats_enabled', Bool),
+            ('sync_checksumming_enabled', Bool),
+            ('is_map_to_map_transition', Bool),
+            ('starting_rally', Bool),
+            ('debug_pause_enabled', Null),
+            ('base_build_num', UInt32),
+            ('use_ai_beacons', Null),
+        ),
+        trigger_mouse_clicked_event=Struct(
+            ('button', UInt32),
+            ('down', Bool),
+            ('position_ui', Point(UInt32, UInt32)),
+            ('position_world', Point(Int32, Int32, Int32)),
+            ('flags', Int8),
+        ),
+        trigger_mouse_moved_event=Struct(
+            ('position_ui', Point(Bits(11), Bits(11))),
+            ('position_world', Point(Bits(20), Bits(20), Int32)),
+            ('flags', Int8),
+        ),
+    )
+
+
+def _read_vint(contents, used):
+    # A vint from byte aligned contents and the position after it
+    byte = first = contents[used]
+    result = (byte & 0x7F) >> 1
+    bits = 6
+    while byte & 0x80:
+        used += 1
+        byte = contents[used]
+        result |= (byte & 0x7F) << bits
+        bits += 7
+    return (-result if first & 0x01 else result), used + 1
+
+
+#: Field types for the tracker event layouts
+VINT, BLOB, OPTIONAL_VINT, VINT_ARRAY, VINT_STRUCT = 'vint', 'blob', 'optional_vint', 'vint_array', 'vint_struct'
+
+# The statements reading each field type into v<key>, after checking the
+# key and type tag bytes. Any mismatch returns None.
+_TRACKER_FIELDS = {
+    VINT: [
+        "if c[i] != {key} or c[i+1] != 9: return None",
+        "b = c[i+2]",
+        "if b & 0x80:",
+        "    v{index}, i = read_vint(c, i+2)",
+        "else:",
+        "    v{index} = -(b >> 1) if b & 1 else b >> 1",
+        "    i += 3",
+    ],
+    BLOB: [
+        "if c[i] != {key} or c[i+1] != 2: return None",
+        "n, i = read_vint(c, i+2)",
+        "v{index} = bytes(c[i:i+n])",
+        "i += n",
+    ],
+    OPTIONAL_VINT: [
+        "if c[i] != {key} or c[i+1] != 4: return None",
+        "if c[i+2]:",
+        "    if c[i+3] != 9: return None",
+        "    v{index}, i = read_vint(c, i+4)",
+        "else:",
+        "    v{index} = None",
+        "    i += 3",
+    ],
+    VINT_ARRAY: [
+        "if c[i] != {key} or c[i+1] != 0: return None",
+        "n, i = read_vint(c, i+2)",
+        "v{index} = list()",
+        "for _ in range(n):",
+        "    if c[i] != 9: return None",
+        "    v, i = read_vint(c, i+1)",
+        "    v{index}.append(v)",
+    ],
+    # A struct of vints keyed 0 to n-1
+    VINT_STRUCT: [
+        "if c[i] != {key} or c[i+1] != 5: return None",
+        "n, i = read_vint(c, i+2)",
+        "v{index} = dict()",
+        "for k in range(n):",
+        "    if c[i] != k << 1 or c[i+1] != 9: return None",
+        "    v{index}[k], i = read_vint(c, i+2)",
+    ],
+}
+
+
+def compile_tracker_parsers(layouts):
+    """ Compiles a dict of tracker event layouts, the field types in key
+    order, into parser functions. Each takes the contents and the position
+    of an event's struct and returns the field values as a list with the
+    position after them, or None if the struct doesn't match the layout.
+    """
+    source = list()
+    for etype, layout in sorted(layouts.items()):
+        # Counts and keys under 64 are encoded in a single byte
+        source.append("def parse_{0}(c, i):".format(etype))
+        source.append("    if c[i] != 5 or c[i+1] != {0}: return None".format(len(layout) << 1))
+        source.append("    i += 2")
+        for index, field in enumerate(layout):
+            source.extend("    "+line.format(key=index << 1, index=index) for line in _TRACKER_FIELDS[field])
+        source.append("    return [{0}], i".format(", ".join("v{0}".format(index) for index in range(len(layout)))))
+    namespace = dict(read_vint=_read_vint)
+    exec(compile("\n".join(source), "<sc2reader.readers>", "exec"), namespace)
+    return dict((etype, namespace['parse_{0}'.format(etype)]) for etype in layouts)
 
 
 class TrackerEventsReader(object):
 
+    #: The known field layout of each event type. Event types without a
+    #: layout, and events that don't match theirs (from builds that added
+    #: fields), are decoded with :meth:`CursorBitPackedDecoder.read_struct`.
+    LAYOUTS = {
+        0: (VINT, VINT_STRUCT),  # PlayerStatsEvent
+        1: (VINT, VINT, BLOB, VINT, VINT, VINT, VINT),  # UnitBornEvent
+        2: (VINT, VINT, OPTIONAL_VINT, VINT, VINT),  # UnitDiedEvent
+        3: (VINT, VINT, VINT, VINT),  # UnitOwnerChangeEvent
+        4: (VINT, VINT, BLOB),  # UnitTypeChangeEvent
+        5: (VINT, BLOB, VINT),  # UpgradeCompleteEvent
+        6: (VINT, VINT, BLOB, VINT, VINT, VINT, VINT),  # UnitInitEvent
+        7: (VINT, VINT),  # UnitDoneEvent
+        8: (VINT, VINT_ARRAY),  # UnitPositionsEvent
+    }
+
     def __init__(self):
         self.EVENT_DISPATCH = {
             0: PlayerStatsEvent,
@@ -1444,19 +1661,109 @@ class TrackerEventsReader(object):
             7: UnitDoneEvent,
             8: UnitPositionsEvent,
         }
+        self.parsers = self.compiled_parsers()
+
+    @classmethod
+    def compiled_parsers(cls):
+        """ Returns the parsers compiled from the class layouts. They are only compiled once. """
+        if (cls, False) not in _compiled_parsers:
+            _compiled_parsers[cls, False] = compile_tracker_parsers(cls.LAYOUTS)
+        return _compiled_parsers[cls, False]
 
     def __call__(self, data, replay):
-        decoder = BitPackedDecoder(data)
+        return list(self.iter_events(data, replay, replay.event_tables))
+
+    def iter_events(self, data, replay, event_tables=None):
+        """ Yields the tracker events one at a time as they are decoded. Events
+        with a table in event_tables are added to it as they are created.
+        """
+        # The tracker events are byte aligned so they are read straight from
+        # the contents instead of through the replay's decoder
+        contents = bytearray(data) if sys.version_info[0] < 3 else data
+        fallback = CursorBitPackedDecoder(contents)
+        parsers = self.parsers
+        read_vint = _read_vint
+
+        EVENT_DISPATCH = self.EVENT_DISPATCH
+        event_filter = replay.event_filter
+        stats_matrix = event_tables.player_stats if event_tables is not None else None
+        keep = None
+        if event_filter is not None:
+            keep = dict((event_class, event_filter.accepts(event_class)) for event_class in EVENT_DISPATCH.values())
+            if event_tables is not None:
+                event_filter = AnyFilter(event_filter, event_tables.event_filter)
+            EVENT_DISPATCH = dict((etype, event_class if event_filter.accepts(event_class) else None) for etype, event_class in EVENT_DISPATCH.items())
 
         frames = 0
-        events = list()
-        while not decoder.done():
-            decoder._buffer.read(3)  # 03 00 09
-            frames += decoder.read_vint()
-            decoder._buffer.read(1)  # 09
-            etype = decoder.read_vint()
-            event_data = decoder.read_struct()
-            event = self.EVENT_DISPATCH[etype](frames, event_data, replay.build)
-            events.append(event)
-
-        return events
+        used, length = 0, len(contents)
+        while used < length:
+            # 03 ?? 09 <frames> 09 <event type> <struct>
+            delta, used = read_vint(contents, used+3)
+            frames += delta
+            etype, used = read_vint(contents, used+1)
+            parser = parsers.get(etype)
+            parsed = parser(contents, used) if parser is not None else None
+            if parsed is not None:
+                event_data, used = parsed
+            else:
+                fallback.seek(used)
+                event_data = fallback.read_struct()
+                used = fallback.tell()
+            if etype == 0 and stats_matrix is not None:
+                stats_matrix.add(frames, event_data[0], event_data[1], replay.build)
+            event_class = EVENT_DISPATCH[etype]
+            if event_class is not None:
+                event = event_class(frames, event_data, replay.build)
+                if event_tables is not None:
+                    event_tables.add(event)
+                if keep is None or keep[event_class]:
+                    yield event
+
+
+def _any_build(replay):
+    return 0
+
+
+#: The default reader class for each replay data file. Game event readers
+#: are indexed by (major version, base build) since the HotS beta builds
+#: need a reader of their own.
+DEFAULT_READERS = {
+    'replay.details': BuildIndex(_any_build, [(0, DetailsReader)]),
+    'replay.initData': BuildIndex(_any_build, [(0, InitDataReader)]),
+    'replay.tracker.events': BuildIndex(_any_build, [(0, TrackerEventsReader)]),
+    'replay.message.events': BuildIndex(_any_build, [(0, MessageEventsReader)]),
+    'replay.attributes.events': BuildIndex(_any_build, [(0, AttributesEventsReader)]),
+    'replay.game.events': BuildIndex(lambda r: (r.versions[1], r.base_build), [
+        ((1, 15405), GameEventsReader_15405),
+        ((1, 16561), GameEventsReader_16561),
+        ((1, 17326), GameEventsReader_17326),
+        ((1, 18574), GameEventsReader_18574),
+        ((1, 19595), GameEventsReader_19595),
+        ((1, 22612), GameEventsReader_22612),
+        ((1, 23260), GameEventsReader_23260),
+        ((1, 24247), GameEventsReader_24247),
+        ((1, 26490), GameEventsReader_26490),
+        ((2, 0), GameEventsReader_HotSBeta),
+        ((2, 24247), GameEventsReader_24247),
+        ((2, 26490), GameEventsReader_26490),
+    ]),
+}
+
+# One instance of each reader class, see get_default_reader
+_default_readers = dict()
+
+
+def get_default_reader(data_file, replay):
+    """
+    Returns the default reader for the data file of the given replay or None
+    if there isn't one. Readers don't keep any state between replays so each
+    class is only instantiated once, when first needed, and shared by every
+    replay in the process.
+    """
+    index = DEFAULT_READERS.get(data_file)
+    reader_class = index.get(replay) if index is not None else None
+    if reader_class is None:
+        return None
+    elif reader_class not in _default_readers:
+        _default_readers[reader_class] = reader_class()
+    return _default_readers[reader_class]
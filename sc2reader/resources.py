@@ -4,12 +4,20 @@ from __future__ import absolute_import, print_function, unicode_literals, divisi
 from collections import defaultdict, namedtuple
 from datetime import datetime
 import hashlib
+import heapq
+import itertools
+import mmap
+import os
+from operator import attrgetter
+import struct
 import sys
+from timeit import default_timer
 from xml.etree import ElementTree
 import zlib
 
 import mpyq
 import sc2reader
+from sc2reader import mpq
 from sc2reader import utils
 from sc2reader.decoders import BitPackedDecoder
 from sc2reader import log_utils
@@ -17,11 +25,101 @@ from sc2reader import readers
 from sc2reader import exceptions
 from sc2reader.data import builds as datapacks
 from sc2reader.exceptions import SC2ReaderLocalizationError
+from sc2reader.events.tracker import PlayerStatsEvent
 from sc2reader.objects import Participant, Observer, Computer, Team, PlayerSummary, Graph, BuildEntry, MapInfo
 from sc2reader.constants import REGIONS, GAME_SPEED_FACTOR, LOBBY_PROPERTIES
 
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+#: The (expansion, version) of the default datapack for each replay, indexed
+#: by (expansion, build). Datapacks are only loaded once they're selected.
+DEFAULT_DATAPACKS = utils.BuildIndex(lambda r: (r.expansion, r.build), [
+    (('HotS', 0), ('HotS', 'base')),
+    (('HotS', 23925), ('HotS', '23925')),
+    (('HotS', 24247), ('HotS', '24247')),
+    (('HotS', 24764), ('HotS', '24764')),
+    (('WoL', 0), None),
+    (('WoL', 16117), ('WoL', '16117')),
+    (('WoL', 17326), ('WoL', '17326')),
+    (('WoL', 18092), ('WoL', '18092')),
+    (('WoL', 19458), ('WoL', '19458')),
+    (('WoL', 22612), ('WoL', '22612')),
+    (('WoL', 24944), ('WoL', '24944')),
+])
+
+
+#: The user data header is at the start of the file and almost always fits
+#: in the first read of this many bytes
+HEADER_PEEK_SIZE = 1024
+
+# magic, user data size, mpq header offset, user data header size
+USER_DATA_HEADER = struct.Struct(str('<4sIII'))
+
+
+def peek_header(source):
+    """
+    :param source: The path, file object or bytes of a replay
+
+    Reads the versions, build, base_build, release_string and frames of a
+    replay from just the MPQ user data header, without opening the archive
+    or creating a :class:`Replay`. The header is read with one small read.
+    """
+    # Python 2 paths are bytes too, only take those naming a file as paths
+    if isinstance(source, bytes) and (bytes is not str or b'\0' in source or not os.path.exists(source)):
+        return _read_header(_user_data(source[:HEADER_PEEK_SIZE], lambda size: source[HEADER_PEEK_SIZE:HEADER_PEEK_SIZE+size]))
+    elif isinstance(source, basestring):
+        with open(source, 'rb') as replay_file:
+            return peek_header(replay_file)
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return _read_header(_user_data(source.read(HEADER_PEEK_SIZE), source.read))
+
+
+def _user_data(data, read_more):
+    if len(data) < USER_DATA_HEADER.size or data[:4] != b'MPQ\x1b':
+        raise exceptions.MPQError("No MPQ user data header found")
+    magic, user_data_size, mpq_header_offset, header_size = USER_DATA_HEADER.unpack(data[:USER_DATA_HEADER.size])
+    end = USER_DATA_HEADER.size+header_size
+    if end > len(data):
+        data += read_more(end-len(data))
+    return data[USER_DATA_HEADER.size:end]
+
+
+def open_archive(source, listfile=False, **options):
+    """
+    :param source: A path or seekable binary file object
+    :param listfile: Set to True to read the archive's list of files
+
+    Opens an MPQ archive with :class:`sc2reader.mpq.MPQArchive`, or with
+    ``mpyq.MPQArchive`` when the ``mpyq`` option is set.
+    """
+    if options.get('mpyq', False):
+        return mpyq.MPQArchive(source, listfile=listfile)
+    return mpq.MPQArchive(source, listfile=listfile)
+
+
+def _read_header(content, decoder=BitPackedDecoder):
+    header_data = decoder(content).read_struct()
+    versions = list(header_data[1].values())
+    return utils.AttributeDict(
+        versions=versions,
+        frames=header_data[3],
+        build=versions[4],
+        base_build=versions[5],
+        release_string="{0}.{1}.{2}.{3}".format(*versions[1:5]),
+    )
+
 
 class Resource(object):
+
+    #: Attributes tied to the loading process that are left out when pickled.
+    unpickled_attributes = ('factory', 'archive', 'logger')
+
     def __init__(self, file_object, filename=None, factory=None, **options):
         self.factory = factory
         self.opt = utils.AttributeDict(options)
@@ -30,12 +128,95 @@ class Resource(object):
 
         if hasattr(file_object, 'seek'):
             file_object.seek(0)
-            self.filehash = hashlib.sha256(file_object.read()).hexdigest()
+            # Memory maps are hashed in place instead of read into a copy
+            contents = file_object if isinstance(file_object, mmap.mmap) else file_object.read()
+            self.filehash = hashlib.sha256(contents).hexdigest()
             file_object.seek(0)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in self.unpickled_attributes:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.factory = None
+        self.logger = log_utils.get_logger(self.__class__)
+
+
+class LazyAttribute(object):
+    """
+    Stands in for a replay attribute that hasn't been loaded yet. Reading it
+    loads the replay as far as needed, after which the loaded value in the
+    instance dictionary takes precedence over the descriptor. Attributes with
+    a ``build`` function are put together by it whenever they are missing.
+    """
+    #: Marks attributes without a class level default
+    MISSING = object()
+
+    def __init__(self, name, load_level, default=MISSING, build=None):
+        self.name = name
+        self.load_level = load_level
+        self.default = default
+        self.build = build
+
+    def __get__(self, replay, owner):
+        if replay is None and self.default is not self.MISSING:
+            return self.default
+        elif replay is None:
+            return self
+
+        replay.load_lazy_attributes(self.load_level)
+        try:
+            return replay.__dict__[self.name]
+        except KeyError:
+            if self.build is not None:
+                value = replay.__dict__[self.name] = self.build(replay)
+                return value
+            elif self.default is not self.MISSING:
+                return self.default
+            raise AttributeError("'{0}' object has no attribute '{1}'".format(owner.__name__, self.name))
+
 
 class Replay(Resource):
 
+    #: The load level each attribute is complete at when loading lazily. None
+    #: marks attributes that are only complete once the engine has run.
+    lazy_attributes = dict(
+        (name, 2) for name in [
+            'players', 'observers', 'humans', 'computers', 'entities', 'people', 'clients', 'teams',
+            'player', 'observer', 'human', 'computer', 'entity', 'person', 'client', 'team', 'winner',
+            'recorder', 'real_type', 'people_hash', 'is_ladder',
+            'messages', 'pings', 'packets', 'message_events',
+        ]
+    )
+    lazy_attributes.update(
+        tracker_events=3,
+        player_stats_matrix=3,
+        game_events=4,
+        events=None,
+        objects=None,
+        active_units=None,
+        units=None,
+        unit=None,
+        resume_from_replay=None,
+        plugins=None,
+        plugin_result=None,
+        plugin_failures=None,
+    )
+
+    #: Attributes tied to the loading process that are left out when pickled.
+    unpickled_attributes = Resource.unpickled_attributes + ('registered_readers', 'registered_datapacks', '_event_data', '_extracting')
+
+    #: The data files read at each load level
+    data_files = {
+        1: ['replay.initData', 'replay.details', 'replay.attributes.events'],
+        2: ['replay.message.events'],
+        3: ['replay.tracker.events'],
+        4: ['replay.game.events'],
+    }
+
     #: A nested dictionary of player => { attr_name : attr_value } for
     #: known attributes. Player 16 represents the global context and
     #: contains attributes like game speed.
@@ -194,11 +375,45 @@ class Replay(Resource):
     resume_user_info = None
 
 
-    def __init__(self, replay_file, filename=None, load_level=4, engine=sc2reader.engine, **options):
+    def __init__(self, replay_file, filename=None, load_level=4, engine=sc2reader.engine, decoder=BitPackedDecoder, **options):
         super(Replay, self).__init__(replay_file, filename, **options)
+        self._lazy = None
         self.datapack = None
         self.raw_data = dict()
 
+        # The readers and contents of event files that are decoded as they
+        # are streamed through the engine, see the stream option
+        self._event_data = dict()
+
+        # The data files being extracted on a thread pool, see the
+        # extract_threads option
+        self._extracting = dict()
+
+        # The decoder class used by the readers for bit packed files
+        self.decoder = decoder
+
+        # Wall time spent in each stage of loading when profiling, else None
+        self.timings = utils.Timings() if options.get('profile', False) else None
+
+        # Limits the events built by the readers, None to build them all
+        self.event_filter = None
+        if options.get('event_types') is not None or options.get('exclude_event_types'):
+            self.event_filter = readers.EventFilter(options.get('event_types'), options.get('exclude_event_types'))
+
+        # The event tables filled in by the readers, see the event_tables option
+        self.event_tables = None
+        if options.get('event_tables') or options.get('player_stats_matrix'):
+            player_stats = readers.PlayerStatsMatrix() if options.get('player_stats_matrix') else None
+            self.event_tables = readers.EventTables(options.get('event_tables') or [], player_stats)
+
+        # The (first, last) frames of the game events to read, see the
+        # frame_range option, and the checkpoints saved for the seek_index option
+        self.frame_range = options.get('frame_range')
+        self.seek_index = None
+        if options.get('seek_index') and getattr(self, 'filehash', None):
+            index_path = os.path.join(options['seek_index'], self.filehash+'.seek')
+            self.seek_index = readers.SeekIndex.load(index_path, options.get('seek_index_interval', 1000))
+
         # The current load level of the replay
         self.load_level = None
 
@@ -215,7 +430,6 @@ class Replay(Resource):
         self.map = None
         self.map_hash = ""
         self.gateway = ""
-        self.events = list()
         self.events_by_type = defaultdict(list)
         self.teams, self.team = list(), dict()
 
@@ -234,7 +448,9 @@ class Replay(Resource):
         self.attributes = defaultdict(dict)
         self.messages = list()
         self.recorder = None  # Player object
+        self.pings = list()
         self.packets = list()
+        self.message_events = list()
         self.objects = {}
         self.active_units = {}
         self.game_fps = 16.0
@@ -254,59 +470,117 @@ class Replay(Resource):
         # Since the underlying traceback isn't important to most people, don't expose it in python2 anymore
         if load_level >= 0:
             self.load_level = 0
+            start = default_timer()
             try:
-                self.archive = mpyq.MPQArchive(replay_file, listfile=False)
+                self.archive = open_archive(replay_file, **options)
             except Exception as e:
                 raise exceptions.MPQError("Unable to construct the MPQArchive", e)
-
-            header_content = self.archive.header['user_data_header']['content']
-            header_data = BitPackedDecoder(header_content).read_struct()
-            self.versions = list(header_data[1].values())
-            self.frames = header_data[3]
-            self.build = self.versions[4]
-            self.base_build = self.versions[5]
-            self.release_string = "{0}.{1}.{2}.{3}".format(*self.versions[1:5])
+            self._record('mpq open', start, self.archive.header['archive_size'])
+
+            header = _read_header(self.archive.header['user_data_header']['content'], self.decoder)
+            self.versions = header.versions
+            self.frames = header.frames
+            self.build = header.build
+            self.base_build = header.base_build
+            self.release_string = header.release_string
             self.game_length = utils.Length(seconds=self.frames/16)
             self.length = self.real_length = utils.Length(seconds=int(self.frames/self.game_fps))
 
+        # Start extracting every data file the load levels will read, lazy
+        # replays only read the details up front
+        if options.get('extract_threads') and load_level >= 1:
+            last_level = 1 if options.get('lazy', False) else load_level
+            data_files = [data_file for level in range(1, last_level+1) for data_file in self.data_files[level]]
+            self._extracting = utils.extract_data_files(data_files, self.archive, options['extract_threads'])
+
         # Load basic details if requested
         if load_level >= 1:
             self.load_level = 1
-            for data_file in ['replay.initData', 'replay.details', 'replay.attributes.events']:
+            for data_file in self.data_files[1]:
                 self._read_data(data_file, self._get_reader(data_file))
+            start = default_timer()
             self.load_details()
+            self._record('load_details', start)
             self.datapack = self._get_datapack()
 
             # Can only be effective if map data has been loaded
             if options.get('load_map', False):
                 self.load_map()
 
-        # Load players if requested
-        if load_level >= 2:
-            self.load_level = 2
-            for data_file in ['replay.message.events']:
+        # With the lazy option everything past the details is loaded the
+        # first time one of the lazy_attributes is used
+        if options.get('lazy', False) and load_level >= 2:
+            self._lazy = (load_level, engine)
+            self._lazy_values = dict()
+            self._hide_lazy_attributes()
+
+        else:
+            for level in range(2, load_level+1):
+                self._load_level(level)
+
+            # Run this replay through the engine as indicated
+            if engine:
+                self._run_engine(engine)
+
+    def _load_level(self, load_level):
+        self.load_level = load_level
+
+        # Load players
+        if load_level == 2:
+            for data_file in self.data_files[2]:
                 self._read_data(data_file, self._get_reader(data_file))
             self.load_message_events()
+            start = default_timer()
             self.load_players()
+            self._record('load_players', start)
 
-        # Load tracker events if requested
-        if load_level >= 3:
-            self.load_level = 3
-            for data_file in ['replay.tracker.events']:
-                self._read_data(data_file, self._get_reader(data_file))
+        # Load tracker events
+        elif load_level == 3:
+            for data_file in self.data_files[3]:
+                self._read_events(data_file, self._get_reader(data_file))
             self.load_tracker_events()
 
-
-        # Load events if requested
-        if load_level >= 4:
-            self.load_level = 4
-            for data_file in ['replay.game.events']:
-                self._read_data(data_file, self._get_reader(data_file))
+        # Load events
+        elif load_level == 4:
+            for data_file in self.data_files[4]:
+                self._read_events(data_file, self._get_reader(data_file))
             self.load_game_events()
 
-        # Run this replay through the engine as indicated
-        if engine:
-            engine.run(self)
+    def load_lazy_attributes(self, load_level=None):
+        """
+        :param load_level: The level to load up to, everything if None
+
+        Loads a lazy replay up to the given load level. Once everything asked
+        for at construction is loaded the replay is run through the engine.
+        Does nothing for replays that weren't loaded lazily.
+        """
+        if self._lazy is None:
+            return
+
+        lazy_level, engine = self._lazy
+        if load_level is None or load_level > lazy_level:
+            load_level = lazy_level
+        if load_level <= self.load_level:
+            return
+
+        # Put everything back in place while the next levels load
+        self.__dict__.update(self._lazy_values)
+        self._lazy_values = dict()
+        for level in range(self.load_level+1, load_level+1):
+            self._load_level(level)
+
+        if load_level < lazy_level:
+            self._hide_lazy_attributes()
+        else:
+            self._lazy = self._lazy_values = None
+            if engine:
+                self._run_engine(engine)
+
+    def _hide_lazy_attributes(self):
+        # Attributes missing from the instance fall through to the LazyAttribute
+        for name, load_level in self.lazy_attributes.items():
+            if (load_level is None or load_level > self.load_level) and name in self.__dict__:
+                self._lazy_values[name] = self.__dict__.pop(name)
 
     def load_details(self):
         if 'replay.attributes.events' in self.raw_data:
@@ -484,7 +758,7 @@ class Replay(Resource):
         self.packets = self.raw_data['replay.message.events'].packets
 
         self.message_events = self.messages+self.pings+self.packets
-        self.events = sorted(self.events + self.message_events, key=lambda e: e.frame)
+        self.__dict__.pop('events', None)
 
     def load_game_events(self):
         # Copy the events over
@@ -493,19 +767,48 @@ class Replay(Resource):
             return
 
         self.game_events = self.raw_data['replay.game.events']
-        self.events = sorted(self.events+self.game_events, key=lambda e: e.frame)
+        self.__dict__.pop('events', None)
 
-        # hideous hack for HotS 2.0.0.23925, see https://github.com/GraylinKim/sc2reader/issues/87
-        if self.events and self.events[-1].frame > self.frames:
-            self.frames = self.events[-1].frame
-            self.length = utils.Length(seconds=int(self.frames/self.game_fps))
+        self._fix_frames(max([stream[-1].frame for stream in self._event_streams() if stream] or [0]))
 
     def load_tracker_events(self):
         if 'replay.tracker.events' not in self.raw_data:
             return
 
         self.tracker_events = self.raw_data['replay.tracker.events']
-        self.events = sorted(self.tracker_events + self.events, key=lambda e: e.frame)
+        self.__dict__.pop('events', None)
+
+    def iter_events(self):
+        """
+        Returns an iterator over all the replay events in the same order as
+        :attr:`events` without putting them into one list. Lazy replays are
+        loaded in full first.
+
+        Replays loaded with the stream option decode their tracker and game
+        events again on each call. These events haven't been through the engine.
+        """
+        self.load_lazy_attributes()
+        return self._merge_streams()
+
+    def event_table(self, type_name):
+        """
+        Returns the ``table_columns`` of the events of the given type, and its
+        subclasses, as a dict of numpy arrays keyed by attribute name. Without
+        numpy the columns are returned as ``array.array`` objects. Missing
+        integer values are -1 and missing floats NaN.
+
+        Tables for the types listed in the event_tables option are filled in
+        by the readers, even for events that are filtered out with the
+        event_types option. Any other table is built from :meth:`iter_events`.
+        """
+        self.load_lazy_attributes()
+        if self.event_tables is not None and type_name in self.event_tables:
+            return self.event_tables[type_name].export()
+
+        tables = readers.EventTables([type_name])
+        for event in self.iter_events():
+            tables.add(event)
+        return tables[type_name].export()
 
     def register_reader(self, data_file, reader, filterfunc=lambda r: True):
         """
@@ -548,64 +851,194 @@ class Replay(Resource):
 
     # Override points
     def register_default_readers(self):
-        """Registers factory default readers."""
-        self.register_reader('replay.details', readers.DetailsReader(), lambda r: True)
-        self.register_reader('replay.initData', readers.InitDataReader(), lambda r: True)
-        self.register_reader('replay.tracker.events', readers.TrackerEventsReader(), lambda r: True)
-        self.register_reader('replay.message.events', readers.MessageEventsReader(), lambda r: True)
-        self.register_reader('replay.attributes.events', readers.AttributesEventsReader(), lambda r: True)
-
-        self.register_reader('replay.game.events', readers.GameEventsReader_15405(), lambda r: 15405 <= r.base_build < 16561)
-        self.register_reader('replay.game.events', readers.GameEventsReader_16561(), lambda r: 16561 <= r.base_build < 17326)
-        self.register_reader('replay.game.events', readers.GameEventsReader_17326(), lambda r: 17326 <= r.base_build < 18574)
-        self.register_reader('replay.game.events', readers.GameEventsReader_18574(), lambda r: 18574 <= r.base_build < 19595)
-        self.register_reader('replay.game.events', readers.GameEventsReader_19595(), lambda r: 19595 <= r.base_build < 22612)
-        self.register_reader('replay.game.events', readers.GameEventsReader_22612(), lambda r: 22612 <= r.base_build < 23260)
-        self.register_reader('replay.game.events', readers.GameEventsReader_23260(), lambda r: 23260 <= r.base_build < 24247)
-        self.register_reader('replay.game.events', readers.GameEventsReader_24247(), lambda r: 24247 <= r.base_build < 26490)
-        self.register_reader('replay.game.events', readers.GameEventsReader_26490(), lambda r: 26490 <= r.base_build)
-        self.register_reader('replay.game.events', readers.GameEventsReader_HotSBeta(), lambda r: r.versions[1] == 2 and r.build < 24247)
-
+        """
+        Registers factory default readers. The defaults are shared by every
+        replay and looked up after the registered readers, see
+        :data:`sc2reader.readers.DEFAULT_READERS`.
+        """
 
     def register_default_datapacks(self):
-        """Registers factory default datapacks."""
-        self.register_datapack(datapacks['WoL']['16117'], lambda r: r.expansion == 'WoL' and 16117 <= r.build < 17326)
-        self.register_datapack(datapacks['WoL']['17326'], lambda r: r.expansion == 'WoL' and 17326 <= r.build < 18092)
-        self.register_datapack(datapacks['WoL']['18092'], lambda r: r.expansion == 'WoL' and 18092 <= r.build < 19458)
-        self.register_datapack(datapacks['WoL']['19458'], lambda r: r.expansion == 'WoL' and 19458 <= r.build < 22612)
-        self.register_datapack(datapacks['WoL']['22612'], lambda r: r.expansion == 'WoL' and 22612 <= r.build < 24944)
-        self.register_datapack(datapacks['WoL']['24944'], lambda r: r.expansion == 'WoL' and 24944 <= r.build)
-        self.register_datapack(datapacks['HotS']['base'], lambda r: r.expansion == 'HotS' and r.build < 23925)
-        self.register_datapack(datapacks['HotS']['23925'], lambda r: r.expansion == 'HotS' and 23925 <= r.build < 24247)
-        self.register_datapack(datapacks['HotS']['24247'], lambda r: r.expansion == 'HotS' and 24247 <= r.build <= 24764)
-        self.register_datapack(datapacks['HotS']['24764'], lambda r: r.expansion == 'HotS' and 24764 <= r.build)
+        """
+        Registers factory default datapacks. The defaults are shared by every
+        replay and looked up after the registered datapacks, see
+        :data:`sc2reader.resources.DEFAULT_DATAPACKS`.
+        """
+
+    def __getstate__(self):
+        self.load_lazy_attributes()
+        return super(Replay, self).__getstate__()
+
+    def __setstate__(self, state):
+        super(Replay, self).__setstate__(state)
+        self._event_data = dict()
+        self.registered_readers = defaultdict(list)
+        self.register_default_readers()
+        self.registered_datapacks = list()
+        self.register_default_datapacks()
 
     # Internal Methods
+    def _run_engine(self, engine):
+        start = default_timer()
+        if self._event_data:
+            engine.run(self, events=self._stream_events())
+        else:
+            engine.run(self)
+        self._record('engine', start)
+
+    def _stream_events(self):
+        # The engine's pass over the streamed files is the one that fills in
+        # the event tables
+        event = None
+        for event in self._merge_streams(self.event_tables):
+            yield event
+
+        # Streamed game events can only fix the frame count once they run out
+        if event is not None and 'replay.game.events' in self._event_data:
+            self._fix_frames(event.frame)
+
+    def _merge_streams(self, event_tables=None):
+        streams = self._event_streams()
+        for index, data_file in [(0, 'replay.tracker.events'), (4, 'replay.game.events')]:
+            if data_file in self._event_data:
+                reader, data = self._event_data[data_file]
+                streams[index] = reader.iter_events(data, self, event_tables)
+
+        try:
+            return heapq.merge(*streams, key=attrgetter('frame'))
+        except TypeError:
+            # heapq.merge takes no key before python 3.5
+            return iter(sorted(itertools.chain(*streams), key=attrgetter('frame')))
+
+    def _fix_frames(self, last_frame):
+        # hideous hack for HotS 2.0.0.23925, see https://github.com/GraylinKim/sc2reader/issues/87
+        if last_frame > self.frames:
+            self.frames = last_frame
+            self.length = utils.Length(seconds=int(self.frames/self.game_fps))
+
+    def _event_streams(self):
+        # Each stream is in frame order already. Events on the same frame go
+        # tracker events first, then messages, pings, packets and game events.
+        return [self.tracker_events, self.messages, self.pings, self.packets, self.game_events]
+
+    def _build_events(self):
+        # The sort finds the presorted streams and merges them in linear time
+        start = default_timer()
+        events = sorted(itertools.chain(*self._event_streams()), key=attrgetter('frame'))
+        self._record('merge events', start)
+        return events
+
+    def _build_player_stats_matrix(self):
+        # Replays loaded with the player_stats_matrix option have theirs
+        # filled in by the tracker reader
+        if self.event_tables is not None and self.event_tables.player_stats is not None:
+            return self.event_tables.player_stats
+
+        tracker_events = self.tracker_events
+        if 'replay.tracker.events' in self._event_data:
+            reader, data = self._event_data['replay.tracker.events']
+            tracker_events = reader.iter_events(data, self)
+
+        matrix = readers.PlayerStatsMatrix()
+        for event in tracker_events:
+            if isinstance(event, PlayerStatsEvent):
+                matrix.add(event.frame, event.pid, event.stats, self.build)
+        return matrix
+
+    def _record(self, stage, start, size=None):
+        if self.timings is not None:
+            self.timings.record(stage, default_timer()-start, size)
+
     def _get_reader(self, data_file):
         for callback, reader in self.registered_readers[data_file]:
             if callback(self):
                 return reader
-        else:
+
+        reader = readers.get_default_reader(data_file, self)
+        if reader is None:
             raise ValueError("Valid {0} reader could not found for build {1}".format(data_file, self.build))
+        return reader
 
     def _get_datapack(self):
         for callback, datapack in self.registered_datapacks:
             if callback(self):
                 return datapack
-        else:
-            return None
+
+        datapack = DEFAULT_DATAPACKS.get(self)
+        if datapack is not None:
+            expansion, version = datapack
+            return datapacks[expansion][version]
+        return None
+
+    def _extract_data_file(self, data_file):
+        # Files the pool is extracting are waited on. Anything else is read
+        # once the pool is done with the archive.
+        if data_file in self._extracting:
+            return self._extracting.pop(data_file).get()
+        for result in self._extracting.values():
+            result.wait()
+        return utils.extract_data_file(data_file, self.archive)
+
+    def _read_events(self, data_file, reader):
+        # With the stream option event files are only extracted here, they are
+        # decoded as the engine works through them
+        if not self.opt.get('stream', False) or not hasattr(reader, 'iter_events'):
+            return self._read_data(data_file, reader)
+
+        start = default_timer()
+        data = self._extract_data_file(data_file)
+        self._record('extract '+data_file, start, len(data) if data else None)
+        if data:
+            self._event_data[data_file] = (reader, data)
+        elif self.opt.debug and data_file not in ['replay.message.events', 'replay.tracker.events']:
+            raise ValueError("{0} not found in archive".format(data_file))
 
     def _read_data(self, data_file, reader):
-        data = utils.extract_data_file(data_file, self.archive)
+        # Parse caching factories can hand back the output of an earlier read
+        cache_key = None
+        if hasattr(self.factory, 'parse_cache_key'):
+            cache_key = self.factory.parse_cache_key(self, data_file, reader)
+            if cache_key is not None and self.factory.parse_cache_has(cache_key):
+                try:
+                    start = default_timer()
+                    self.raw_data[data_file] = self.factory.parse_cache_get(cache_key)
+                    self._record('parse cache '+data_file, start)
+                    return
+                except Exception as e:
+                    self.logger.warning("Unable to load {0} from the parse cache: {1}".format(data_file, e))
+
+        start = default_timer()
+        data = self._extract_data_file(data_file)
+        self._record('extract '+data_file, start, len(data) if data else None)
         if data:
+            start = default_timer()
             self.raw_data[data_file] = reader(data, self)
+            self._record('read '+data_file, start, len(data))
+            if cache_key is not None:
+                self.factory.parse_cache_set(cache_key, self.raw_data[data_file])
         elif self.opt.debug and data_file not in ['replay.message.events', 'replay.tracker.events']:
             raise ValueError("{0} not found in archive".format(data_file))
 
 
+for name, load_level in Replay.lazy_attributes.items():
+    default = Replay.__dict__.get(name, LazyAttribute.MISSING)
+    build = getattr(Replay, '_build_'+name, None)
+    setattr(Replay, name, LazyAttribute(name, load_level, default, build))
+
+
 class Map(Resource):
     url_template = 'http://{0}.depot.battle.net:1119/{1}.s2ma'
 
+    #: The map components, each read from the archive the first time it is
+    #: used. They don't depend on a load level, see :meth:`load_lazy_attributes`.
+    lazy_attributes = dict(
+        (name, 0) for name in [
+            'minimap', 'name', 'author', 'description', 'website',
+            'map_info', 'icon_path', 'icon', 'dependencies',
+        ]
+    )
+
+    unpickled_attributes = Resource.unpickled_attributes + ('_game_strings', '_document_info')
+
     #: The localized (only enUS supported right now) map name
     name = str()
 
@@ -615,6 +1048,24 @@ class Map(Resource):
     #: The map description as written by author
     description = str()
 
+    #: The map's website, if the author gave one
+    website = None
+
+    #: A byte string representing the minimap in tga format.
+    minimap = None
+
+    #: A reference to the map's :class:`~sc2reader.objects.MapInfo` object
+    map_info = None
+
+    #: (Optional) The path to the icon for the map, relative to the archive root
+    icon_path = None
+
+    #: (Optional) The icon image for the map in tga format
+    icon = None
+
+    #: A list of module names this map depends on
+    dependencies = list()
+
     def __init__(self, map_file, filename=None, gateway=None, map_hash=None, **options):
         super(Map, self).__init__(map_file, filename, **options)
 
@@ -628,47 +1079,78 @@ class Map(Resource):
         self.url = Map.get_url(gateway, map_hash)
 
         #: The opened MPQArchive for this map
-        self.archive = mpyq.MPQArchive(map_file)
+        self.archive = open_archive(map_file, **options)
+
+        # Shared by the components taken from the same file
+        self._game_strings = None
+        self._document_info = None
+
+    def load_lazy_attributes(self, load_level=None):
+        """
+        :param load_level: Ignored unless None, maps have no load levels
+
+        Reads every map component that hasn't been used yet. Components are
+        read on their own when used, so this is only needed before the
+        archive goes away, as it does when the map is pickled.
+        """
+        if load_level is None:
+            for name in self.lazy_attributes:
+                getattr(self, name)
+
+    def __getstate__(self):
+        self.load_lazy_attributes()
+        return super(Map, self).__getstate__()
 
-        #: A byte string representing the minimap in tga format.
-        self.minimap = self.archive.read_file('Minimap.tga')
+    def _build_minimap(self):
+        return self.archive.read_file('Minimap.tga')
 
+    def _read_game_strings(self):
         # This will only populate the fields for maps with enUS localizations.
         # Clearly this isn't a great solution but we can't be throwing exceptions
         # just because US English wasn't a concern of the map author.
         # TODO: Make this work regardless of the localizations available.
-        game_strings = self.archive.read_file('enUS.SC2Data\LocalizedData\GameStrings.txt').decode('utf8')
-        if game_strings:
-            for line in game_strings.split('\r\n'):
-                if len(line) == 0:
-                    continue
-
-                key, value = line.split('=', 1)
-                if key == 'DocInfo/Name':
-                    self.name = value
-                elif key == 'DocInfo/Author':
-                    self.author = value
-                elif key == 'DocInfo/DescLong':
-                    self.description = value
-                elif key == 'DocInfo/Website':
-                    self.website = value
-
-        #: A reference to the map's :class:`~sc2reader.objects.MapInfo` object
-        self.map_info = MapInfo(self.archive.read_file('MapInfo'))
-
-        doc_info = ElementTree.fromstring(self.archive.read_file('DocumentInfo').decode('utf8'))
-
-        icon_path_node = doc_info.find('Icon/Value')
-        #: (Optional) The path to the icon for the map, relative to the archive root
-        self.icon_path = icon_path_node.text if icon_path_node is not None else None
-
-        #: (Optional) The icon image for the map in tga format
-        self.icon = self.archive.read_file(self.icon_path) if self.icon_path is not None else None
-
-        #: A list of module names this map depends on
-        self.dependencies = list()
-        for dependency_node in doc_info.findall('Dependencies/Value'):
-            self.dependencies.append(dependency_node.text)
+        if self._game_strings is None:
+            self._game_strings = dict()
+            game_strings = self.archive.read_file('enUS.SC2Data\LocalizedData\GameStrings.txt')
+            if game_strings:
+                for line in game_strings.decode('utf8').split('\r\n'):
+                    if len(line) == 0:
+                        continue
+
+                    key, value = line.split('=', 1)
+                    self._game_strings[key] = value
+        return self._game_strings
+
+    def _build_name(self):
+        return self._read_game_strings().get('DocInfo/Name', Map.name)
+
+    def _build_author(self):
+        return self._read_game_strings().get('DocInfo/Author', Map.author)
+
+    def _build_description(self):
+        return self._read_game_strings().get('DocInfo/DescLong', Map.description)
+
+    def _build_website(self):
+        return self._read_game_strings().get('DocInfo/Website')
+
+    def _build_map_info(self):
+        return MapInfo(self.archive.read_file('MapInfo'))
+
+    def _read_document_info(self):
+        if self._document_info is None:
+            doc_info = self.archive.read_file('DocumentInfo')
+            self._document_info = ElementTree.fromstring(doc_info.decode('utf8')) if doc_info else ElementTree.Element('DocInfo')
+        return self._document_info
+
+    def _build_icon_path(self):
+        icon_path_node = self._read_document_info().find('Icon/Value')
+        return icon_path_node.text if icon_path_node is not None else None
+
+    def _build_icon(self):
+        return self.archive.read_file(self.icon_path) if self.icon_path is not None else None
+
+    def _build_dependencies(self):
+        return [dependency_node.text for dependency_node in self._read_document_info().findall('Dependencies/Value')]
 
     @classmethod
     def get_url(cls, gateway, map_hash):
@@ -681,6 +1163,12 @@ class Map(Resource):
             return None
 
 
+for name, load_level in Map.lazy_attributes.items():
+    default = Map.__dict__.get(name, LazyAttribute.MISSING)
+    build = getattr(Map, '_build_'+name, None)
+    setattr(Map, name, LazyAttribute(name, load_level, default, build))
+
+
 class Localization(Resource, dict):
 
     def __init__(self, s2ml_file, **options):
@@ -37,7 +37,7 @@ def main():
         print("dealing with {0}".format(folder))
         for path in sc2reader.utils.get_files(folder, extension='SC2Replay'):
             try:
-                rs = sc2reader.load_replay(path, load_level=0).release_string
+                rs = sc2reader.peek_header(path).release_string
                 already_did = rs in releases_parsed
                 releases_parsed.add(rs)
                 if not args.one_each or not already_did:
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+A versioned binary format for parsed replays.
+
+The file starts with a header and a table of sections so readers can seek
+to just the sections they need:
+
+* ``metadata``: the :func:`~sc2reader.factories.plugins.replay.toDict`
+  summary as JSON, readable without sc2reader's classes.
+* ``replay``: the pickled :class:`~sc2reader.resources.Replay` with players,
+  teams and units but without any events. Each list of events is written
+  as a reference and comes back empty unless the events are loaded too.
+* ``events``: the events, as a row of attribute values for each event
+  grouped by class, and the event lists as indexes into them. Players,
+  units, teams and the replay are referenced by their integer ids and
+  resolved against the replay section, which keeps this section compact
+  and quick to load.
+
+Each section is zlib compressed. :data:`FORMAT_VERSION` changes whenever
+the layout of the file or of the pickled objects changes.
+"""
+from __future__ import absolute_import, print_function, unicode_literals, division
+
+import array
+import io
+import json
+import struct
+import zlib
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from sc2reader.events.base import Event
+from sc2reader.exceptions import FileError
+from sc2reader.factories.plugins.replay import toDict
+from sc2reader.utils import JSONDateEncoder
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+#: Changed whenever the layout of the file or the pickled objects changes
+FORMAT_VERSION = 1
+
+MAGIC = b'SC2R'
+
+# magic, format version, section count
+HEADER = struct.Struct(str('<4sHH'))
+
+# name, offset, length
+SECTION = struct.Struct(str('<8sQQ'))
+
+
+def dump(replay, target):
+    """ Writes the replay to the given path or binary file object """
+    if isinstance(target, basestring):
+        with open(target, 'wb') as target_file:
+            return dump(replay, target_file)
+
+    replay_data, events_data = _pickle_replay(replay)
+    sections = [
+        (b'metadata', json.dumps(toDict()(replay), cls=JSONDateEncoder).encode('utf8')),
+        (b'replay', replay_data),
+        (b'events', events_data),
+    ]
+    sections = [(name, zlib.compress(data)) for name, data in sections]
+
+    offset = HEADER.size + SECTION.size*len(sections)
+    target.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+    for name, data in sections:
+        target.write(SECTION.pack(name, offset, len(data)))
+        offset += len(data)
+    for name, data in sections:
+        target.write(data)
+
+
+def dumps(replay):
+    """ Returns the replay in the binary format as bytes """
+    target = io.BytesIO()
+    dump(replay, target)
+    return target.getvalue()
+
+
+def load(source, events=True):
+    """
+    :param source: A path, binary file object or bytes written by :func:`dump`
+    :param events: Set to False to leave the event lists empty
+
+    Returns the :class:`~sc2reader.resources.Replay`. Without events only
+    the smaller replay section is read.
+    """
+    with _open(source) as source_file:
+        sections = _read_sections(source_file)
+        replay_data = _read_section(source_file, sections, b'replay')
+        events_data = _read_section(source_file, sections, b'events') if events else None
+    return _unpickle_replay(replay_data, events_data)
+
+
+def loads(data, events=True):
+    """ Returns the :class:`~sc2reader.resources.Replay` in the given bytes """
+    return load(io.BytesIO(data), events)
+
+
+def load_metadata(source):
+    """
+    :param source: A path, binary file object or bytes written by :func:`dump`
+
+    Returns the replay summary as a dict of plain JSON types, reading only
+    the metadata section.
+    """
+    with _open(source) as source_file:
+        data = _read_section(source_file, _read_sections(source_file), b'metadata')
+    return json.loads(data.decode('utf8'))
+
+
+def _open(source):
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    elif isinstance(source, basestring):
+        return open(source, 'rb')
+    return _Unclosed(source)
+
+
+class _Unclosed(object):
+    # Leaves file objects passed in by the caller open
+    def __init__(self, file_object):
+        self.file_object = file_object
+
+    def __enter__(self):
+        return self.file_object
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+def _read_sections(source):
+    magic, version, count = HEADER.unpack(source.read(HEADER.size))
+    if magic != MAGIC:
+        raise FileError("Not a serialized replay")
+    elif version != FORMAT_VERSION:
+        raise FileError("Unsupported format version {0}, expected {1}".format(version, FORMAT_VERSION))
+
+    sections = dict()
+    for i in range(count):
+        name, offset, length = SECTION.unpack(source.read(SECTION.size))
+        sections[name.rstrip(b'\x00')] = (offset, length)
+    return sections
+
+
+def _read_section(source, sections, name):
+    if name not in sections:
+        raise FileError("Missing the {0} section".format(name.decode('ascii')))
+    offset, length = sections[name]
+    source.seek(offset)
+    return zlib.decompress(source.read(length))
+
+
+def _pickle_replay(replay):
+    replay.load_lazy_attributes()
+
+    # Lists of events are swapped for references in the replay section and
+    # pickled in the events section. Events held anywhere else are rare and
+    # stay in the replay section.
+    event_lists, seen = list(), dict()
+
+    def replay_id(obj):
+        if type(obj) is list and obj and isinstance(obj[0], Event):
+            if id(obj) not in seen:
+                seen[id(obj)] = len(event_lists)
+                event_lists.append(obj)
+            return seen[id(obj)]
+        return None
+
+    replay_file = io.BytesIO()
+    pickler = pickle.Pickler(replay_file, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = replay_id
+    pickler.dump(replay)
+
+    # Events point back at the replay objects by their position in _refs
+    ids = dict((id(obj), index) for index, obj in enumerate(_refs(replay)))
+
+    def events_id(obj):
+        return ids.get(id(obj))
+
+    # Number the events by class so each class's rows are one block
+    events_by_class = dict()
+    for event_list in event_lists:
+        for event in event_list:
+            events_by_class.setdefault(event.__class__, dict())[id(event)] = event
+
+    classes, rows, extras, index = list(), list(), dict(), dict()
+    for event_class, events in events_by_class.items():
+        names = _slot_names(event_class)
+        classes.append((event_class, names))
+        class_rows = list()
+        for event in events.values():
+            values = tuple(getattr(event, name, _UNSET) for name in names)
+            if any(value is _UNSET for value in values) or getattr(event, '__dict__', None):
+                unset = [name for name, value in zip(names, values) if value is _UNSET]
+                extras[len(index)] = (unset, getattr(event, '__dict__', None))
+                values = tuple(None if value is _UNSET else value for value in values)
+            index[id(event)] = len(index)
+            class_rows.append(values)
+        rows.append(class_rows)
+    lists = [array.array(str('l'), [index[id(event)] for event in event_list]) for event_list in event_lists]
+
+    events_file = io.BytesIO()
+    pickler = pickle.Pickler(events_file, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = events_id
+    pickler.dump((classes, rows, extras, lists))
+    return replay_file.getvalue(), events_file.getvalue()
+
+
+def _unpickle_replay(replay_data, events_data):
+    event_lists = dict()
+
+    unpickler = pickle.Unpickler(io.BytesIO(replay_data))
+    unpickler.persistent_load = lambda index: event_lists.setdefault(index, list())
+    replay = unpickler.load()
+    if events_data is None:
+        return replay
+
+    unpickler = pickle.Unpickler(io.BytesIO(events_data))
+    unpickler.persistent_load = _refs(replay).__getitem__
+    classes, rows, extras, lists = unpickler.load()
+
+    events = list()
+    for (event_class, names), class_rows in zip(classes, rows):
+        events.extend(_event_builder(names)(event_class, class_rows))
+    for index, (unset, attributes) in extras.items():
+        for name in unset:
+            delattr(events[index], name)
+        if attributes:
+            events[index].__dict__.update(attributes)
+
+    # Fill in the lists the replay already holds so shared lists stay shared
+    for index, event_indexes in enumerate(lists):
+        event_lists.setdefault(index, list()).extend([events[i] for i in event_indexes])
+    return replay
+
+
+def _refs(replay):
+    # The replay objects events refer to: the replay, its teams, players and
+    # other entities by pid and units by id
+    refs = [replay] + list(replay.teams)
+    refs.extend(entity for pid, entity in sorted(replay.entity.items()))
+    refs.extend(unit for unit_id, unit in sorted(replay.objects.items()))
+    return refs
+
+
+# Marks slots that were never set
+_UNSET = object()
+
+
+def _slot_names(event_class):
+    names = list()
+    for cls in reversed(event_class.__mro__):
+        for name in cls.__dict__.get('__slots__', ()):
+            if name != '__dict__' and name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+_event_builders = dict()
+
+
+def _event_builder(names):
+    # Compiled per set of slots, setting each slot by name is far quicker
+    # than a setattr call for each value
+    if names not in _event_builders:
+        values = ', '.join('v{0}'.format(i) for i in range(len(names)))
+        source = "def build(event_class, rows):\n"
+        source += "    events = list()\n"
+        source += "    for ({0}{1}) in rows:\n".format(values, ',' if len(names) == 1 else '')
+        source += "        event = new(event_class)\n"
+        for i, name in enumerate(names):
+            source += "        event.{0} = v{1}\n".format(name, i)
+        source += "        events.append(event)\n"
+        source += "    return events\n"
+        namespace = dict(new=object.__new__)
+        exec(compile(source, "<sc2reader.serialize>", "exec"), namespace)
+        _event_builders[names] = namespace['build']
+    return _event_builders[names]
@@ -2,9 +2,13 @@
 from __future__ import absolute_import, print_function, unicode_literals, division
 
 import binascii
+from bisect import bisect_right
+import copy
 import os
 import json
 from datetime import timedelta, datetime
+from multiprocessing.pool import ThreadPool
+import threading
 
 from sc2reader.log_utils import loggable
 from sc2reader.exceptions import MPQError
@@ -75,6 +79,83 @@ class PersonDict(dict):
         self._key_map[value.name] = key
         super(PersonDict, self).__setitem__(key, value)
 
+    def __reduce__(self):
+        # Items have to go through __setitem__ after __init__ has run
+        return PersonDict, (), self.__dict__, None, iter(self.items())
+
+
+class BuildIndex(object):
+    """
+    :param key: A function that returns the sort key for a replay
+    :param entries: Optional ``(start, value)`` pairs to add
+
+    Picks the value for a replay out of ordered ranges of keys. Each value
+    applies from the key it was added with up to the next key, lookups
+    bisect the start keys so they don't slow down as ranges are added. A
+    value of None closes the range before it.
+
+    ::
+
+        index = BuildIndex(lambda r: r.base_build, [(15405, 'WoL'), (23925, 'HotS')])
+        index.get(replay)
+    """
+    def __init__(self, key, entries=()):
+        self.key = key
+        self.starts = list()
+        self.values = list()
+        for start, value in entries:
+            self.add(start, value)
+
+    def add(self, start, value):
+        """ Adds a range starting at start, replacing any range that already starts there. """
+        index = bisect_right(self.starts, start)
+        if index and self.starts[index-1] == start:
+            self.values[index-1] = value
+        else:
+            self.starts.insert(index, start)
+            self.values.insert(index, value)
+
+    def get(self, replay, default=None):
+        """ Returns the value of the range the replay's key falls in. """
+        index = bisect_right(self.starts, self.key(replay))
+        if index and self.values[index-1] is not None:
+            return self.values[index-1]
+        return default
+
+
+class Timings(dict):
+    """
+    Wall time spent in each stage of loading, keyed by stage name. Each entry
+    is a dict with the total ``time`` in seconds, the number of ``calls`` and
+    the number of ``bytes`` handled where that applies. Timings from several
+    replays can be added together with :meth:`add`.
+    """
+    def record(self, stage, seconds, size=None):
+        """ Adds one call to the stage. """
+        entry = self.get(stage)
+        if entry is None:
+            entry = self[stage] = dict(time=0.0, calls=0, bytes=0)
+        entry['time'] += seconds
+        entry['calls'] += 1
+        if size:
+            entry['bytes'] += size
+
+    def add(self, timings):
+        """ Adds the entries of another set of timings to these ones. """
+        for stage, other in timings.items():
+            entry = self.get(stage)
+            if entry is None:
+                entry = self[stage] = dict(time=0.0, calls=0, bytes=0)
+            for key, value in other.items():
+                entry[key] += value
+
+    def report(self):
+        """ Returns the stages as a table, slowest first. """
+        lines = ["{0:<36} {1:>10} {2:>8} {3:>12}".format('stage', 'seconds', 'calls', 'bytes')]
+        for stage, entry in sorted(self.items(), key=lambda item: -item[1]['time']):
+            lines.append("{0:<36} {1:>10.4f} {2:>8} {3:>12}".format(stage, entry['time'], entry['calls'], entry['bytes']))
+        return "\n".join(lines)
+
 
 def windows_to_unix(windows_time):
     # This windows timestamp measures the number of 100 nanosecond periods since
@@ -197,6 +278,74 @@ def extract_data_file(data_file, archive):
         raise MPQError("Unable to extract file: {0}".format(data_file), e)
 
 
+def extract_data_files(data_files, archive, threads):
+    """
+    :param data_files: The names of the files to extract
+    :param archive: The MPQArchive to extract them from
+    :param threads: The number of threads to extract with
+
+    Starts extracting the data files from the archive on a pool of threads.
+    zlib and bz2 release the GIL while they decompress so the files can be
+    decoded one at a time as they come in. Returns a dict with an AsyncResult
+    for each file, its ``get()`` returns the contents or raises the error
+    from :func:`extract_data_file`. Each process keeps one pool for each
+    number of threads asked for, which is reused by every replay.
+    """
+    # The archive is only read through its file, give the pool a view of it
+    # that keeps a position for each thread
+    shared_archive = copy.copy(archive)
+    shared_archive.file = SharedFile(archive.file)
+
+    pool = _get_extract_pool(threads)
+    return dict((data_file, pool.apply_async(extract_data_file, (data_file, shared_archive))) for data_file in data_files)
+
+
+# The extraction pools by (process id, threads). Forked processes don't get
+# the parent's threads, so they make their own.
+_extract_pools = dict()
+_extract_pools_lock = threading.Lock()
+
+
+def _get_extract_pool(threads):
+    key = (os.getpid(), threads)
+    with _extract_pools_lock:
+        if key not in _extract_pools:
+            _extract_pools[key] = ThreadPool(threads)
+        return _extract_pools[key]
+
+
+class SharedFile(object):
+    """
+    :param file_object: A seekable binary file object
+
+    Lets several threads seek and read the same file object. Each thread has
+    its own position in the file and reads are made one at a time.
+    """
+    def __init__(self, file_object):
+        self.file_object = file_object
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self.tell()
+        elif whence == 2:
+            with self._lock:
+                self.file_object.seek(0, 2)
+                offset += self.file_object.tell()
+        self._local.position = offset
+
+    def tell(self):
+        return getattr(self._local, 'position', 0)
+
+    def read(self, size=-1):
+        with self._lock:
+            self.file_object.seek(self.tell())
+            data = self.file_object.read(size)
+        self._local.position = self.tell()+len(data)
+        return data
+
+
 def merged_dict(a, b):
     c = a.copy()
     c.update(b)
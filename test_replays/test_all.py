@@ -363,6 +363,427 @@ class TestReplays(unittest.TestCase):
     def test_replay_event_order(self):
         replay = sc2reader.load_replay("test_replays/event_order.SC2Replay")
 
+    def test_event_type_filters(self):
+        from sc2reader.events import AbilityEvent, SelectionEvent, UnitBornEvent, CameraEvent
+        replayfilename = "test_replays/2.0.8.25604/mlg1.SC2Replay"
+        expected = sc2reader.load_replay(replayfilename)
+
+        replay = sc2reader.load_replay(replayfilename, event_types=['AbilityEvent', SelectionEvent, 'UnitBornEvent'])
+        self.assertEqual(
+            [(e.name, e.frame) for e in replay.events],
+            [(e.name, e.frame) for e in expected.events if isinstance(e, (AbilityEvent, SelectionEvent, UnitBornEvent))])
+        self.assertTrue(any(e.name == 'TargetAbilityEvent' for e in replay.game_events))
+        self.assertEqual(replay.messages, [])
+
+        replay = sc2reader.load_replay(replayfilename, event_types=['TargetAbilityEvent'], exclude_event_types=['CameraEvent'])
+        self.assertEqual(set(e.name for e in replay.events), set(['TargetAbilityEvent']))
+
+        replay = sc2reader.load_replay(replayfilename, exclude_event_types=[CameraEvent, 'TrackerEvent'])
+        self.assertEqual(replay.tracker_events, [])
+        self.assertEqual(
+            [(e.name, e.frame) for e in replay.game_events],
+            [(e.name, e.frame) for e in expected.game_events if not isinstance(e, CameraEvent)])
+
+    def test_protocol_compiler(self):
+        from sc2reader.decoders import BitPackedDecoder
+        from sc2reader.protocol import compile_parsers, Struct, Optional, Array, Choice, Null, Bool, UInt8, UInt16, Bits, String
+        schemas = dict(
+            test_event=Struct(
+                ('flag', Bool),
+                ('choice', Choice(2, {0: ('None', Null), 1: ('Value', UInt8)})),
+                ('missing', Optional(UInt16)),
+                ('values', Array(Bits(3), Bits(5))),
+                ('name', String(UInt8)),
+                ('const', Null),
+            ),
+            empty_event=None,
+        )
+        parsers = compile_parsers(schemas)
+        skippers = compile_parsers(schemas, skip=True)
+
+        # flag=1, choice=1 (value 0xAB), missing=0, 2 values (3 and 17), name "ab"
+        data = BitPackedDecoder(b'\xab\x23\x83\x03\x00ab')
+        self.assertEqual(parsers['test_event'](data), dict(
+            flag=1, choice=('Value', 0xAB), missing=None, values=[3, 17], name='ab', const=None,
+        ))
+        self.assertTrue(data.done())
+        self.assertEqual(parsers['empty_event'](data), None)
+
+        # Skipping consumes the same data without decoding it
+        data = BitPackedDecoder(b'\xab\x23\x83\x03\x00ab')
+        self.assertEqual(skippers['test_event'](data), None)
+        self.assertTrue(data.done())
+
+    def test_cursor_decoder(self):
+        from sc2reader.decoders import CursorBitPackedDecoder
+        for replayfilename in [
+                "test_replays/1.2.2.17811/1.SC2Replay",
+                "test_replays/2.0.8.25604/mlg1.SC2Replay",
+        ]:
+            expected = sc2reader.load_replay(replayfilename)
+            replay = sc2reader.load_replay(replayfilename, decoder=CursorBitPackedDecoder)
+            self.assertEqual(replay.release_string, expected.release_string)
+            self.assertEqual([p.name for p in replay.players], [p.name for p in expected.players])
+            self.assertEqual(
+                [(e.name, e.frame, getattr(e, 'pid', None)) for e in replay.events],
+                [(e.name, e.frame, getattr(e, 'pid', None)) for e in expected.events])
+
+    def test_default_readers(self):
+        from sc2reader.readers import GameEventsReader_HotSBeta, GameEventsReader_24247
+        from sc2reader.utils import BuildIndex
+        index = BuildIndex(lambda build: build, [(10, 'a'), (20, None), (30, 'c'), (15, 'b')])
+        self.assertEqual([index.get(build) for build in (5, 10, 14, 15, 25, 30, 99)], [None, 'a', 'a', 'b', None, 'c', 'c'])
+
+        beta = sc2reader.load_replay("test_replays/2.0.0.23925/Akilon Wastes.SC2Replay", load_level=1)
+        replay = sc2reader.load_replay("test_replays/2.0.0.24247/molten.SC2Replay", load_level=1)
+        self.assertTrue(isinstance(beta._get_reader('replay.game.events'), GameEventsReader_HotSBeta))
+        self.assertTrue(type(replay._get_reader('replay.game.events')) is GameEventsReader_24247)
+        self.assertTrue(replay._get_reader('replay.details') is beta._get_reader('replay.details'))
+        self.assertEqual((beta.datapack.id, replay.datapack.id), ('23925', '24247'))
+
+        # Registered readers still take precedence
+        reader = lambda data, replay: 'details'
+        replay.register_reader('replay.details', reader, lambda r: r.build == 24247)
+        self.assertTrue(replay._get_reader('replay.details') is reader)
+
+    def test_lazy_datapacks(self):
+        from sc2reader.data import BuildSet, builds
+        build_set = BuildSet('WoL', ('16117', '17326'))
+        self.assertEqual(list(build_set), ['16117', '17326'])
+        self.assertEqual(build_set._builds, dict())
+        self.assertTrue(build_set['17326'] is build_set['17326'])
+        self.assertEqual(list(build_set._builds), ['17326'])
+        self.assertRaises(KeyError, build_set.__getitem__, '99999')
+
+        replay = sc2reader.load_replay("test_replays/1.2.2.17811/1.SC2Replay", load_level=1)
+        self.assertTrue(replay.datapack is builds['WoL']['17326'])
+
+    def test_profile_timings(self):
+        replay = sc2reader.load_replay("test_replays/1.2.2.17811/1.SC2Replay")
+        self.assertEqual(replay.timings, None)
+
+        factory = sc2reader.factories.SC2Factory()
+        replays = list(factory.load_replays(["test_replays/1.2.2.17811/1.SC2Replay"]*2, profile=True))
+        timings = replays[0].timings
+        for stage in ['mpq open', 'extract replay.game.events', 'read replay.game.events', 'load_details',
+                      'load_players', 'merge events', 'engine', 'plugin ContextLoader']:
+            self.assertTrue(stage in timings, stage)
+        self.assertEqual(timings['read replay.game.events']['calls'], 1)
+        self.assertTrue(timings['read replay.game.events']['bytes'] > 0)
+        self.assertEqual(factory.timings['engine']['calls'], 2)
+        self.assertEqual(factory.timings['engine']['time'], sum(r.timings['engine']['time'] for r in replays))
+
+    def test_pickle_replay(self):
+        import pickle
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        replay = pickle.loads(pickle.dumps(expected, pickle.HIGHEST_PROTOCOL))
+        self.assertTrue(replay.datapack is expected.datapack)
+        self.assertEqual(replay.player.name(expected.players[0].name).pid, expected.players[0].pid)
+        self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+        unit, expected_unit = replay.players[0].units[0], expected.players[0].units[0]
+        self.assertTrue(unit._type_class is expected_unit._type_class)
+
+    def test_lazy_replay(self):
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", lazy=True)
+        self.assertEqual(replay.load_level, 1)
+        self.assertEqual(replay.map_name, expected.map_name)
+        self.assertEqual([p.name for p in replay.players], [p.name for p in expected.players])
+        self.assertEqual(replay.load_level, 2)
+        self.assertEqual(len(replay.tracker_events), len(expected.tracker_events))
+        self.assertEqual(replay.load_level, 3)
+        self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+        self.assertEqual(replay.load_level, 4)
+        self.assertEqual(len(replay.objects), len(expected.objects))
+        self.assertEqual(len(replay.players[0].units), len(expected.players[0].units))
+
+    def test_merged_events(self):
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", load_level=2)
+        self.assertEqual(replay.events, sorted(replay.message_events, key=lambda e: e.frame))
+
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        streams = [replay.tracker_events, replay.message_events, replay.game_events]
+        self.assertEqual(len(replay.events), sum(len(stream) for stream in streams))
+        self.assertEqual(replay.events, sorted(replay.events, key=lambda e: e.frame))
+        self.assertEqual(list(replay.iter_events()), replay.events)
+
+        # Tracker events come before game events on the same frame
+        positions = dict((id(event), index) for index, event in enumerate(replay.events))
+        frame = replay.game_events[0].frame
+        for event in replay.tracker_events:
+            if event.frame == frame:
+                self.assertTrue(positions[id(event)] < positions[id(replay.game_events[0])])
+
+    def test_compact_events(self):
+        from sc2reader.events import Event, AbilityEvent, PlayerStatsEvent
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        for event in replay.events:
+            self.assertEqual(event.name, event.__class__.__name__)
+            self.assertEqual(event.second, event.frame >> 4)
+            self.assertFalse(getattr(event, '__dict__', None))
+
+        ability = next(e for e in replay.events if isinstance(e, AbilityEvent))
+        self.assertEqual(ability.flag['queued'], ability.flags & 0x2 != 0)
+        self.assertEqual(ability.ability_id, ability.ability_link << 5 | ability.command_index)
+        stats = next(e for e in replay.events if isinstance(e, PlayerStatsEvent))
+        self.assertEqual(stats.minerals_lost, stats.minerals_lost_army + stats.minerals_lost_economy + stats.minerals_lost_technology)
+
+        class CustomEvent(Event):
+            pass
+        self.assertEqual(CustomEvent.name, 'CustomEvent')
+        event = CustomEvent()
+        event.value = 1
+        self.assertEqual(event.value, 1)
+
+    def test_stream_replay(self):
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", stream=True)
+        self.assertEqual(replay.tracker_events, [])
+        self.assertEqual(replay.game_events, [])
+        self.assertEqual(replay.plugin_result, expected.plugin_result)
+        self.assertEqual(len(replay.objects), len(expected.objects))
+        self.assertEqual([len(p.events) for p in replay.players], [len(p.events) for p in expected.players])
+        self.assertEqual([(e.name, e.frame) for e in replay.iter_events()], [(e.name, e.frame) for e in expected.events])
+
+    def test_event_tables(self):
+        from sc2reader.events import PlayerStatsEvent, TargetAbilityEvent
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", event_types=[], event_tables=['PlayerStatsEvent', 'AbilityEvent'])
+        self.assertEqual(replay.events, [])
+
+        stats = [e for e in expected.events if isinstance(e, PlayerStatsEvent)]
+        table = replay.event_table('PlayerStatsEvent')
+        self.assertEqual(list(table['frame']), [e.frame for e in stats])
+        self.assertEqual(list(table['pid']), [e.pid for e in stats])
+        self.assertEqual(list(table['food_used']), [e.food_used for e in stats])
+
+        # Tables the readers didn't build come from the loaded events
+        self.assertEqual(len(replay.event_table('AbilityEvent')['frame']), len(expected.event_table('AbilityEvent')['frame']))
+        self.assertEqual(list(expected.event_table('TargetAbilityEvent')['target_unit_id']), [e.target_unit_id for e in expected.events if isinstance(e, TargetAbilityEvent)])
+        self.assertRaises(ValueError, expected.event_table, 'NotAnEvent')
+
+    def test_player_stats_matrix(self):
+        from sc2reader.events import PlayerStatsEvent
+        expected = sc2reader.load_replay("test_replays/2.0.10.26490/replay26490.SC2Replay", load_level=3)
+        replay = sc2reader.load_replay("test_replays/2.0.10.26490/replay26490.SC2Replay", load_level=3, exclude_event_types=['PlayerStatsEvent'], player_stats_matrix=True)
+        self.assertFalse([e for e in replay.tracker_events if isinstance(e, PlayerStatsEvent)])
+        self.assertEqual(sorted(replay.player_stats_matrix), sorted(set(e.pid for e in expected.tracker_events if isinstance(e, PlayerStatsEvent))))
+
+        for pid, series in replay.player_stats_matrix.items():
+            stats = [e for e in expected.tracker_events if isinstance(e, PlayerStatsEvent) and e.pid == pid]
+            self.assertEqual(list(series.frames), [e.frame for e in stats])
+            self.assertEqual(list(series.minerals_current), [e.minerals_current for e in stats])
+            self.assertEqual(list(series['food_used']), [e.food_used for e in stats])
+            self.assertEqual(list(series['resources_lost']), [e.resources_lost for e in stats])
+            self.assertEqual(len(series.values), len(stats))
+            column = series.columns.index('workers_active_count')
+            self.assertEqual([row[column] for row in series.values], [e.workers_active_count for e in stats])
+
+        # Without the option the matrix is put together from the events
+        self.assertEqual(list(expected.player_stats_matrix[8].vespene_killed), list(replay.player_stats_matrix[8].vespene_killed))
+
+    def test_serialize(self):
+        from sc2reader import serialize
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        data = serialize.dumps(expected)
+
+        replay = serialize.loads(data)
+        self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+        self.assertEqual([len(p.events) for p in replay.players], [len(p.events) for p in expected.players])
+        self.assertTrue(replay.events[-1].player is replay.entity[replay.events[-1].pid])
+        unit_born = next(e for e in replay.tracker_events if e.name == 'UnitBornEvent')
+        self.assertTrue(unit_born.unit is replay.objects[unit_born.unit_id])
+
+        # Partial reads leave out the events
+        replay = serialize.loads(data, events=False)
+        self.assertEqual(replay.events, [])
+        self.assertEqual([p.name for p in replay.players], [p.name for p in expected.players])
+        self.assertEqual(len(replay.objects), len(expected.objects))
+
+        metadata = serialize.load_metadata(data)
+        self.assertEqual(metadata['map_name'], expected.map_name)
+        self.assertEqual([p['name'] for p in metadata['players']], [p.name for p in expected.players])
+
+        self.assertRaises(sc2reader.exceptions.FileError, serialize.loads, b'SC2R\x00\x00\x00\x00')
+
+    def test_peek_header(self):
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", load_level=0)
+        with open("test_replays/2.0.8.25604/mlg1.SC2Replay", 'rb') as replay_file:
+            data = replay_file.read()
+
+        # str() is a byte string path on Python 2
+        for source in ["test_replays/2.0.8.25604/mlg1.SC2Replay", str("test_replays/2.0.8.25604/mlg1.SC2Replay"), data]:
+            header = sc2reader.peek_header(source)
+            self.assertEqual(header.versions, replay.versions)
+            self.assertEqual(header.release_string, "2.0.8.25604")
+            self.assertEqual((header.build, header.base_build, header.frames), (replay.build, replay.base_build, replay.frames))
+
+        self.assertRaises(sc2reader.exceptions.MPQError, sc2reader.peek_header, data[4:])
+        self.assertRaises(sc2reader.exceptions.MPQError, sc2reader.peek_header, b'garbage')
+
+    def test_mmap(self):
+        import mmap
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", mmap=True)
+        self.assertTrue(isinstance(replay.archive.file, mmap.mmap))
+        self.assertEqual(replay.filehash, expected.filehash)
+        self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+
+    def test_mpq(self):
+        import mpyq
+        from sc2reader import mpq
+        expected = mpyq.MPQArchive("test_replays/2.0.8.25604/mlg1.SC2Replay", listfile=False)
+        archive = mpq.MPQArchive("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        self.assertEqual(archive.header['user_data_header'], expected.header['user_data_header'])
+        for data_file in mpq.REPLAY_FILES+['(listfile)', 'replay.missing']:
+            self.assertEqual(archive.read_file(data_file), expected.read_file(data_file))
+
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", mpyq=True)
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        self.assertTrue(isinstance(expected.archive, mpyq.MPQArchive))
+        self.assertTrue(isinstance(replay.archive, mpq.MPQArchive))
+        self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+
+    def test_lazy_map(self):
+        from sc2reader.resources import Map
+        # Replays are MPQ archives too, with none of the map files in them
+        with open("test_replays/2.0.8.25604/mlg1.SC2Replay", 'rb') as map_file:
+            game_map = Map(map_file)
+        read_file = game_map.archive.read_file
+        read = list()
+        game_map.archive.read_file = lambda filename: read.append(filename) or read_file(filename)
+
+        self.assertEqual(read, [])
+        self.assertEqual((game_map.name, game_map.author, game_map.website), ('', '', None))
+        self.assertEqual((game_map.icon, game_map.dependencies), (None, []))
+        self.assertEqual(read, ['enUS.SC2Data\\LocalizedData\\GameStrings.txt', 'DocumentInfo'])
+
+    def test_extract_threads(self):
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+        for options in [dict(), dict(mmap=True), dict(lazy=True)]:
+            replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", extract_threads=3, **options)
+            self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+            self.assertEqual(replay._extracting, dict())
+
+        # Replays share the pool for their number of threads
+        pools = dict(sc2reader.utils._extract_pools)
+        sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", extract_threads=3)
+        self.assertEqual(sc2reader.utils._extract_pools, pools)
+
+    def test_tracker_layouts(self):
+        from sc2reader.readers import TrackerEventsReader, VINT
+
+        class StructReader(TrackerEventsReader):
+            # Unit done events won't match, the rest have no layout
+            LAYOUTS = {7: (VINT,)}
+
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", load_level=1)
+        data = sc2reader.utils.extract_data_file('replay.tracker.events', replay.archive)
+        attributes = ['name', 'frame', 'pid', 'unit_id', 'unit_type_name', 'killer_pid', 'x', 'y', 'items', 'stats', 'count']
+        for event, expected in zip(TrackerEventsReader()(data, replay), StructReader()(data, replay)):
+            self.assertEqual([getattr(event, name, None) for name in attributes], [getattr(expected, name, None) for name in attributes])
+
+    def test_frame_range(self):
+        import os
+        import shutil
+        import tempfile
+        from sc2reader.readers import SeekIndex
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", engine=None)
+        expected = [(e.name, e.frame, e.pid) for e in expected.game_events if 8000 <= e.frame <= 10000]
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", engine=None, frame_range=(8000, 10000))
+        self.assertEqual([(e.name, e.frame, e.pid) for e in replay.game_events], expected)
+
+        seek_index_dir = tempfile.mkdtemp()
+        try:
+            # The first load saves checkpoints up to the last frame, the second starts from one
+            for i in range(2):
+                replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", engine=None, frame_range=(8000, 10000), seek_index=seek_index_dir, seek_index_interval=100)
+                self.assertEqual([(e.name, e.frame, e.pid) for e in replay.game_events], expected)
+                self.assertTrue(replay.seek_index.find(8000)[2] > 7000)
+            self.assertEqual(os.listdir(seek_index_dir), [replay.filehash+'.seek'])
+
+            # Corrupt indexes are ignored
+            index_path = os.path.join(seek_index_dir, replay.filehash+'.seek')
+            with open(index_path, 'wb') as index_file:
+                index_file.write(SeekIndex.HEADER.pack(SeekIndex.MAGIC, SeekIndex.FORMAT_VERSION, 100, 1) + b'\xff'*16)
+            self.assertEqual(len(SeekIndex.load(index_path)), 0)
+        finally:
+            shutil.rmtree(seek_index_dir)
+
+    def test_parse_cache(self):
+        import shutil
+        import tempfile
+        parse_cache_dir = tempfile.mkdtemp()
+        try:
+            factory = sc2reader.factories.ParseCachedSC2Factory(parse_cache_dir)
+            expected = factory.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+
+            # Cached reads must not touch the archive
+            sc2reader.utils.extract_data_file, extract_data_file = None, sc2reader.utils.extract_data_file
+            try:
+                replay = factory.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay")
+            finally:
+                sc2reader.utils.extract_data_file = extract_data_file
+
+            self.assertEqual([p.name for p in replay.players], [p.name for p in expected.players])
+            self.assertEqual([(e.name, e.frame) for e in replay.events], [(e.name, e.frame) for e in expected.events])
+            self.assertEqual(len(replay.objects), len(expected.objects))
+
+            # Filtered reads are kept apart from the complete ones
+            replay = factory.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", event_types=['CameraEvent'])
+            self.assertEqual(set(e.name for e in replay.game_events), set(['CameraEvent']))
+        finally:
+            shutil.rmtree(parse_cache_dir)
+
+    def test_pickle_custom_build(self):
+        import pickle
+        from sc2reader.data import Build
+        build = Build('custom')
+        build.add_unit_type(1, 'Probe', 'Probe', is_worker=True)
+        build.add_ability(2, 'TrainProbe', is_build=True, build_unit=build.Probe)
+        unit = build.create_unit(3, 1, 0)
+        unit = pickle.loads(pickle.dumps(unit, pickle.HIGHEST_PROTOCOL))
+        build = unit._type_class._build
+        self.assertEqual(unit.name, 'Probe')
+        self.assertTrue(unit.is_worker)
+        self.assertTrue(build.units[1] is unit._type_class)
+        self.assertTrue(build.abilities[2].build_unit is build.Probe)
+
+    def test_parallel_load_replays(self):
+        from sc2reader.exceptions import LoadError
+        from sc2reader.factories.plugins.replay import toDict
+        paths = [
+            "test_replays/1.2.2.17811/1.SC2Replay",
+            "test_replays/2.0.5.25092/cn1.SC2Replay",
+            "test_replays/test_all.py",
+        ]
+        replays = list(sc2reader.load_replays(paths, workers=2))
+        self.assertEqual([r.filename for r in replays], paths)
+        self.assertEqual(replays[1].map_name, "生化实验区")
+        self.assertTrue(isinstance(replays[2], LoadError))
+        self.assertTrue("MPQError" in replays[2].error)
+
+        factory = sc2reader.factories.SC2Factory()
+        factory.register_plugin("Replay", toDict())
+        summaries = list(factory.load_replays(paths[:2], workers=2, ordered=False))
+        self.assertEqual(sorted(s["map_name"] for s in summaries), sorted(r.map_name for r in replays[:2]))
+
+        class Unreadable(object):
+            name = "unreadable"
+            def read(self):
+                raise IOError("closed")
+
+        sources = [open(path, 'rb') for path in paths[:2]] + [Unreadable()]
+        try:
+            loaded = list(sc2reader.load_replays(sources, workers=2))
+        finally:
+            for source in sources[:2]:
+                source.close()
+        self.assertEqual([r.filename for r in loaded], paths[:2] + ["unreadable"])
+        self.assertEqual(loaded[1].map_name, "生化实验区")
+        self.assertTrue(isinstance(loaded[2], LoadError))
+        self.assertTrue("closed" in loaded[2].error)
+
 
 class TestGameEngine(unittest.TestCase):
     class TestEvent(object):
@@ -418,6 +839,53 @@ class TestGameEngine(unittest.TestCase):
         self.assertEqual(replay.plugin_result['TestPlugin1'], (1, dict(msg="Fail!")))
         self.assertEqual(replay.plugin_result['TestPlugin2'], (0, dict()))
 
+    def test_plugin_exit_only_affects_run(self):
+        engine = sc2reader.engine.GameEngine(plugins=[self.TestPlugin1(), self.TestPlugin2()])
+        for i in range(2):
+            replay = self.MockReplay([self.TestEvent('a')])
+            engine.run(replay)
+            self.assertEqual(''.join(str(e) for e in replay.engine_events), 'bdecaf')
+            self.assertEqual(replay.plugin_failures, ['TestPlugin1'])
+
+        # Registering a plugin resets the handlers
+        engine.register_plugin(self.TestPlugin2())
+        replay = self.MockReplay([self.TestEvent('a')])
+        engine.run(replay)
+        self.assertEqual(''.join(str(e) for e in replay.engine_events), 'bbddeeeeccaaffff')
+
+    def test_plugin_overrides_derived_values(self):
+        class ShiftPlugin(object):
+            name = 'ShiftPlugin'
+
+            def handleEvent(self, event, replay):
+                event.second = event.frame >> 5
+
+            def handleCameraEvent(self, event, replay):
+                event.location = (0, 0)
+
+        engine = sc2reader.engine.GameEngine(plugins=[ShiftPlugin()])
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", engine=engine)
+        self.assertEqual(replay.plugin_failures, [])
+        for event in replay.events:
+            self.assertEqual(event.second, event.frame >> 5)
+        camera = next(e for e in replay.events if e.name == 'CameraEvent')
+        self.assertEqual(camera.location, (0, 0))
+
+    def test_run_many(self):
+        from sc2reader.engine.plugins import APMTracker, ContextLoader
+        engine = sc2reader.engine.GameEngine(plugins=[ContextLoader(), APMTracker()])
+        expected = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", engine=engine)
+        paths = ["test_replays/2.0.8.25604/mlg1.SC2Replay", "test_replays/test_all.py"]
+
+        summary, error = list(engine.run_many(paths, workers=2))
+        self.assertEqual(summary.filename, expected.filename)
+        self.assertEqual(summary.plugin_result, expected.plugin_result)
+        self.assertEqual(summary.exports['APMTracker'], dict((human.pid, human.avg_apm) for human in expected.humans))
+        self.assertTrue(isinstance(error, sc2reader.exceptions.LoadError))
+
+        replay = sc2reader.load_replay("test_replays/2.0.8.25604/mlg1.SC2Replay", engine=None)
+        summary, = list(engine.run_many([replay]))
+        self.assertEqual(summary.exports['APMTracker'], dict((human.pid, human.avg_apm) for human in expected.humans))
 
 
     def test_creepTracker(self):